@@ -1,14 +1,22 @@
 import pymysql
 pymysql.install_as_MySQLdb()
+import hmac
 import os
 from sqlalchemy import text
-from flask import Flask, send_from_directory
+from flask import Flask, request
 from flask_cors import CORS
 from pathlib import Path
 
 from .config import DevConfig
+from .cli import jobs_cli, uploads_cli
 from .extensions import db, migrate, jwt, ma, bcrypt
+from .extensions import pool
+from .services import referencia_service, salud_service
+from .utils.compresion import init_compresion
 from .utils.errors import register_error_handlers
+from .utils.json_provider import proveedor_para
+from .utils.replicas import init_replicas
+from .utils.uploads import servir_upload
 from .api import (
     auth_routes,
     usuario_routes,
@@ -28,6 +36,9 @@ def create_app(config_class=DevConfig) -> Flask:
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # JSON: orjson si está instalado (fechas ISO y Decimal nativos), si no stdlib
+    app.json = proveedor_para(app)(app)
+
     # Carpeta para uploads (imágenes de artículos)
     uploads_articulos_dir = (Path(app.root_path).parent / "uploads" / "articulos").resolve()
     uploads_articulos_dir.mkdir(parents=True, exist_ok=True)
@@ -45,10 +56,18 @@ def create_app(config_class=DevConfig) -> Flask:
         origins = app.config.get("FRONTEND_BASE_URL") or "http://localhost:4200"
 
     supports_credentials = origins != "*"
-    CORS(app, resources={r"/api/*": {"origins": origins}}, supports_credentials=supports_credentials)
+    CORS(
+        app,
+        resources={r"/api/*": {"origins": origins}},
+        supports_credentials=supports_credentials,
+        # Ventana read-your-writes firmada (utils/replicas): el frontend la reenvía.
+        expose_headers=["X-Primaria-Hasta"],
+    )
 
-    # Inicializar extensiones
+    # Inicializar extensiones (pool según DB_POOL_PERFIL, con telemetría)
+    pool.configurar_pool(app)
     db.init_app(app)
+    pool.instrumentar_pool(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     ma.init_app(app)
@@ -70,6 +89,21 @@ def create_app(config_class=DevConfig) -> Flask:
     # Manejadores de errores
     register_error_handlers(app)
 
+    # Read-your-writes tras escrituras si hay réplicas de lectura
+    init_replicas(app)
+
+    # gzip/brotli según Accept-Encoding (no aplica a /uploads)
+    init_compresion(app)
+
+    # Categorías y puntos de entrega en memoria desde el arranque
+    if app.config.get("REFERENCIA_PRECARGAR", True):
+        with app.app_context():
+            referencia_service.precargar()
+
+    # CLI: flask jobs run|list|once, flask uploads gc
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(uploads_cli)
+
     @app.get("/api/health")
     def health_check():
         return {"status": "ok", "service": "micro-renta-backend"}
@@ -88,8 +122,26 @@ def create_app(config_class=DevConfig) -> Flask:
                 "error": str(e),
             }, 500
 
+    @app.get("/api/health/deep")
+    def health_deep():
+        # Cacheado unos segundos: los probes no cargan la BD (services/salud_service).
+        return salud_service.chequeo_profundo(app)
+
+    @app.get("/api/metrics")
+    def metrics():
+        token = app.config.get("METRICS_TOKEN")
+        if not token and app.config.get("METRICS_EXIGE_TOKEN"):
+            return {"status": "error", "error": "No encontrado"}, 404
+        if token and not hmac.compare_digest(request.headers.get("X-Metrics-Token", ""), token):
+            return {"status": "error", "error": "No autorizado"}, 401
+        return {
+            "db_pool": pool.estadisticas(app),
+            "cache": salud_service.estadisticas_caches(),
+        }
+
     @app.get("/uploads/articulos/<path:filename>")
     def servir_upload_articulo(filename: str):
-        return send_from_directory(app.config["UPLOADS_ARTICULOS_DIR"], filename)
+        # Cache inmutable + ETag por hash, Range y X-Accel-Redirect opcional (utils/uploads).
+        return servir_upload(app.config["UPLOADS_ARTICULOS_DIR"], filename)
 
     return app
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt
 
 from app.services import admin_service
 from app.utils.errors import ApiError
+from app.utils.replicas import solo_lectura
 from app.utils.responses import success_response
 
 bp = Blueprint("admin", __name__)
@@ -23,6 +24,7 @@ def ping_admin():
 
 @bp.get("/resumen")
 @jwt_required()
+@solo_lectura
 def resumen_admin():
     _require_admin()
     data = admin_service.obtener_resumen_admin()
@@ -31,6 +33,7 @@ def resumen_admin():
 
 @bp.get("/incidentes")
 @jwt_required()
+@solo_lectura
 def listar_incidentes_admin():
     _require_admin()
 
@@ -44,6 +47,7 @@ def listar_incidentes_admin():
 
 @bp.get("/usuarios")
 @jwt_required()
+@solo_lectura
 def listar_usuarios_admin():
     _require_admin()
 
@@ -57,6 +61,7 @@ def listar_usuarios_admin():
 
 @bp.get("/articulos")
 @jwt_required()
+@solo_lectura
 def listar_articulos_admin():
     _require_admin()
 
@@ -83,6 +88,7 @@ def actualizar_estado_publicacion_admin(id_articulo: int):
 
 @bp.get("/puntos-entrega")
 @jwt_required()
+@solo_lectura
 def listar_puntos_entrega_admin():
     _require_admin()
 
@@ -1,9 +1,7 @@
 # backend/app/api/articulo_routes.py
-import os
-import uuid
-from urllib.parse import urlparse
+from datetime import MAXYEAR, MINYEAR, datetime, timedelta
 
-from datetime import datetime, timedelta
+from sqlalchemy import func, or_
 
 from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
@@ -19,8 +17,12 @@ from app.schemas.articulo_schemas import (
     ArticuloUpdateSchema,
 )
 from app.utils.errors import ApiError
+from app.utils.etag import etag_condicional
+from app.utils.replicas import solo_lectura
 from app.utils.security import require_usuario_habilitado
-from app.services import renta_service
+from app.utils.time_utils import a_utc_naive
+from app.services import imagenes_service, ocupacion_service, renta_service, subidas_service
+from app.services.disponibilidad_service import filtro_articulo_disponible, siguientes_ventanas_libres
 
 bp = Blueprint("articulo_routes", __name__)
 
@@ -41,20 +43,87 @@ def _reject_admin_publicar() -> None:
             payload={"code": "ADMIN_FORBIDDEN"},
         )
 
- 
+
+def _parse_fecha_filtro(raw: str, nombre: str, fin_de_dia: bool) -> datetime:
+    txt = str(raw).strip()
+    try:
+        dt = datetime.fromisoformat(txt)
+    except Exception:
+        raise ApiError(f"Formato inválido en '{nombre}'. Usa YYYY-MM-DD o ISO 8601.", 400)
+    # Con zona (p. ej. +02:00): a UTC naive, como todas las fechas en BD
+    dt = a_utc_naive(dt)
+    # Solo fecha: el día completo (hasta = fin del día indicado)
+    if len(txt) <= 10 and fin_de_dia:
+        dt = dt + timedelta(days=1)
+    return dt
+
+
+def _aplicar_filtros_catalogo(query):
+    """Filtros opcionales del catálogo (combinables):
+
+    - id_categoria
+    - q: texto en título/descripción
+    - precio_min / precio_max: sobre la tarifa diaria efectiva (precio_por_dia,
+      o precio_por_hora * 24, o precio_por_semana / 7)
+    - disponible_desde / disponible_hasta: sin rentas activas ni bloqueos en
+      el rango (anti-join en la misma query)
+    """
+
+    args = request.args
+
+    id_categoria = args.get("id_categoria")
+    if id_categoria:
+        try:
+            query = query.filter(Articulo.id_categoria == int(id_categoria))
+        except ValueError:
+            raise ApiError("Parámetro 'id_categoria' inválido.", 400)
+
+    texto = str(args.get("q") or "").strip()
+    if texto:
+        patron = f"%{texto}%"
+        query = query.filter(or_(Articulo.titulo.ilike(patron), Articulo.descripcion.ilike(patron)))
+
+    # Tarifa diaria efectiva: los artículos solo por hora/semana también entran.
+    precio = func.coalesce(
+        Articulo.precio_por_dia,
+        Articulo.precio_por_hora * 24,
+        Articulo.precio_por_semana / 7,
+    )
+    for nombre, op in (("precio_min", "ge"), ("precio_max", "le")):
+        raw = args.get(nombre)
+        if raw in (None, ""):
+            continue
+        try:
+            valor = float(raw)
+        except ValueError:
+            raise ApiError(f"Parámetro '{nombre}' inválido.", 400)
+        query = query.filter(precio >= valor if op == "ge" else precio <= valor)
+
+    desde_raw = args.get("disponible_desde")
+    hasta_raw = args.get("disponible_hasta")
+    if desde_raw or hasta_raw:
+        if not (desde_raw and hasta_raw):
+            raise ApiError("Usa disponible_desde y disponible_hasta juntos.", 400)
+        desde = _parse_fecha_filtro(desde_raw, "disponible_desde", fin_de_dia=False)
+        hasta = _parse_fecha_filtro(hasta_raw, "disponible_hasta", fin_de_dia=True)
+        if hasta <= desde:
+            raise ApiError("Rango de disponibilidad inválido.", 400)
+        query = query.filter(filtro_articulo_disponible(desde, hasta))
+
+    return query
+
+
 @bp.get("")
 @jwt_required(optional=True)
+@solo_lectura
 def listar_articulos():
     """
     Listado público de artículos disponibles para renta.
-    Más adelante podemos filtrar por categoría, por ciudad, etc.
+    Acepta filtros opcionales (ver _aplicar_filtros_catalogo).
     """
-    articulos = (
-        Articulo.query
-        .filter(Articulo.estado_publicacion != "eliminado")
-        .order_by(Articulo.id_articulo.desc())
-        .all()
-    )
+    query = Articulo.query.filter(Articulo.estado != "eliminado")
+    query = _aplicar_filtros_catalogo(query)
+    articulos = query.order_by(Articulo.id_articulo.desc()).all()
 
     data = articulo_listado_schema.dump(articulos)
     return jsonify({"success": True, "data": data}), 200
@@ -69,20 +138,44 @@ def listar_mis_articulos():
     except (TypeError, ValueError):
         raise ApiError("Token inválido", 401)
 
-    articulos = (
-        Articulo.query
-        .filter(
-            Articulo.id_propietario == id_usuario_int,
-            Articulo.estado_publicacion != "eliminado",
-        )
-        .order_by(Articulo.id_articulo.desc())
-        .all()
+    query = Articulo.query.filter(
+        Articulo.id_dueno == id_usuario_int,
+        Articulo.estado != "eliminado",
     )
+    query = _aplicar_filtros_catalogo(query)
+    articulos = query.order_by(Articulo.id_articulo.desc()).all()
 
     data = articulo_listado_schema.dump(articulos)
     return jsonify({"success": True, "data": data}), 200
 
 
+_CAMPOS_TARIFA = {
+    "precio_renta_hora": "precio_por_hora",
+    "precio_renta_dia": "precio_por_dia",
+    "precio_renta_semana": "precio_por_semana",
+}
+
+
+def _tarifas_desde_payload(data: dict, actual: Articulo | None = None) -> dict:
+    """Mapea precio_renta_* del payload a columnas precio_por_*.
+
+    Un valor nulo o <= 0 desactiva esa unidad; un campo ausente conserva el
+    valor actual (edición). Debe quedar al menos una tarifa.
+    """
+
+    out = {}
+    for campo, columna in _CAMPOS_TARIFA.items():
+        if campo in data:
+            v = data.get(campo)
+            out[columna] = v if v is not None and float(v) > 0 else None
+        else:
+            out[columna] = getattr(actual, columna) if actual is not None else None
+
+    if all(v is None for v in out.values()):
+        raise ApiError("Debes indicar un precio por hora, día y/o semana.", 400)
+    return out
+
+
 @bp.post("")
 @jwt_required()
 def crear_articulo():
@@ -100,42 +193,7 @@ def crear_articulo():
 
     data = articulo_create_schema.load(request.json or {})
 
-    precio_dia = data.get("precio_renta_dia")
-    precio_hora = data.get("precio_renta_hora")
-
-    def _ok(v):
-        try:
-            return v is not None and float(v) > 0
-        except Exception:
-            return False
-
-    dia_ok = _ok(precio_dia)
-    hora_ok = _ok(precio_hora)
-
-    # La BD real soporta 1 unidad por artículo. Si vienen ambas, guardamos solo una.
-    unit_hint = str(data.get("unidad_precio") or "").strip().lower() or None
-    if unit_hint not in ("por_hora", "por_dia", "por_semana"):
-        unit_hint = None
-
-    warnings: list[str] = []
-    selected_unit: str | None = None
-    if hora_ok and dia_ok:
-        selected_unit = unit_hint if unit_hint in ("por_hora", "por_dia") else "por_dia"
-        warnings.append(
-            "Tu base actual soporta 1 modalidad por artículo. Se guardó solo la modalidad principal."
-        )
-    elif hora_ok:
-        selected_unit = "por_hora"
-    elif dia_ok:
-        selected_unit = "por_dia"
-    else:
-        # El schema ya valida, pero dejamos fallback defensivo.
-        raise ApiError("Debes indicar un precio por día y/o por hora.", 400)
-
-    selected_price = precio_hora if selected_unit == "por_hora" else precio_dia
-    if selected_price is None:
-        # fallback defensivo
-        selected_price = precio_dia if dia_ok else precio_hora
+    tarifas = _tarifas_desde_payload(data)
 
     categoria = Categoria.query.get(data["id_categoria"])
     if not categoria:
@@ -146,11 +204,9 @@ def crear_articulo():
         titulo=data["titulo"].strip(),
         descripcion=data["descripcion"].strip(),
         id_categoria=data["id_categoria"],
-        precio_base=selected_price,
-        unidad_precio=selected_unit,
+        **tarifas,
         monto_deposito=data.get("deposito_garantia") or 0,
         ubicacion_texto=data.get("ubicacion_texto"),
-        estado="disponible",
         estado_publicacion="publicado",
     )
 
@@ -169,15 +225,10 @@ def crear_articulo():
 
     db.session.commit()
 
-    resp = {"success": True, "data": articulo_detalle_schema.dump(articulo)}
-    if warnings:
-        resp["warnings"] = warnings
-    return jsonify(resp), 201
+    return jsonify({"success": True, "data": articulo_detalle_schema.dump(articulo)}), 201
 
 
-@bp.post("/<int:articulo_id>/imagenes")
-@jwt_required()
-def subir_imagenes_articulo(articulo_id: int):
+def _articulo_propio(articulo_id: int) -> tuple[Articulo, int]:
     id_usuario = get_jwt_identity()
     try:
         id_usuario_int = int(id_usuario)
@@ -187,19 +238,23 @@ def subir_imagenes_articulo(articulo_id: int):
     articulo = Articulo.query.get_or_404(articulo_id)
     if articulo.id_propietario != id_usuario_int:
         raise ApiError("No autorizado", 403)
+    return articulo, id_usuario_int
 
-    archivos = request.files.getlist("imagenes")
-    if not archivos:
-        raise ApiError("Debes enviar al menos un archivo en el campo 'imagenes'.", 400)
 
-    allowed = {".jpg", ".jpeg", ".png", ".webp"}
+def _upload_dir() -> str:
     upload_dir = current_app.config.get("UPLOADS_ARTICULOS_DIR")
     if not upload_dir:
         raise ApiError("Configuración de uploads no disponible", 500)
+    return upload_dir
 
-    os.makedirs(upload_dir, exist_ok=True)
 
-    # Orden y principal
+def _base_url() -> str:
+    return (request.host_url or "http://127.0.0.1:5000/").rstrip("/")
+
+
+def _agregar_imagenes(articulo: Articulo, guardados: list, base: str) -> list[ArticuloImagen]:
+    """Filas para archivos ya guardados: orden a continuación, principal si no hay."""
+
     existentes = ArticuloImagen.query.filter_by(id_articulo=articulo.id_articulo).all()
     next_orden = 0
     if existentes:
@@ -209,34 +264,32 @@ def subir_imagenes_articulo(articulo_id: int):
     ya_hay_principal = any(img.es_principal for img in existentes)
 
     nuevas = []
-    for idx, f in enumerate(archivos):
-        original = f.filename or ""
-        _, ext = os.path.splitext(original)
-        ext = (ext or "").lower()
-        if ext not in allowed:
-            raise ApiError(
-                "Formato inválido. Solo se permiten: jpg, jpeg, png, webp.",
-                400,
-            )
-
-        filename = f"{uuid.uuid4().hex}{ext}"
-        file_path = os.path.join(upload_dir, filename)
-        f.save(file_path)
-
-        base = (request.host_url or "http://127.0.0.1:5000/").rstrip("/")
-        url = f"{base}/uploads/articulos/{filename}"
-
+    for idx, guardado in enumerate(guardados):
+        # Mismo contenido ya procesado: se reutilizan sus variantes.
+        url_miniatura, url_mediana = imagenes_service.variantes_existentes(guardado.sha256)
         img = ArticuloImagen(
             id_articulo=articulo.id_articulo,
-            url_imagen=url,
+            url_imagen=f"{base}/uploads/articulos/{guardado.filename}",
+            sha256=guardado.sha256,
+            url_miniatura=url_miniatura,
+            url_mediana=url_mediana,
             es_principal=(False if ya_hay_principal else idx == 0),
             orden=next_orden + idx,
         )
         db.session.add(img)
         nuevas.append(img)
+    articulo.actualizado_en = datetime.utcnow()
+    return nuevas
 
-    db.session.commit()
 
+def _encolar_variantes(nuevas: list[ArticuloImagen], guardados: list, upload_dir: str, base: str) -> None:
+    # Miniatura + mediana WebP fuera del request (pool de procesos).
+    for img, guardado in zip(nuevas, guardados):
+        if not img.url_miniatura:
+            imagenes_service.encolar_variantes(img, guardado.filename, upload_dir, base)
+
+
+def _respuesta_imagenes(articulo: Articulo, nuevas: list[ArticuloImagen]):
     return (
         jsonify(
             {
@@ -261,6 +314,99 @@ def subir_imagenes_articulo(articulo_id: int):
     )
 
 
+@bp.post("/<int:articulo_id>/imagenes")
+@jwt_required()
+def subir_imagenes_articulo(articulo_id: int):
+    articulo, _ = _articulo_propio(articulo_id)
+
+    archivos = request.files.getlist("imagenes")
+    if not archivos:
+        raise ApiError("Debes enviar al menos un archivo en el campo 'imagenes'.", 400)
+
+    upload_dir = _upload_dir()
+    base = _base_url()
+    guardados: list[imagenes_service.UploadGuardado] = []
+    try:
+        for f in archivos:
+            # Se copia por bloques, se valida por magic bytes y se guarda por hash (dedupe).
+            guardados.append(imagenes_service.guardar_upload(f, upload_dir))
+
+        nuevas = _agregar_imagenes(articulo, guardados, base)
+        db.session.commit()
+    except Exception:
+        # Los archivos ya guardados no se borran: otro request pudo deduplicar
+        # contra ellos. Sin filas que los usen, los recupera `flask uploads gc`.
+        db.session.rollback()
+        raise
+
+    _encolar_variantes(nuevas, guardados, upload_dir, base)
+    return _respuesta_imagenes(articulo, nuevas)
+
+
+# =========================
+# Upload reanudable por chunks (subidas_service)
+# =========================
+
+
+@bp.post("/<int:articulo_id>/imagenes/subidas")
+@jwt_required()
+def iniciar_subida_imagen(articulo_id: int):
+    """Body: {tamano, sha256, nombre?}. Devuelve id_subida y tamaño máximo de chunk."""
+
+    articulo, id_usuario = _articulo_propio(articulo_id)
+    _upload_dir()
+    subida = subidas_service.iniciar(articulo.id_articulo, id_usuario, request.get_json(silent=True) or {})
+    return jsonify({"success": True, "data": subidas_service.subida_to_dict(subida)}), 201
+
+
+@bp.get("/<int:articulo_id>/imagenes/subidas/<string:id_subida>")
+@jwt_required()
+def estado_subida_imagen(articulo_id: int, id_subida: str):
+    """Estado para reanudar: `recibido` es el siguiente offset a enviar."""
+
+    articulo, id_usuario = _articulo_propio(articulo_id)
+    subida = subidas_service.obtener(articulo.id_articulo, id_subida, id_usuario)
+    return jsonify({"success": True, "data": subidas_service.subida_to_dict(subida)}), 200
+
+
+@bp.put("/<int:articulo_id>/imagenes/subidas/<string:id_subida>")
+@jwt_required()
+def subir_chunk_imagen(articulo_id: int, id_subida: str):
+    """Cuerpo crudo (application/octet-stream); offset en ?offset= o cabecera Upload-Offset."""
+
+    articulo, id_usuario = _articulo_propio(articulo_id)
+    subida = subidas_service.obtener(articulo.id_articulo, id_subida, id_usuario)
+
+    raw_offset = request.args.get("offset", request.headers.get("Upload-Offset"))
+    try:
+        offset = int(raw_offset)
+    except (TypeError, ValueError):
+        raise ApiError("offset es requerido (entero).", 400)
+
+    subida = subidas_service.escribir_chunk(subida, offset, request.stream, request.content_length)
+    return jsonify({"success": True, "data": subidas_service.subida_to_dict(subida)}), 200
+
+
+@bp.post("/<int:articulo_id>/imagenes/subidas/<string:id_subida>/finalizar")
+@jwt_required()
+def finalizar_subida_imagen(articulo_id: int, id_subida: str):
+    articulo, id_usuario = _articulo_propio(articulo_id)
+    subida = subidas_service.obtener(articulo.id_articulo, id_subida, id_usuario)
+
+    upload_dir = _upload_dir()
+    base = _base_url()
+    guardado = subidas_service.finalizar(subida, upload_dir)
+    try:
+        nuevas = _agregar_imagenes(articulo, [guardado], base)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()  # el archivo queda para el GC, como en subir_imagenes_articulo
+        raise
+
+    _encolar_variantes(nuevas, [guardado], upload_dir, base)
+    return _respuesta_imagenes(articulo, nuevas)
+
+
 @bp.delete("/<int:articulo_id>/imagenes/<int:imagen_id>")
 @jwt_required()
 def eliminar_imagen_articulo(articulo_id: int, imagen_id: int):
@@ -279,7 +425,6 @@ def eliminar_imagen_articulo(articulo_id: int, imagen_id: int):
         raise ApiError("Imagen inválida", 400)
 
     was_principal = bool(imagen.es_principal)
-    url = imagen.url_imagen
 
     # Eliminar registro
     db.session.delete(imagen)
@@ -300,23 +445,12 @@ def eliminar_imagen_articulo(articulo_id: int, imagen_id: int):
                 img.es_principal = False
             restantes[0].es_principal = True
 
+    # Las imágenes no son columnas del artículo: se toca su sello de versión (ETag).
+    articulo.actualizado_en = datetime.utcnow()
+    # El archivo puede estar compartido (dedupe por hash): si queda sin
+    # referencias lo recupera `flask uploads gc`.
     db.session.commit()
 
-    # Eliminar archivo si aplica (best-effort)
-    try:
-        upload_dir = current_app.config.get("UPLOADS_ARTICULOS_DIR")
-        if upload_dir and url:
-            path = urlparse(url).path or ""
-            prefix = "/uploads/articulos/"
-            if prefix in path:
-                filename = path.split(prefix, 1)[1]
-                filename = os.path.basename(filename)
-                file_path = os.path.join(upload_dir, filename)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-    except Exception:
-        pass
-
     return jsonify({"success": True, "data": {"deleted": True}}), 200
 
 
@@ -352,6 +486,8 @@ def reordenar_imagenes_articulo(articulo_id: int):
     for img in imagenes:
         img.orden = pos[img.id]
 
+    # Las imágenes no son columnas del artículo: se toca su sello de versión (ETag).
+    articulo.actualizado_en = datetime.utcnow()
     db.session.commit()
     return jsonify({"success": True, "data": {"ok": True}}), 200
 
@@ -377,12 +513,25 @@ def marcar_imagen_principal(articulo_id: int, imagen_id: int):
     for img in imagenes:
         img.es_principal = (img.id == imagen.id)
 
+    # Las imágenes no son columnas del artículo: se toca su sello de versión (ETag).
+    articulo.actualizado_en = datetime.utcnow()
     db.session.commit()
     return jsonify({"success": True, "data": {"ok": True}}), 200
 
 
+def _version_articulo(articulo_id: int):
+    fila = (
+        db.session.query(Articulo.actualizado_en, Articulo.creado_en)
+        .filter(Articulo.id_articulo == articulo_id)
+        .first()
+    )
+    return tuple(fila) if fila else None
+
+
 @bp.get("/<int:articulo_id>")
 @jwt_required(optional=True)
+@solo_lectura
+@etag_condicional(_version_articulo)
 def obtener_articulo(articulo_id: int):
     """
     Detalle de un artículo.
@@ -423,45 +572,10 @@ def editar_articulo(articulo_id: int):
             raise ApiError("La descripción es obligatoria", 400)
         articulo.descripcion = d
 
-    warnings: list[str] = []
-
-    # Tarifas (compat): aceptar hora/día/ambas, pero persistir solo 1 (precio_base+unidad_precio).
-    if ("precio_renta_dia" in payload) or ("precio_renta_hora" in payload):
-        dia = payload.get("precio_renta_dia")
-        hora = payload.get("precio_renta_hora")
-
-        def _ok(v):
-            try:
-                return v is not None and float(v) > 0
-            except Exception:
-                return False
-
-        dia_ok = _ok(dia)
-        hora_ok = _ok(hora)
-        if not dia_ok and not hora_ok:
-            raise ApiError("Debes indicar un precio por día y/o por hora.", 400)
-
-        unit_hint = str(payload.get("unidad_precio") or "").strip().lower() or None
-        if unit_hint not in ("por_hora", "por_dia", "por_semana"):
-            unit_hint = None
-
-        selected_unit: str | None = None
-        if dia_ok and hora_ok:
-            selected_unit = unit_hint if unit_hint in ("por_hora", "por_dia") else (articulo.unidad_precio if articulo.unidad_precio in ("por_hora", "por_dia") else "por_dia")
-            warnings.append(
-                "Tu base actual soporta 1 modalidad por artículo. Se guardó solo la modalidad principal."
-            )
-        elif hora_ok:
-            selected_unit = "por_hora"
-        else:
-            selected_unit = "por_dia"
-
-        selected_price = hora if selected_unit == "por_hora" else dia
-        if selected_price is None:
-            selected_price = dia if dia_ok else hora
-
-        articulo.unidad_precio = selected_unit
-        articulo.precio_base = selected_price
+    # Tarifas: se persisten todas (hora/día/semana); las que no vienen no cambian.
+    if any(k in payload for k in _CAMPOS_TARIFA):
+        for campo, valor in _tarifas_desde_payload(payload, articulo).items():
+            setattr(articulo, campo, valor)
 
     if "deposito_garantia" in payload:
         articulo.monto_deposito = payload.get("deposito_garantia")
@@ -472,18 +586,10 @@ def editar_articulo(articulo_id: int):
     db.session.add(articulo)
     db.session.commit()
 
-    resp = {"success": True, "data": articulo_detalle_schema.dump(articulo)}
-    if warnings:
-        resp["warnings"] = warnings
-    return jsonify(resp), 200
+    return jsonify({"success": True, "data": articulo_detalle_schema.dump(articulo)}), 200
 
 
-@bp.get("/<int:articulo_id>/ocupacion")
-def ocupacion_articulo(articulo_id: int):
-    """Devuelve rangos ocupados (fechas/horas) para mostrar disponibilidad visible."""
-
-    articulo = Articulo.query.get_or_404(articulo_id)
-
+def _parse_rango_dias() -> tuple[datetime, datetime]:
     desde = request.args.get("desde")
     hasta = request.args.get("hasta")
     if not desde or not hasta:
@@ -495,10 +601,112 @@ def ocupacion_articulo(articulo_id: int):
     except Exception:
         raise ApiError("Formato inválido. Usa YYYY-MM-DD.", 400)
 
+    # Los extremos del calendario desbordan al sumar/restar un día.
+    if not (MINYEAR < d0.year and d1.year < MAXYEAR):
+        raise ApiError("Fechas fuera de rango.", 400)
+
     desde_dt = datetime(d0.year, d0.month, d0.day)
     hasta_dt = datetime(d1.year, d1.month, d1.day) + timedelta(days=1)
     if hasta_dt <= desde_dt:
         raise ApiError("Rango inválido.", 400)
 
+    max_dias = max(1, int(current_app.config.get("OCUPACION_HORIZONTE_DIAS", 180)))
+    if hasta_dt - desde_dt > timedelta(days=max_dias):
+        raise ApiError(f"El rango no puede superar {max_dias} días.", 400)
+    return desde_dt, hasta_dt
+
+
+@bp.get("/<int:articulo_id>/ocupacion")
+def ocupacion_articulo(articulo_id: int):
+    """Devuelve rangos ocupados (fechas/horas) para mostrar disponibilidad visible."""
+
+    articulo = Articulo.query.get_or_404(articulo_id)
+    desde_dt, hasta_dt = _parse_rango_dias()
+
+    # Rangos exactos de las rentas; la vista agregada (con bloqueos) es /ocupacion.
     ocupado = renta_service.listar_ocupacion_articulo(articulo.id_articulo, desde_dt, hasta_dt)
     return jsonify({"success": True, "data": {"ocupado": ocupado}}), 200
+
+
+@bp.get("/<int:articulo_id>/siguiente-disponible")
+def siguiente_disponible_articulo(articulo_id: int):
+    """Primeras ventanas libres para rentar el artículo.
+
+    Query: ?duracion=N&modalidad=horas|dias[&limite=3][&desde=ISO]
+    Pensado para sugerir alternativas cuando crear_renta responde 409.
+    """
+
+    articulo = Articulo.query.get_or_404(articulo_id)
+
+    # Mismo default y validación que crear_renta: según las tarifas guardadas.
+    modalidad = str(request.args.get("modalidad") or "").strip().lower()
+    if not modalidad:
+        if articulo.permite_dias:
+            modalidad = "dias"
+        elif articulo.permite_horas:
+            modalidad = "horas"
+        else:
+            raise ApiError("Este artículo no se renta por horas ni por días.", 400)
+    if modalidad not in ("horas", "dias"):
+        raise ApiError("modalidad inválida. Usa: horas|dias", 400)
+    if modalidad == "horas" and not articulo.permite_horas:
+        raise ApiError("Este artículo se renta por día, no por horas.", 400)
+    if modalidad == "dias" and not articulo.permite_dias:
+        raise ApiError("Este artículo se renta por hora, no por días.", 400)
+
+    try:
+        duracion = int(request.args.get("duracion", 1))
+        limite = int(request.args.get("limite", 3))
+    except (TypeError, ValueError):
+        raise ApiError("duracion y limite deben ser enteros.", 400)
+
+    max_duracion = 24 * 30 if modalidad == "horas" else 90
+    if not (1 <= duracion <= max_duracion):
+        raise ApiError(f"duracion debe estar entre 1 y {max_duracion}.", 400)
+    limite = min(max(limite, 1), 10)
+
+    ahora = datetime.utcnow()
+    desde_raw = request.args.get("desde")
+    if desde_raw:
+        desde = max(_parse_fecha_filtro(desde_raw, "desde", fin_de_dia=False), ahora)
+    else:
+        desde = ahora
+
+    horizonte = int(current_app.config.get("OCUPACION_HORIZONTE_DIAS", 180))
+    hasta = ahora + timedelta(days=max(1, horizonte))
+    delta = timedelta(hours=duracion) if modalidad == "horas" else timedelta(days=duracion)
+
+    ventanas = siguientes_ventanas_libres(articulo.id_articulo, delta, desde, hasta, limite=limite)
+    return (
+        jsonify(
+            {
+                "success": True,
+                "data": {"modalidad": modalidad, "duracion": duracion, "ventanas": ventanas},
+            }
+        ),
+        200,
+    )
+
+
+@bp.get("/ocupacion")
+def ocupacion_articulos_batch():
+    """Ocupación de varios artículos en una sola llamada.
+
+    Query: ?ids=1,2,3&desde=YYYY-MM-DD&hasta=YYYY-MM-DD[&granularidad=horas|dias]
+    Respuesta: {"ocupado": {"<id>": [{"inicio", "fin"}, ...]}} (rangos RLE).
+    """
+
+    raw_ids = str(request.args.get("ids") or "").strip()
+    if not raw_ids:
+        raise ApiError("Parámetro requerido: ids (separados por coma).", 400)
+    try:
+        ids = [int(x) for x in raw_ids.split(",") if x.strip()]
+    except ValueError:
+        raise ApiError("Parámetro 'ids' inválido. Usa enteros separados por coma.", 400)
+
+    desde_dt, hasta_dt = _parse_rango_dias()
+    granularidad = (request.args.get("granularidad") or "dias").strip().lower()
+
+    ocupado = ocupacion_service.ocupacion_articulos(ids, desde_dt, hasta_dt, granularidad)
+    data = {str(k): v for k, v in ocupado.items()}
+    return jsonify({"success": True, "data": {"granularidad": granularidad, "ocupado": data}}), 200
@@ -1,13 +1,19 @@
 from flask import Blueprint, jsonify
 
-from app.models.categoria import Categoria
+from app.services import referencia_service
+from app.utils.etag import etag_condicional
 
 
 bp = Blueprint("categoria_routes", __name__)
 
 
+def _version_categorias():
+    # Hash del contenido en cache: sin query y estable entre workers.
+    return referencia_service.sello(referencia_service.CATEGORIAS)
+
+
 @bp.get("")
+@etag_condicional(_version_categorias)
 def listar_categorias():
-    categorias = Categoria.query.order_by(Categoria.nombre.asc()).all()
-    data = [{"id": c.id, "nombre": c.nombre} for c in categorias]
+    data = referencia_service.categorias()
     return jsonify({"success": True, "data": data}), 200
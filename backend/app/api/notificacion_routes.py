@@ -1,4 +1,4 @@
-from flask import Blueprint
+from flask import Blueprint, request
 import os
 from flask import current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -36,6 +36,54 @@ def listar_notificaciones():
     return success_response(data=data, message="OK")
 
 
+@bp.get("/archivadas")
+@jwt_required()
+def listar_notificaciones_archivadas():
+    id_usuario = get_jwt_identity()
+    try:
+        id_usuario = int(id_usuario)
+    except (TypeError, ValueError):
+        raise ApiError("Token inválido", 401)
+
+    try:
+        limit = int(request.args.get("limit", 50))
+        antes_de = request.args.get("antes_de")
+        antes_de = int(antes_de) if antes_de else None
+    except (TypeError, ValueError):
+        raise ApiError("limit/antes_de deben ser enteros.", 400)
+
+    data = notificacion_service.listar_notificaciones_archivadas(id_usuario, limit=limit, antes_de=antes_de)
+    return success_response(data=data, message="OK")
+
+
+@bp.post("/leer")
+@jwt_required()
+def marcar_leidas():
+    """
+    Marca varias notificaciones como leídas (un solo UPDATE).
+    Body JSON: {"ids": [1, 2]} | {"todas": true, "hasta_id": 120} | {"todas": true}
+    """
+    id_usuario = get_jwt_identity()
+    try:
+        id_usuario = int(id_usuario)
+    except (TypeError, ValueError):
+        raise ApiError("Token inválido", 401)
+
+    payload = request.get_json() or {}
+    ids = payload.get("ids")
+    hasta_id = payload.get("hasta_id")
+    if ids is None and not payload.get("todas"):
+        raise ApiError("Envía ids o todas=true (opcional hasta_id).", 400)
+    try:
+        ids = [int(i) for i in ids] if ids is not None else None
+        hasta_id = int(hasta_id) if hasta_id is not None else None
+    except (TypeError, ValueError):
+        raise ApiError("ids/hasta_id deben ser enteros.", 400)
+
+    n = notificacion_service.marcar_leidas(id_usuario, ids=ids, hasta_id=hasta_id)
+    return success_response(data={"actualizadas": n}, message="OK")
+
+
 @bp.post("/<int:id_notificacion>/leer")
 @jwt_required()
 def marcar_leida(id_notificacion: int):
@@ -2,38 +2,33 @@ from flask import Blueprint
 from flask_jwt_extended import jwt_required
 from sqlalchemy.exc import OperationalError, ProgrammingError
 
-from app.models.punto_entrega import PuntoEntrega
+from app.extensions import db
+from app.services import referencia_service
+from app.utils.etag import etag_condicional
 from app.utils.responses import success_response
 
 
 bp = Blueprint("puntos_entrega", __name__)
 
 
-def _to_public_dict(p: PuntoEntrega) -> dict:
-    # Campos mínimos + placeholders para compat sin migraciones extra
-    return {
-        "id": p.id,
-        "nombre": p.nombre,
-        "direccion": p.direccion,  # aproximada
-        "ciudad": None,
-        "estado": None,
-        "horario": None,
-        "notas": None,
-    }
+def _version_puntos_entrega():
+    # Hash de los puntos activos en cache (se invalida al commitear cambios).
+    try:
+        return referencia_service.sello(referencia_service.PUNTOS_ENTREGA)
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return None
 
 
 @bp.get("/puntos-entrega")
 @jwt_required()
+@etag_condicional(_version_puntos_entrega)
 def listar_puntos_entrega_publicos():
     """Lista pública (JWT) de puntos activos para selección en coordinación."""
 
     try:
-        items = (
-            PuntoEntrega.query.filter(PuntoEntrega.activo.is_(True))
-            .order_by(PuntoEntrega.id.asc())
-            .all()
-        )
-        return success_response(data={"items": [_to_public_dict(x) for x in items]}, message="OK")
+        items = referencia_service.puntos_entrega_activos()
+        return success_response(data={"items": items}, message="OK")
     except (OperationalError, ProgrammingError):
         # Compat: si el recurso no existe en una BD desfasada, no rompemos el flujo.
         return success_response(data={"items": []}, message="OK")
@@ -3,17 +3,22 @@ import io
 from flask import Blueprint, request, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
-from app.schemas.renta_schemas import RentaCreateSchema
+from app.schemas.renta_schemas import RentaCotizacionSchema, RentaCreateSchema
 from app.schemas.resena_schemas import ResenaCreateSchema
+from app.services import cotizacion_service
 from app.services import renta_service
 from app.services import resena_service
 from app.utils.responses import success_response
 from app.utils.errors import ApiError
+from app.utils.etag import etag_condicional
+from app.utils.idempotencia import idempotente
+from app.utils.replicas import solo_lectura
 from app.utils.security import require_usuario_habilitado
 
 bp = Blueprint("rentas", __name__)
 
 renta_create_schema = RentaCreateSchema()
+renta_cotizacion_schema = RentaCotizacionSchema()
 resena_create_schema = ResenaCreateSchema()
 
 
@@ -24,6 +29,7 @@ def ping():
 
 @bp.post("")
 @jwt_required()
+@idempotente
 def crear_renta():
     """
     Crea una renta para un artículo.
@@ -65,6 +71,21 @@ def crear_renta():
     )
 
 
+@bp.post("/cotizar")
+def cotizar_renta():
+    """
+    Cotiza sin crear renta (público).
+    Body JSON:
+    {
+      "id_articulo": 1,
+      "ventanas": [{"fecha_inicio": "...", "fecha_fin": "..."}],
+      "calendario": {"anio": 2026, "mes": 1, "duracion": 3, "modalidad": "dias"}
+    }
+    """
+    data = renta_cotizacion_schema.load(request.get_json() or {})
+    return success_response(data=cotizacion_service.cotizar(data))
+
+
 @bp.get("/mis")
 @jwt_required()
 def listar_mis_rentas():
@@ -91,6 +112,7 @@ def listar_mis_rentas():
 
 @bp.get("/mias")
 @jwt_required()
+@solo_lectura
 def listar_rentas_mias():
     """Bandeja (Inbox): rentas del usuario por rol + estado, paginadas."""
 
@@ -115,8 +137,32 @@ def listar_rentas_mias():
     return success_response(data=data, message="OK")
 
 
+@bp.get("/mias/conteos")
+@jwt_required()
+@solo_lectura
+def conteos_bandeja():
+    """Conteos por pestaña (estado público) para ambos roles."""
+
+    id_usuario = get_jwt_identity()
+    try:
+        id_usuario = int(id_usuario)
+    except (TypeError, ValueError):
+        raise ApiError("Token inválido", 401)
+
+    return success_response(data=renta_service.conteos_bandeja(id_usuario), message="OK")
+
+
+def _version_renta(id_renta: int):
+    try:
+        id_usuario = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return None
+    return renta_service.version_renta(id_renta, id_usuario)
+
+
 @bp.get("/<int:id_renta>")
 @jwt_required()
+@etag_condicional(_version_renta, privado=True)
 def obtener_renta(id_renta: int):
     id_usuario = get_jwt_identity()
     try:
@@ -153,6 +199,7 @@ def descargar_recibo(id_renta: int):
 
 @bp.post("/<int:id_renta>/pagar")
 @jwt_required()
+@idempotente
 def pagar_renta(id_renta: int):
     id_usuario = get_jwt_identity()
     try:
@@ -258,6 +305,7 @@ def incidente(id_renta: int):
 
 @bp.post("/<int:id_renta>/cancelar")
 @jwt_required()
+@idempotente
 def cancelar(id_renta: int):
     id_usuario = get_jwt_identity()
     try:
@@ -317,6 +365,7 @@ def aceptar_coordinacion(id_renta: int):
 
 @bp.post("/<int:id_renta>/confirmar-entrega-otp")
 @jwt_required()
+@idempotente
 def confirmar_entrega_otp(id_renta: int):
     id_usuario = get_jwt_identity()
     try:
@@ -335,6 +384,7 @@ def confirmar_entrega_otp(id_renta: int):
 
 @bp.post("/<int:id_renta>/confirmar-devolucion-otp")
 @jwt_required()
+@idempotente
 def confirmar_devolucion_otp(id_renta: int):
     id_usuario = get_jwt_identity()
     try:
@@ -386,6 +436,20 @@ def post_chat(id_renta: int):
     )
 
 
+@bp.get("/<int:id_renta>/chat/historial")
+@jwt_required()
+def get_chat_historial(id_renta: int):
+    """Chat completo, incluidos mensajes archivados de rentas cerradas."""
+    id_usuario = get_jwt_identity()
+    try:
+        id_usuario = int(id_usuario)
+    except (TypeError, ValueError):
+        raise ApiError("Token inválido", 401)
+
+    items = renta_service.obtener_chat_historial(id_renta, id_usuario)
+    return success_response(data={"items": items}, message="OK", status_code=200)
+
+
 @bp.get("/<int:id_renta>/chat/unread-count")
 @jwt_required()
 def chat_unread_count(id_renta: int):
@@ -412,6 +476,44 @@ def chat_marcar_leido(id_renta: int):
     return success_response(message="OK")
 
 
+@bp.post("/chat/marcar-leido")
+@jwt_required()
+def chat_marcar_leidos():
+    """
+    Marca como leídos varios chats en una sola sentencia.
+    Body JSON: {"ids": [1, 2, 3]}
+    """
+    id_usuario = get_jwt_identity()
+    try:
+        id_usuario = int(id_usuario)
+    except (TypeError, ValueError):
+        raise ApiError("Token inválido", 401)
+
+    payload = request.get_json() or {}
+    n = renta_service.chat_marcar_leidos(payload.get("ids") or [], id_usuario)
+    return success_response(data={"actualizadas": n}, message="OK")
+
+
+@bp.get("/chat/unread-counts")
+@jwt_required()
+def chat_unread_counts():
+    """No leídos por renta en lote. Query: ?ids=1,2,3"""
+    id_usuario = get_jwt_identity()
+    try:
+        id_usuario = int(id_usuario)
+    except (TypeError, ValueError):
+        raise ApiError("Token inválido", 401)
+
+    raw = (request.args.get("ids") or "").strip()
+    try:
+        ids = [int(x) for x in raw.split(",") if x.strip()]
+    except ValueError:
+        raise ApiError("ids debe ser una lista de enteros separada por comas.", 400)
+
+    counts = renta_service.chat_unread_counts(ids, id_usuario)
+    return success_response(data={"counts": {str(k): v for k, v in counts.items()}}, message="OK")
+
+
 @bp.get("/chat/unread-total")
 @jwt_required()
 def chat_unread_total():
@@ -0,0 +1,115 @@
+"""Comandos CLI propios: `flask jobs run|list|once` y `flask uploads gc`."""
+
+import signal
+import threading
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+
+from app.services import tareas_service, uploads_gc_service
+
+
+jobs_cli = AppGroup("jobs", help="Tareas de mantenimiento programadas.")
+uploads_cli = AppGroup("uploads", help="Mantenimiento de archivos subidos.")
+
+
+@jobs_cli.command("list")
+def jobs_list():
+    """Lista tareas, disparador, última ejecución y próxima."""
+
+    registro = tareas_service.tareas_registradas()
+    ultimas = tareas_service.ultimas_ejecuciones()
+    ahora = datetime.utcnow()
+    for nombre in sorted(registro):
+        t = registro[nombre]
+        ultima = ultimas.get(nombre)
+        if ultima is not None:
+            base = ultima.inicio if isinstance(t.disparador, tareas_service.Intervalo) else ahora
+            proxima = t.disparador.siguiente(base)
+            detalle = f"última={ultima.inicio:%Y-%m-%d %H:%M:%S} ({ultima.estado}, {ultima.duracion_ms or 0}ms)"
+        else:
+            proxima = ahora if isinstance(t.disparador, tareas_service.Intervalo) else t.disparador.siguiente(ahora)
+            detalle = "última=nunca"
+        click.echo(f"{nombre:<30} {str(t.disparador):<22} {detalle}  próxima={proxima:%Y-%m-%d %H:%M:%S}")
+        if t.descripcion:
+            click.echo(f"    {t.descripcion}")
+
+
+@jobs_cli.command("once")
+@click.argument("nombres", nargs=-1)
+@click.option("--todas", is_flag=True, help="Ejecuta todas las tareas registradas.")
+def jobs_once(nombres, todas):
+    """Ejecuta ya las tareas indicadas (fuera del calendario)."""
+
+    registro = tareas_service.tareas_registradas()
+    if todas:
+        nombres = sorted(registro)
+    if not nombres:
+        raise click.UsageError("Indica al menos una tarea o usa --todas.")
+    desconocidas = [n for n in nombres if n not in registro]
+    if desconocidas:
+        raise click.UsageError(f"Tareas desconocidas: {', '.join(desconocidas)}")
+
+    fallo = False
+    for nombre in nombres:
+        e = tareas_service.ejecutar_tarea(nombre)
+        click.echo(f"{nombre}: {e.estado} ({e.duracion_ms or 0}ms) {e.resultado or e.error or ''}".rstrip())
+        fallo = fallo or e.estado == "error"
+    if fallo:
+        raise SystemExit(1)
+
+
+@jobs_cli.command("run")
+@click.option("--ciclos", type=int, default=None, help="Termina tras N ciclos (por defecto: sin fin).")
+def jobs_run(ciclos):
+    """Corre el scheduler (solo una instancia ejecuta; las demás esperan el relevo)."""
+
+    detener = threading.Event()
+
+    def _parar(signum, frame):
+        click.echo("Deteniendo scheduler...")
+        detener.set()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _parar)
+        signal.signal(signal.SIGINT, _parar)
+
+    tareas_service.correr(detener=detener, max_ciclos=ciclos)
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+@uploads_cli.command("gc")
+@click.option(
+    "--accion",
+    type=click.Choice(uploads_gc_service.ACCIONES),
+    default="reportar",
+    show_default=True,
+    help="Qué hacer con los huérfanos.",
+)
+@click.option("--gracia-horas", type=int, default=None, help="Ignora archivos más nuevos (default: UPLOADS_GC_GRACIA_HORAS).")
+@click.option("--max-por-segundo", type=int, default=None, help="Tope de archivos movidos/borrados por segundo (0 = sin tope).")
+@click.option("--limite", type=int, default=None, help="Máximo de archivos a procesar en esta corrida.")
+@click.option("--verbose", "-v", is_flag=True, help="Imprime cada huérfano.")
+def uploads_gc(accion, gracia_horas, max_por_segundo, limite, verbose):
+    """Busca archivos de UPLOADS_ARTICULOS_DIR sin fila en articulos_imagenes."""
+
+    def _mostrar(rel, size):
+        click.echo(f"  {rel} ({size} B)")
+
+    r = uploads_gc_service.recolectar(
+        accion=accion,
+        gracia_horas=gracia_horas,
+        max_por_segundo=max_por_segundo,
+        limite=limite,
+        al_encontrar=_mostrar if verbose else None,
+    )
+    click.echo(
+        f"revisados={r['revisados']} huérfanos={r['huerfanos']} ({_mb(r['bytes_huerfanos'])}) "
+        f"{accion}={r['procesados']} recuperados={_mb(r['bytes_recuperados'])} errores={r['errores']}"
+    )
+    if r["errores"]:
+        raise SystemExit(1)
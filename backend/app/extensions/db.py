@@ -1,4 +1,24 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+
+from app.utils.replicas import replica_actual
+
+
+class SesionEnrutada(Session):
+    """Manda los SELECT a la réplica del request si la vista es @solo_lectura (utils/replicas)."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            clave = replica_actual()
+            if clave is not None:
+                return self._db.engines[clave]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 
 # Instancia global de SQLAlchemy
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": SesionEnrutada})
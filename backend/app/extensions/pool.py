@@ -0,0 +1,205 @@
+"""Perfiles del pool de conexiones y telemetría del pool.
+
+Perfiles (DB_POOL_PERFIL), pensados por modelo de worker:
+- web-sync: workers sync/gthread; pocas conexiones por proceso, espera larga.
+- gevent: muchos greenlets por proceso; más conexiones y timeout corto para
+  fallar rápido en vez de encolar requests detrás del pool.
+- worker: scheduler de jobs / CLI; un par de conexiones, sin overflow.
+
+DB_POOL_SIZE, DB_MAX_OVERFLOW y DB_POOL_TIMEOUT sobrescriben el perfil. Para
+dimensionar: workers * (pool_size + max_overflow) por réplica de la app debe
+quedar bajo max_connections de MySQL.
+
+Telemetría: cada pool (primaria y réplicas) cuenta checkouts, conexiones
+nuevas, invalidaciones, esperas por pool lleno (y su duración), timeouts y el
+pico de overflow. `estadisticas(app)` alimenta /api/metrics y el health check.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from .db import db
+
+
+PERFILES = {
+    "web-sync": {"pool_size": 5, "max_overflow": 5, "pool_timeout": 30},
+    "gevent": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 10},
+    "worker": {"pool_size": 2, "max_overflow": 0, "pool_timeout": 60},
+}
+PERFIL_DEFAULT = "web-sync"
+
+_SOBRESCRITURAS = (
+    ("DB_POOL_SIZE", "pool_size"),
+    ("DB_MAX_OVERFLOW", "max_overflow"),
+    ("DB_POOL_TIMEOUT", "pool_timeout"),
+)
+
+
+class MetricasPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.conexiones = 0
+        self.invalidaciones = 0
+        self.esperas = 0
+        self.espera_ms_total = 0.0
+        self.espera_ms_max = 0.0
+        self.timeouts = 0
+        self.overflow_pico = 0
+
+    def sumar(self, campo: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + n)
+
+    def registrar_espera(self, ms: float, timeout: bool) -> None:
+        with self._lock:
+            self.esperas += 1
+            self.espera_ms_total += ms
+            self.espera_ms_max = max(self.espera_ms_max, ms)
+            if timeout:
+                self.timeouts += 1
+
+    def registrar_overflow(self, actual: int) -> None:
+        if actual > self.overflow_pico:
+            with self._lock:
+                self.overflow_pico = max(self.overflow_pico, actual)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "conexiones": self.conexiones,
+                "invalidaciones": self.invalidaciones,
+                "esperas": self.esperas,
+                "espera_ms_promedio": round(self.espera_ms_total / self.esperas, 2) if self.esperas else 0.0,
+                "espera_ms_max": round(self.espera_ms_max, 2),
+                "timeouts": self.timeouts,
+                "overflow_pico": self.overflow_pico,
+            }
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que mide cuánto espera un checkout cuando el pool está lleno."""
+
+    metricas: MetricasPool | None = None
+
+    def _do_get(self):
+        m = self.metricas
+        if m is None:
+            return super()._do_get()
+
+        lleno = self.checkedout() >= self.size() + max(self._max_overflow, 0)
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            m.registrar_espera((time.perf_counter() - t0) * 1000, timeout=True)
+            raise
+        if lleno:
+            m.registrar_espera((time.perf_counter() - t0) * 1000, timeout=False)
+        m.registrar_overflow(self.overflow())
+        return conn
+
+    def recreate(self):
+        # dispose()/invalidación crean un pool nuevo: conservar los contadores.
+        nuevo = super().recreate()
+        nuevo.metricas = self.metricas
+        return nuevo
+
+
+def _es_sqlite_memoria(url) -> bool:
+    url = str(url or "")
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite"))
+
+
+def opciones_perfil(config) -> dict:
+    perfil = str(config.get("DB_POOL_PERFIL") or PERFIL_DEFAULT).strip().lower()
+    if perfil not in PERFILES:
+        raise ValueError(f"DB_POOL_PERFIL inválido: {perfil}. Usa: {'|'.join(PERFILES)}")
+    opciones = dict(PERFILES[perfil])
+    for key, opcion in _SOBRESCRITURAS:
+        valor = str(config.get(key) or "").strip()
+        if valor:
+            opciones[opcion] = int(valor)
+    return opciones
+
+
+def _aplicar(opciones_engine: dict, url, perfil: dict) -> dict:
+    if "poolclass" in opciones_engine or _es_sqlite_memoria(url):
+        # Pool explícito (p. ej. StaticPool en tests) o SQLite en memoria: se respeta.
+        return opciones_engine
+    return {**opciones_engine, "poolclass": PoolMedido, **perfil}
+
+
+def configurar_pool(app) -> None:
+    """Aplica el perfil a SQLALCHEMY_ENGINE_OPTIONS y a los binds (antes de db.init_app)."""
+
+    perfil = opciones_perfil(app.config)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = _aplicar(
+        app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {},
+        app.config.get("SQLALCHEMY_DATABASE_URI"),
+        perfil,
+    )
+    binds = {}
+    for key, valor in (app.config.get("SQLALCHEMY_BINDS") or {}).items():
+        opciones = dict(valor) if isinstance(valor, dict) else {"url": valor}
+        binds[key] = _aplicar(opciones, opciones.get("url"), perfil)
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def _instrumentar(pool: PoolMedido) -> None:
+    m = pool.metricas = MetricasPool()
+
+    @event.listens_for(pool, "connect")
+    def _al_conectar(dbapi_connection, connection_record):
+        m.sumar("conexiones")
+
+    @event.listens_for(pool, "checkout")
+    def _al_checkout(dbapi_connection, connection_record, connection_proxy):
+        m.sumar("checkouts")
+
+    @event.listens_for(pool, "invalidate")
+    def _al_invalidar(dbapi_connection, connection_record, exception):
+        m.sumar("invalidaciones")
+
+    @event.listens_for(pool, "soft_invalidate")
+    def _al_invalidar_suave(dbapi_connection, connection_record, exception):
+        m.sumar("invalidaciones")
+
+
+def instrumentar_pool(app) -> None:
+    """Engancha la telemetría a los pools de la app (después de db.init_app)."""
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if isinstance(engine.pool, PoolMedido) and engine.pool.metricas is None:
+                _instrumentar(engine.pool)
+
+
+def estadisticas(app) -> dict:
+    """Estado actual + contadores por engine ("primaria", "replica_<n>")."""
+
+    out = {"perfil": str(app.config.get("DB_POOL_PERFIL") or PERFIL_DEFAULT)}
+    with app.app_context():
+        for key, engine in db.engines.items():
+            pool = engine.pool
+            d = {"clase": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                d.update(
+                    {
+                        "tamano": pool.size(),
+                        "max_overflow": pool._max_overflow,
+                        "en_uso": pool.checkedout(),
+                        "libres": pool.checkedin(),
+                        "overflow": max(pool.overflow(), 0),
+                        "timeout": pool.timeout(),
+                    }
+                )
+            if getattr(pool, "metricas", None) is not None:
+                d.update(pool.metricas.to_dict())
+            out[key or "primaria"] = d
+    return out
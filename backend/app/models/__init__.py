@@ -13,3 +13,7 @@ from .notificacion import Notificacion
 from .rol import Rol
 from .resena import Resena
 from .punto_entrega import PuntoEntrega
+from .clave_idempotencia import ClaveIdempotencia
+from .tarea_programada import BloqueoTarea, EjecucionTarea
+from .archivo import NotificacionArchivada, MensajeRentaArchivado
+from .subida_imagen import SubidaImagen
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class NotificacionArchivada(db.Model):
+	"""Notificaciones leídas antiguas movidas fuera de `notificaciones` (retención)."""
+
+	__tablename__ = "notificaciones_archivo"
+
+	# Mismo id que tenía en `notificaciones`
+	id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+	id_usuario = db.Column(db.Integer, nullable=False)
+	tipo = db.Column(db.String(60), nullable=False)
+	mensaje = db.Column(db.String(300), nullable=False)
+	leida = db.Column(db.Boolean, default=True, nullable=False)
+	created_at = db.Column(db.DateTime, nullable=False)
+	meta_json = db.Column(db.Text, nullable=True)
+	archivada_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+	__table_args__ = (
+		db.Index("ix_notificaciones_archivo_usuario_id", "id_usuario", "id"),
+	)
+
+
+class MensajeRentaArchivado(db.Model):
+	"""Mensajes de chat de rentas cerradas movidos fuera de `mensajes_renta`."""
+
+	__tablename__ = "mensajes_renta_archivo"
+
+	# Mismo id que tenía en `mensajes_renta`
+	id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+	id_renta = db.Column(db.Integer, nullable=False)
+	id_emisor = db.Column(db.Integer, nullable=False)
+	mensaje = db.Column(db.String(240), nullable=False)
+	created_at = db.Column(db.DateTime, nullable=False)
+	archivado_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+	__table_args__ = (
+		db.Index("ix_mensajes_renta_archivo_renta_created", "id_renta", "created_at"),
+	)
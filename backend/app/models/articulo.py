@@ -1,3 +1,7 @@
+from datetime import datetime
+
+from sqlalchemy.dialects import mysql
+
 from app.extensions import db
 
 
@@ -26,14 +30,14 @@ class Articulo(db.Model):
     titulo = db.Column(db.String(150), nullable=False)
     descripcion = db.Column(db.Text, nullable=False)
 
-    # Precios reales (BD)
+    # Precios reales (BD). NULL = el artículo no se renta en esa unidad.
     precio_por_hora = db.Column(db.Numeric(10, 2), nullable=True)
-    precio_por_dia = db.Column(db.Numeric(10, 2), nullable=False)
+    precio_por_dia = db.Column(db.Numeric(10, 2), nullable=True)
     precio_por_semana = db.Column(db.Numeric(10, 2), nullable=True)
 
     deposito = db.Column(db.Numeric(10, 2), nullable=False)
 
-    ubicacion = db.Column(db.String(255), nullable=False)
+    ubicacion = db.Column(db.String(255), nullable=False, default="")
 
     estado = db.Column(
         db.Enum("borrador", "publicado", "pausado", "eliminado"),
@@ -47,8 +51,15 @@ class Articulo(db.Model):
     rating_promedio = db.Column(db.Numeric(3, 2), default=0)
     total_resenas = db.Column(db.Integer, default=0)
 
-    creado_en = db.Column(db.DateTime)
-    actualizado_en = db.Column(db.DateTime)
+    creado_en = db.Column(db.DateTime, default=datetime.utcnow)
+    # Sello de versión (ETag del detalle y de la renta): cambia con cualquier
+    # UPDATE del artículo y se toca a mano cuando cambian sus imágenes. Con
+    # microsegundos en MySQL para que dos cambios en el mismo segundo difieran.
+    actualizado_en = db.Column(
+        db.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
 
     # =========================
     # Relaciones
@@ -86,22 +97,73 @@ class Articulo(db.Model):
     def id_propietario(self):
         return self.id_dueno
 
+    @id_propietario.setter
+    def id_propietario(self, value):
+        self.id_dueno = value
+
+    @property
+    def propietario(self):
+        return self.dueno
+
+    @property
+    def permite_horas(self) -> bool:
+        return self.precio_por_hora is not None
+
+    @property
+    def permite_dias(self) -> bool:
+        return self.precio_por_dia is not None or self.precio_por_semana is not None
+
+    @property
+    def unidad_precio(self):
+        """Unidad principal (legacy): por_dia si hay tarifa diaria, si no la que exista."""
+        if self.precio_por_dia is not None:
+            return "por_dia"
+        if self.precio_por_hora is not None:
+            return "por_hora"
+        if self.precio_por_semana is not None:
+            return "por_semana"
+        return None
+
+    @property
+    def precio_base(self):
+        return {
+            "por_dia": self.precio_por_dia,
+            "por_hora": self.precio_por_hora,
+            "por_semana": self.precio_por_semana,
+        }.get(self.unidad_precio)
+
     @property
     def monto_deposito(self):
         return self.deposito
 
+    @monto_deposito.setter
+    def monto_deposito(self, value):
+        self.deposito = value
+
     @property
     def ubicacion_texto(self):
         return self.ubicacion
 
+    @ubicacion_texto.setter
+    def ubicacion_texto(self, value):
+        self.ubicacion = value or ""
+
     @property
     def estado_publicacion(self):
         return self.estado
 
+    @estado_publicacion.setter
+    def estado_publicacion(self, value):
+        self.estado = value
+
     @property
     def es_destacado(self):
         return self.destacado
 
+    @es_destacado.setter
+    def es_destacado(self, value):
+        self.destacado = value
+
     @property
     def fecha_creacion(self):
         return self.creado_en
@@ -7,6 +7,12 @@ class ArticuloImagen(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
 
     url_imagen = db.Column(db.String(500), nullable=False)
+    # SHA-256 del contenido (almacenamiento por hash). Las filas con el mismo
+    # hash comparten archivo: son su conteo de referencias. NULL en uploads legados.
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
+    # Variantes WebP (imagenes_service); NULL mientras no se han generado.
+    url_miniatura = db.Column(db.String(500), nullable=True)
+    url_mediana = db.Column(db.String(500), nullable=True)
     es_principal = db.Column(db.Boolean, default=False)
     orden = db.Column(db.Integer, nullable=True)
 
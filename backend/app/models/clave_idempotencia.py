@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class ClaveIdempotencia(db.Model):
+    """Respuesta guardada para un header Idempotency-Key (por usuario)."""
+
+    __tablename__ = "claves_idempotencia"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    id_usuario = db.Column(
+        db.Integer,
+        db.ForeignKey("usuarios.id_usuario", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    clave = db.Column(db.String(120), nullable=False)
+    endpoint = db.Column(db.String(120), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+
+    # None mientras la petición original sigue en curso
+    status_code = db.Column(db.Integer, nullable=True)
+    response_json = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("id_usuario", "clave", name="uq_claves_idempotencia_usuario_clave"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ClaveIdempotencia id={self.id} usuario={self.id_usuario} clave={self.clave}>"
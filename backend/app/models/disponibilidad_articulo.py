@@ -19,3 +19,13 @@ class DisponibilidadArticulo(db.Model):
     motivo = db.Column(db.String(255))
 
     articulo = db.relationship("Articulo", back_populates="disponibilidades")
+
+    __table_args__ = (
+        db.Index(
+            "ix_disponibilidad_articulo_bloqueo",
+            "id_articulo",
+            "disponible",
+            "fecha_inicio",
+            "fecha_fin",
+        ),
+    )
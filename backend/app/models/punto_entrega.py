@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from sqlalchemy.dialects import mysql
+
 from app.extensions import db
 
 
@@ -11,4 +13,11 @@ class PuntoEntrega(db.Model):
     direccion = db.Column(db.Text, nullable=True)
     activo = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Sello compartido de la cache de referencia (max(updated_at)): con
+    # microsegundos en MySQL para no perder dos cambios en el mismo segundo.
+    updated_at = db.Column(
+        db.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+    )
@@ -1,5 +1,8 @@
 from datetime import datetime
 
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+
 from app.extensions import db
 
 
@@ -38,10 +41,19 @@ class Renta(db.Model):
     @property
     def modalidad(self) -> str | None:
         art = getattr(self, "articulo", None)
-        unidad = getattr(art, "unidad_precio", None) if art is not None else None
-        if unidad == "por_hora":
+        if art is None:
+            return None
+        permite_horas = getattr(art, "permite_horas", False)
+        permite_dias = getattr(art, "permite_dias", False)
+        if permite_horas and permite_dias:
+            # Ambas tarifas: una renta de días completos se trató como "dias".
+            if self.fecha_inicio and self.fecha_fin:
+                segundos = (self.fecha_fin - self.fecha_inicio).total_seconds()
+                return "dias" if segundos % 86400 == 0 else "horas"
+            return "dias"
+        if permite_horas:
             return "horas"
-        if unidad == "por_dia":
+        if permite_dias:
             return "dias"
         return None
 
@@ -56,6 +68,10 @@ class Renta(db.Model):
         default="pendiente_pago",
     )
 
+    # Estado público persistido (pestañas del inbox); lo mantiene before_insert/before_update
+    # a partir de estado_renta, devuelto y notas. Valores: ver ESTADOS_PUBLICOS.
+    estado_publico = db.Column(db.String(20), nullable=True)
+
     entregado = db.Column(db.Boolean, default=False)
     fecha_entrega = db.Column(db.DateTime, nullable=True)
 
@@ -93,8 +109,9 @@ class Renta(db.Model):
         nullable=True,
         default=datetime.utcnow,
     )
+    # Sello de versión del ETag de la renta: con microsegundos en MySQL.
     fecha_actualizacion = db.Column(
-        db.DateTime,
+        db.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"),
         nullable=True,
         default=datetime.utcnow,
         onupdate=datetime.utcnow,
@@ -113,5 +130,47 @@ class Renta(db.Model):
         lazy="joined",
     )
 
+    __table_args__ = (
+        # Traslapes por artículo (crear_renta, ocupación, filtro de catálogo por disponibilidad)
+        db.Index("ix_rentas_articulo_estado_fechas", "id_articulo", "estado_renta", "fecha_inicio", "fecha_fin"),
+        # Conteos por pestaña del inbox (GROUP BY estado_publico por rol)
+        db.Index("ix_rentas_arrendatario_estado_publico", "id_arrendatario", "estado_publico"),
+        db.Index("ix_rentas_propietario_estado_publico", "id_propietario", "estado_publico"),
+    )
+
+    def calcular_estado_publico(self) -> str:
+        """Estado público (bonito) derivado de los valores internos de BD."""
+
+        estado_interno = self.estado_renta or "pendiente_pago"
+        if estado_interno == "en_curso":
+            return "devuelta" if self.devuelto else "en_uso"
+        if estado_interno == "completada":
+            return "finalizada"
+        if estado_interno == "con_incidente":
+            return "incidente"
+        if estado_interno == "cancelada":
+            notas = self.notas_devolucion or ""
+            return "expirada" if "EXPIRACION_PAGO" in notas else "cancelada"
+        return estado_interno
+
     def __repr__(self) -> str:
         return f"<Renta id={self.id} articulo={self.id_articulo} estado={self.estado_renta}>"
+
+
+ESTADOS_PUBLICOS = (
+    "pendiente_pago",
+    "pagada",
+    "confirmada",
+    "en_uso",
+    "devuelta",
+    "incidente",
+    "finalizada",
+    "cancelada",
+    "expirada",
+)
+
+
+@event.listens_for(Renta, "before_insert")
+@event.listens_for(Renta, "before_update")
+def _sincronizar_estado_publico(mapper, connection, target: Renta) -> None:
+    target.estado_publico = target.calcular_estado_publico()
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class SubidaImagen(db.Model):
+    """Sesión de upload por chunks (init -> PUT por offset -> finalizar)."""
+
+    __tablename__ = "subidas_imagenes"
+
+    id = db.Column(db.String(32), primary_key=True)
+
+    id_articulo = db.Column(
+        db.Integer,
+        db.ForeignKey("articulos.id_articulo", ondelete="CASCADE"),
+        nullable=False,
+    )
+    id_usuario = db.Column(db.Integer, db.ForeignKey("usuarios.id_usuario"), nullable=False)
+
+    nombre_original = db.Column(db.String(255), nullable=True)
+    tamano_total = db.Column(db.BigInteger, nullable=False)
+    sha256_esperado = db.Column(db.String(64), nullable=False)
+
+    # Bytes contiguos recibidos desde el inicio (siguiente offset esperado).
+    recibido = db.Column(db.BigInteger, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_subidas_imagenes_expires_at", "expires_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SubidaImagen {self.id} articulo={self.id_articulo} {self.recibido}/{self.tamano_total}>"
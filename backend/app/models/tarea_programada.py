@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class BloqueoTarea(db.Model):
+    """Fila de lock con vencimiento (lease) para elegir un único ejecutor de tareas."""
+
+    __tablename__ = "bloqueos_tareas"
+
+    nombre = db.Column(db.String(120), primary_key=True)
+    owner = db.Column(db.String(160), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<BloqueoTarea {self.nombre} owner={self.owner} expires_at={self.expires_at}>"
+
+
+class EjecucionTarea(db.Model):
+    """Historial de ejecuciones de tareas de mantenimiento."""
+
+    __tablename__ = "ejecuciones_tareas"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    nombre = db.Column(db.String(120), nullable=False)
+    owner = db.Column(db.String(160), nullable=True)
+
+    # en_curso | ok | error | omitida
+    estado = db.Column(db.String(20), nullable=False, default="en_curso")
+    resultado = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    inicio = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    fin = db.Column(db.DateTime, nullable=True)
+    duracion_ms = db.Column(db.Integer, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_ejecuciones_tareas_nombre_inicio", "nombre", "inicio"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<EjecucionTarea id={self.id} {self.nombre} estado={self.estado}>"
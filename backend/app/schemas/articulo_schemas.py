@@ -13,6 +13,8 @@ class ArticuloImagenSchema(ma.SQLAlchemyAutoSchema):
 
     id = ma.auto_field()
     url_imagen = ma.auto_field()
+    url_miniatura = ma.auto_field()
+    url_mediana = ma.auto_field()
     es_principal = ma.auto_field()
     orden = ma.auto_field()
 
@@ -43,8 +45,10 @@ class ArticuloListadoSchema(ma.SQLAlchemyAutoSchema):
     # Compatibilidad con el frontend
     precio_renta_dia = fields.Method("get_precio_renta_dia")
     precio_renta_hora = fields.Method("get_precio_renta_hora")
+    precio_renta_semana = fields.Method("get_precio_renta_semana")
     tarifa_por_dia = fields.Method("get_precio_renta_dia")
     tarifa_por_hora = fields.Method("get_precio_renta_hora")
+    tarifa_por_semana = fields.Method("get_precio_renta_semana")
     deposito_garantia = fields.Float(attribute="monto_deposito")
 
     propietario_nombre = fields.Method("get_propietario_nombre")
@@ -66,29 +70,29 @@ class ArticuloListadoSchema(ma.SQLAlchemyAutoSchema):
         except Exception:
             return 0.0
 
-    def get_precio_renta_dia(self, obj):
-        # Compat: BD real solo tiene precio_base + unidad_precio.
-        if getattr(obj, "unidad_precio", None) != "por_dia":
-            return None
+    @staticmethod
+    def _precio_o_none(valor):
         try:
-            return float(getattr(obj, "precio_base", None))
+            return float(valor) if valor is not None else None
         except Exception:
             return None
 
+    def get_precio_renta_dia(self, obj):
+        return self._precio_o_none(getattr(obj, "precio_por_dia", None))
+
     def get_precio_renta_hora(self, obj):
-        if getattr(obj, "unidad_precio", None) != "por_hora":
-            return None
-        try:
-            return float(getattr(obj, "precio_base", None))
-        except Exception:
-            return None
+        return self._precio_o_none(getattr(obj, "precio_por_hora", None))
+
+    def get_precio_renta_semana(self, obj):
+        return self._precio_o_none(getattr(obj, "precio_por_semana", None))
 
     def get_imagen_principal(self, obj):
         imagenes = getattr(obj, "imagenes", None)
         if not imagenes:
             return None
         principal = next((img for img in imagenes if img.es_principal), imagenes[0])
-        return principal.url_imagen
+        # Las tarjetas del listado usan la miniatura; el original mientras no exista.
+        return principal.url_miniatura or principal.url_imagen
 
 
 class ArticuloCreateSchema(ma.Schema):
@@ -97,6 +101,7 @@ class ArticuloCreateSchema(ma.Schema):
     id_categoria = fields.Integer(required=True)
     precio_renta_dia = fields.Float(required=False, allow_none=True)
     precio_renta_hora = fields.Float(required=False, allow_none=True)
+    precio_renta_semana = fields.Float(required=False, allow_none=True)
     unidad_precio = fields.String(required=False, allow_none=True)
     deposito_garantia = fields.Float(required=False, allow_none=True)
     ubicacion_texto = fields.String(required=False, allow_none=True)
@@ -118,10 +123,9 @@ class ArticuloCreateSchema(ma.Schema):
 
     @validates_schema
     def validate_tarifas(self, data, **kwargs):
-        dia = data.get("precio_renta_dia")
-        hora = data.get("precio_renta_hora")
-        if (dia is None or float(dia) <= 0) and (hora is None or float(hora) <= 0):
-            raise ValidationError("Debes indicar un precio por día y/o por hora.")
+        tarifas = (data.get(k) for k in ("precio_renta_dia", "precio_renta_hora", "precio_renta_semana"))
+        if not any(v is not None and float(v) > 0 for v in tarifas):
+            raise ValidationError("Debes indicar un precio por hora, día y/o semana.")
 
 
 class ArticuloDetalleSchema(ArticuloListadoSchema):
@@ -143,6 +147,14 @@ class ArticuloDetalleSchema(ArticuloListadoSchema):
 
     imagenes = fields.Method("get_imagenes")
 
+    def get_imagen_principal(self, obj):
+        imagenes = getattr(obj, "imagenes", None)
+        if not imagenes:
+            return None
+        principal = next((img for img in imagenes if img.es_principal), imagenes[0])
+        # En detalle basta la variante mediana (no la miniatura del listado).
+        return principal.url_mediana or principal.url_imagen
+
     def get_imagenes(self, obj):
         imagenes = getattr(obj, "imagenes", None)
         if not imagenes:
@@ -156,6 +168,8 @@ class ArticuloDetalleSchema(ArticuloListadoSchema):
             {
                 "id": img.id,
                 "url_imagen": img.url_imagen,
+                "url_miniatura": img.url_miniatura,
+                "url_mediana": img.url_mediana,
                 "es_principal": bool(img.es_principal),
                 "orden": img.orden,
             }
@@ -168,6 +182,7 @@ class ArticuloUpdateSchema(ma.Schema):
     descripcion = fields.String(required=False)
     precio_renta_dia = fields.Float(required=False, allow_none=True)
     precio_renta_hora = fields.Float(required=False, allow_none=True)
+    precio_renta_semana = fields.Float(required=False, allow_none=True)
     unidad_precio = fields.String(required=False, allow_none=True)
     deposito_garantia = fields.Float(required=False, allow_none=True)
     estado_publicacion = fields.String(required=False, allow_none=True)
@@ -188,15 +203,9 @@ class ArticuloUpdateSchema(ma.Schema):
 
     @validates_schema
     def validate_tarifas(self, data, **kwargs):
-        # Si el payload toca tarifas, exigir al menos una modalidad activa.
-        touched = ("precio_renta_dia" in data) or ("precio_renta_hora" in data)
-        if not touched:
-            return
-
-        dia = data.get("precio_renta_dia")
-        hora = data.get("precio_renta_hora")
-
-        dia_ok = (dia is not None) and (float(dia) > 0)
-        hora_ok = (hora is not None) and (float(hora) > 0)
-        if not dia_ok and not hora_ok:
-            raise ValidationError("Debes indicar un precio por día y/o por hora.")
+        # Si el payload toca tarifas, no permitir negativos; el mínimo de una
+        # tarifa activa se valida en la ruta contra lo ya guardado.
+        for campo in ("precio_renta_dia", "precio_renta_hora", "precio_renta_semana"):
+            v = data.get(campo)
+            if v is not None and float(v) < 0:
+                raise ValidationError("Las tarifas no pueden ser negativas.", field_name=campo)
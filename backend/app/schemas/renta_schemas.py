@@ -1,3 +1,5 @@
+from datetime import timezone
+
 from marshmallow import fields, validates_schema, ValidationError, validate
 
 from app.extensions.ma import ma
@@ -28,3 +30,37 @@ class RentaCreateSchema(ma.Schema):
                 "La fecha_fin debe ser mayor que fecha_inicio",
                 field_name="fecha_fin",
             )
+
+
+class VentanaCotizacionSchema(ma.Schema):
+    # Con zona (p. ej. +02:00) se convierten a UTC naive, como las fechas en BD.
+    fecha_inicio = fields.NaiveDateTime(required=True, timezone=timezone.utc)
+    fecha_fin = fields.NaiveDateTime(required=True, timezone=timezone.utc)
+
+
+class CalendarioCotizacionSchema(ma.Schema):
+    anio = fields.Integer(required=True, validate=validate.Range(min=2000, max=2100))
+    mes = fields.Integer(required=True, validate=validate.Range(min=1, max=12))
+    duracion = fields.Integer(required=True, validate=validate.Range(min=1, max=24 * 30))
+    modalidad = fields.String(
+        required=False,
+        load_default="dias",
+        validate=validate.OneOf(["horas", "dias"]),
+    )
+    hora_inicio = fields.Integer(required=False, load_default=0, validate=validate.Range(min=0, max=23))
+
+
+class RentaCotizacionSchema(ma.Schema):
+    """
+    Cotización sin crear renta: varias ventanas candidatas y/o
+    la rejilla de precios de un mes para una duración fija.
+    """
+
+    id_articulo = fields.Integer(required=True)
+    ventanas = fields.List(fields.Nested(VentanaCotizacionSchema), load_default=list)
+    calendario = fields.Nested(CalendarioCotizacionSchema, required=False, load_default=None)
+
+    @validates_schema
+    def validar_contenido(self, data, **kwargs):
+        if not data.get("ventanas") and not data.get("calendario"):
+            raise ValidationError("Envía al menos una ventana o un calendario.", field_name="ventanas")
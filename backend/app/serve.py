@@ -0,0 +1,153 @@
+"""Servidor de producción: gunicorn con el modelo de worker elegido.
+
+Uso (desde backend/):
+    python -m app.serve [--modo sync|gthread|gevent] [--workers N] [--bind 0.0.0.0:8000]
+    python -m app.serve --modo gthread --imprimir   # muestra el comando sin arrancar
+
+Cada modo fija el perfil del pool de BD (extensions/pool) y los workers por
+defecto según los CPUs disponibles:
+- sync:    2*CPU+1 workers, un request por proceso        -> perfil web-sync
+- gthread: CPU+1 workers con SERVE_THREADS hilos cada uno -> web-sync, pool_size = hilos
+- gevent:  CPU workers con SERVE_WORKER_CONNECTIONS greenlets -> perfil gevent
+           (requiere `pip install gevent`)
+
+sync y gthread arrancan con --preload: la app se importa una vez en el
+maestro y los workers la comparten por copy-on-write; tras el fork cada worker
+descarta las conexiones heredadas (gunicorn_conf.post_fork). gevent no precarga
+para que el monkey patching ocurra antes de importar la app.
+
+Los workers se reciclan tras SERVE_MAX_REQUESTS (+ jitter) requests para acotar
+la memoria. WEB_CONCURRENCY y PORT se respetan como en cualquier despliegue de
+gunicorn.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+from app.extensions.pool import opciones_perfil
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+MODOS = {
+    "sync": {"clase": "sync", "perfil": "web-sync", "preload": True},
+    "gthread": {"clase": "gthread", "perfil": "web-sync", "preload": True},
+    "gevent": {"clase": "gevent", "perfil": "gevent", "preload": False},
+}
+
+SERVE_THREADS_DEFAULT = 4
+SERVE_WORKER_CONNECTIONS_DEFAULT = 100
+SERVE_MAX_REQUESTS_DEFAULT = 1000
+SERVE_MAX_REQUESTS_JITTER_DEFAULT = 100
+SERVE_TIMEOUT_DEFAULT = 30
+SERVE_KEEPALIVE_DEFAULT = 5
+
+
+def _env_int(env: dict, key: str, default: int, minimo: int = 0) -> int:
+    try:
+        return max(minimo, int(env.get(key, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def cpus_disponibles() -> int:
+    # En contenedores cuenta la afinidad del proceso, no los CPUs del host.
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def workers_por_defecto(modo: str, cpus: int) -> int:
+    if modo == "sync":
+        return 2 * cpus + 1
+    if modo == "gthread":
+        return cpus + 1
+    return cpus
+
+
+def construir(args, environ=None) -> tuple[list[str], dict]:
+    """Comando de gunicorn y entorno (perfil de pool incluido) para el modo pedido."""
+
+    env = dict(os.environ if environ is None else environ)
+    modo = MODOS[args.modo]
+    workers = args.workers or _env_int(env, "WEB_CONCURRENCY", 0) or workers_por_defecto(args.modo, cpus_disponibles())
+    preload = modo["preload"] if args.preload is None else args.preload
+
+    env.setdefault("APP_ENV", "production")
+    env.setdefault("DB_POOL_PERFIL", modo["perfil"])
+
+    argv = [
+        sys.executable, "-m", "gunicorn",
+        "--chdir", str(BACKEND_DIR),
+        "--config", "python:gunicorn_conf",
+        "--worker-class", modo["clase"],
+        "--workers", str(workers),
+        "--bind", args.bind or f"0.0.0.0:{env.get('PORT', '8000')}",
+        "--max-requests", str(_env_int(env, "SERVE_MAX_REQUESTS", SERVE_MAX_REQUESTS_DEFAULT)),
+        "--max-requests-jitter", str(_env_int(env, "SERVE_MAX_REQUESTS_JITTER", SERVE_MAX_REQUESTS_JITTER_DEFAULT)),
+        "--timeout", str(_env_int(env, "SERVE_TIMEOUT", SERVE_TIMEOUT_DEFAULT, minimo=1)),
+        "--keep-alive", str(_env_int(env, "SERVE_KEEPALIVE", SERVE_KEEPALIVE_DEFAULT, minimo=1)),
+    ]
+    if args.modo == "gthread":
+        threads = args.threads or _env_int(env, "SERVE_THREADS", SERVE_THREADS_DEFAULT, minimo=1)
+        argv += ["--threads", str(threads)]
+        # Una conexión por hilo: ningún hilo espera al pool en carga normal.
+        if not env.get("DB_POOL_SIZE"):
+            env["DB_POOL_SIZE"] = str(max(threads, opciones_perfil({"DB_POOL_PERFIL": modo["perfil"]})["pool_size"]))
+    if args.modo == "gevent":
+        conexiones = _env_int(env, "SERVE_WORKER_CONNECTIONS", SERVE_WORKER_CONNECTIONS_DEFAULT, minimo=1)
+        argv += ["--worker-connections", str(conexiones)]
+    if preload:
+        argv.append("--preload")
+    if os.path.isdir("/dev/shm"):
+        # Heartbeat de workers en memoria: un /tmp lento en contenedores los haría parecer colgados.
+        argv += ["--worker-tmp-dir", "/dev/shm"]
+    argv.append(args.app)
+    return argv, env
+
+
+def _resumen(argv: list[str], env: dict) -> str:
+    workers = int(argv[argv.index("--workers") + 1])
+    pool = opciones_perfil(env)
+    por_worker = pool["pool_size"] + pool["max_overflow"]
+    return (
+        f"[serve] {argv[argv.index('--worker-class') + 1]} x{workers} workers, "
+        f"pool {env['DB_POOL_PERFIL']} ({pool['pool_size']}+{pool['max_overflow']}/worker, "
+        f"hasta {workers * por_worker} conexiones por BD)"
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--modo", choices=tuple(MODOS), default=os.getenv("SERVE_MODO", "gthread"))
+    parser.add_argument("--workers", type=int, default=None, help="Default: según CPUs y modo (o WEB_CONCURRENCY).")
+    parser.add_argument("--threads", type=int, default=None, help="Hilos por worker en gthread (default: SERVE_THREADS).")
+    parser.add_argument("--bind", default=None, help="Default: 0.0.0.0:$PORT (8000).")
+    parser.add_argument("--app", default="wsgi:app")
+    parser.add_argument("--preload", dest="preload", action="store_true", default=None)
+    parser.add_argument("--no-preload", dest="preload", action="store_false")
+    parser.add_argument("--imprimir", action="store_true", help="Imprime el comando y sale.")
+    args = parser.parse_args(argv)
+
+    if args.modo == "gevent" and importlib.util.find_spec("gevent") is None:
+        parser.error("El modo gevent requiere el paquete gevent (pip install gevent).")
+
+    comando, env = construir(args)
+    print(_resumen(comando, env), file=sys.stderr)
+    if args.imprimir:
+        print(" ".join(comando))
+        return
+
+    # Proceso nuevo: la config (perfil de pool) se lee con este entorno y,
+    # en gevent, nada de la app queda importado antes del monkey patching.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execvpe(sys.executable, comando, env)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""Motor de cotización: precio de muchas ventanas candidatas en una sola llamada.
+
+Las ventanas se procesan por columnas (lista de duraciones en horas): el precio
+depende solo de la duración, así que se calcula una vez por duración distinta
+y se reparte al resto. La disponibilidad sale del bitset de ocupación del
+artículo (ocupacion_service), sin una query por ventana.
+
+Tarifas: precio_por_hora / precio_por_dia / precio_por_semana del artículo
+(cualquiera puede faltar). Se elige la combinación de semanas + días + horas
+más barata que cubra la duración con un pricer de programación dinámica; los
+resultados se cachean por (artículo, tarifas, duración).
+"""
+
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import current_app
+
+from app.models.articulo import Articulo
+from app.services import ocupacion_service
+from app.utils.errors import ApiError
+
+
+COTIZACION_MAX_VENTANAS = 200
+COTIZACION_MAX_HORAS = 24 * 366
+COTIZACION_CACHE_MAX_DEFAULT = 20000
+
+HORAS_DIA = 24
+HORAS_SEMANA = 24 * 7
+
+
+def _a_centavos(valor) -> int | None:
+    if valor is None:
+        return None
+    try:
+        c = int((Decimal(str(valor)) * 100).quantize(Decimal("1")))
+    except Exception:
+        return None
+    return c if c > 0 else None
+
+
+def tarifas_articulo(articulo: Articulo) -> tuple[int | None, int | None, int | None]:
+    """(hora, dia, semana) en centavos; None = tarifa no ofrecida."""
+
+    return (
+        _a_centavos(articulo.precio_por_hora),
+        _a_centavos(articulo.precio_por_dia),
+        _a_centavos(articulo.precio_por_semana),
+    )
+
+
+def _horas_de(fecha_inicio: datetime, fecha_fin: datetime) -> int:
+    segundos = (fecha_fin - fecha_inicio).total_seconds()
+    return max(1, -int(-segundos // 3600))  # ceil
+
+
+# =========================
+# Pricer (programación dinámica)
+# =========================
+
+_INF = float("inf")
+
+
+def _tabla_dp(tarifas: tuple[int | None, int | None, int | None], max_horas: int) -> list[tuple]:
+    """Tabla t[h] = (costo, unidades, semanas, dias, horas) para cubrir al menos h horas.
+
+    t[h] = min(t[h-1] + hora, t[h-24] + dia, t[h-168] + semana), con índices
+    negativos recortados a 0 (una unidad puede sobrar). O(max_horas).
+    Desempata por menos unidades cobradas.
+    """
+
+    ph, pd, pw = tarifas
+    pasos = [
+        (paso, precio, idx)
+        for paso, precio, idx in ((1, ph, 4), (HORAS_DIA, pd, 3), (HORAS_SEMANA, pw, 2))
+        if precio is not None
+    ]
+    tabla: list[tuple] = [(0, 0, 0, 0, 0)]
+    for h in range(1, max_horas + 1):
+        mejor = (_INF,)
+        for paso, precio, idx in pasos:
+            prev = tabla[max(0, h - paso)]
+            if prev[0] == _INF:
+                continue
+            cand = list(prev)
+            cand[0] += precio
+            cand[1] += 1
+            cand[idx] += 1
+            cand = tuple(cand)
+            if cand < mejor:
+                mejor = cand
+        tabla.append(mejor if mejor[0] != _INF else (_INF, 0, 0, 0, 0))
+    return tabla
+
+
+def _resultado(fila: tuple) -> dict:
+    total, _, semanas, dias, horas = fila
+    return {
+        "precio_total": total / 100,
+        "desglose": {"semanas": semanas, "dias": dias, "horas": horas},
+    }
+
+
+_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def limpiar_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def estadisticas() -> dict:
+    with _cache_lock:
+        return {"items": len(_cache), **_stats}
+
+
+def precios_por_duracion(id_articulo: int | None, tarifas, duraciones) -> dict[int, dict]:
+    """Precio óptimo por duración (horas), cacheado por (artículo, tarifas, duración).
+
+    Las tarifas forman parte de la clave, así que editar precios invalida solo
+    por construcción. Los faltantes se resuelven con una sola tabla DP hasta la
+    duración más larga pedida.
+    """
+
+    if all(t is None for t in tarifas):
+        raise ApiError("El artículo no tiene tarifas configuradas.", status_code=400)
+
+    out: dict[int, dict] = {}
+    faltantes: list[int] = []
+    with _cache_lock:
+        for h in set(duraciones):
+            r = _cache.get((id_articulo, tarifas, h))
+            if r is not None:
+                _cache.move_to_end((id_articulo, tarifas, h))
+                out[h] = r
+            else:
+                faltantes.append(h)
+        _stats["hits"] += len(out)
+        _stats["misses"] += len(faltantes)
+
+    if faltantes:
+        tabla = _tabla_dp(tarifas, max(faltantes))
+        nuevos = {}
+        for h in faltantes:
+            if tabla[h][0] == _INF:
+                raise ApiError("El artículo no tiene tarifas para esa duración.", status_code=400)
+            nuevos[h] = _resultado(tabla[h])
+        out.update(nuevos)
+        maximo = _get_config_int("COTIZACION_CACHE_MAX", COTIZACION_CACHE_MAX_DEFAULT, minimo=1)
+        with _cache_lock:
+            for h, r in nuevos.items():
+                _cache[(id_articulo, tarifas, h)] = r
+            while len(_cache) > maximo:
+                _cache.popitem(last=False)
+    return out
+
+
+def precio_renta(articulo: Articulo, horas: int) -> dict:
+    """Precio óptimo de una renta de `horas` horas con las tarifas del artículo."""
+
+    if horas > COTIZACION_MAX_HORAS:
+        raise ApiError("La renta es demasiado larga.", status_code=400)
+    return precios_por_duracion(articulo.id_articulo, tarifas_articulo(articulo), [horas])[horas]
+
+
+def cotizar_ventanas(articulo: Articulo, ventanas: list[tuple[datetime, datetime]]) -> list[dict]:
+    """Precio y disponibilidad de cada ventana (inicio, fin), en el mismo orden."""
+
+    if len(ventanas) > COTIZACION_MAX_VENTANAS:
+        raise ApiError(f"Máximo {COTIZACION_MAX_VENTANAS} ventanas por cotización.", status_code=400)
+    if not ventanas:
+        return []
+
+    inicios = [v[0] for v in ventanas]
+    fines = [v[1] for v in ventanas]
+    for ini, fin in ventanas:
+        if fin <= ini:
+            raise ApiError("La fecha_fin debe ser mayor que fecha_inicio.", status_code=400)
+
+    duraciones = [_horas_de(i, f) for i, f in ventanas]
+    if max(duraciones) > COTIZACION_MAX_HORAS:
+        raise ApiError("La ventana a cotizar es demasiado larga.", status_code=400)
+
+    precios = precios_por_duracion(articulo.id_articulo, tarifas_articulo(articulo), duraciones)
+
+    bitmap = ocupacion_service.bitmaps_para_rango(
+        [articulo.id_articulo], min(inicios), max(fines)
+    )[articulo.id_articulo]
+    ahora = datetime.utcnow()
+
+    out = []
+    for ini, fin, horas in zip(inicios, fines, duraciones):
+        precio = precios[horas]
+        out.append(
+            {
+                "fecha_inicio": ini.isoformat(),
+                "fecha_fin": fin.isoformat(),
+                "horas": horas,
+                "precio_total": precio["precio_total"],
+                "desglose": precio["desglose"],
+                "disponible": ini >= ahora and bitmap.libre(ini, fin),
+            }
+        )
+    return out
+
+
+def calendario_mes(
+    articulo: Articulo,
+    anio: int,
+    mes: int,
+    duracion: int,
+    modalidad: str = "dias",
+    hora_inicio: int = 0,
+) -> dict:
+    """Rejilla del mes: para cada día, precio y disponibilidad empezando ese día.
+
+    Todas las celdas comparten duración, así que el precio se calcula una vez.
+    """
+
+    if not (1 <= mes <= 12):
+        raise ApiError("mes inválido.", status_code=400)
+    if not (0 <= hora_inicio <= 23):
+        raise ApiError("hora_inicio debe estar entre 0 y 23.", status_code=400)
+    if modalidad not in ("horas", "dias"):
+        raise ApiError("modalidad inválida. Usa: horas|dias", status_code=400)
+    if duracion < 1:
+        raise ApiError("duracion debe ser mayor a 0.", status_code=400)
+
+    delta = timedelta(hours=duracion) if modalidad == "horas" else timedelta(days=duracion)
+    n_dias = calendar.monthrange(anio, mes)[1]
+    ventanas = []
+    for d in range(1, n_dias + 1):
+        ini = datetime(anio, mes, d, hora_inicio)
+        ventanas.append((ini, ini + delta))
+
+    celdas = cotizar_ventanas(articulo, ventanas)
+    return {
+        "mes": f"{anio:04d}-{mes:02d}",
+        "modalidad": modalidad,
+        "duracion": duracion,
+        "hora_inicio": hora_inicio,
+        "precio_total": celdas[0]["precio_total"],
+        "desglose": celdas[0]["desglose"],
+        "dias": [
+            {"fecha": c["fecha_inicio"][:10], "disponible": c["disponible"]}
+            for c in celdas
+        ],
+    }
+
+
+def cotizar(data: dict) -> dict:
+    articulo: Articulo | None = Articulo.query.get(data["id_articulo"])
+    if not articulo or articulo.estado_publicacion == "eliminado":
+        raise ApiError("El artículo especificado no existe.", status_code=404)
+
+    ph, pd, pw = tarifas_articulo(articulo)
+    out = {
+        "id_articulo": articulo.id_articulo,
+        "tarifas": {
+            "por_hora": ph / 100 if ph is not None else None,
+            "por_dia": pd / 100 if pd is not None else None,
+            "por_semana": pw / 100 if pw is not None else None,
+        },
+        "ventanas": cotizar_ventanas(
+            articulo,
+            [(v["fecha_inicio"], v["fecha_fin"]) for v in (data.get("ventanas") or [])],
+        ),
+    }
+
+    cal = data.get("calendario")
+    if cal:
+        out["calendario"] = calendario_mes(
+            articulo,
+            anio=cal["anio"],
+            mes=cal["mes"],
+            duracion=cal["duracion"],
+            modalidad=cal.get("modalidad") or "dias",
+            hora_inicio=cal.get("hora_inicio") or 0,
+        )
+    return out
@@ -1,8 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from sqlalchemy import and_
+from sqlalchemy import and_, exists, not_
 
 from app.extensions.db import db
+from app.models.articulo import Articulo
 from app.models.disponibilidad_articulo import DisponibilidadArticulo
 from app.models.renta import Renta
 from app.utils.errors import ApiError
@@ -33,13 +34,22 @@ def validar_disponibilidad_articulo(id_articulo: int, fecha_inicio: datetime, fe
     - Rentas existentes en estados que bloquean el calendario.
     """
 
+    # Lecturas con lock compartido (FOR SHARE): leen lo último confirmado
+    # aunque la transacción tenga un snapshot anterior. Sin deadlocks entre
+    # reservas porque antes se toma el lock exclusivo del artículo
+    # (reserva_lock_service).
+
     # 1) Bloqueos en disponibilidad_articulo
-    bloqueos = DisponibilidadArticulo.query.filter(
-        DisponibilidadArticulo.id_articulo == id_articulo,
-        DisponibilidadArticulo.disponible == False,  # noqa: E712
-        DisponibilidadArticulo.fecha_inicio < fecha_fin,
-        DisponibilidadArticulo.fecha_fin > fecha_inicio,
-    ).all()
+    bloqueos = (
+        DisponibilidadArticulo.query.filter(
+            DisponibilidadArticulo.id_articulo == id_articulo,
+            DisponibilidadArticulo.disponible == False,  # noqa: E712
+            DisponibilidadArticulo.fecha_inicio < fecha_fin,
+            DisponibilidadArticulo.fecha_fin > fecha_inicio,
+        )
+        .with_for_update(read=True)
+        .all()
+    )
 
     if bloqueos:
         raise ApiError(
@@ -65,3 +75,109 @@ def validar_disponibilidad_articulo(id_articulo: int, fecha_inicio: datetime, fe
             status_code=409,
             payload={"id_renta_conflictiva": renta_conflictiva.id},
         )
+
+
+def filtro_articulo_disponible(fecha_inicio: datetime, fecha_fin: datetime):
+    """Condición SQL "el artículo está libre en [fecha_inicio, fecha_fin)".
+
+    Son dos NOT EXISTS correlacionados sobre Articulo.id_articulo (anti-join),
+    así que un listado filtra por disponibilidad en una sola query en vez de
+    una consulta de traslape por artículo. Se apoyan en los índices
+    ix_rentas_articulo_estado_fechas e ix_disponibilidad_articulo_bloqueo.
+    """
+
+    renta_conflictiva = exists().where(
+        Renta.id_articulo == Articulo.id_articulo,
+        Renta.estado_renta.in_(ESTADOS_RENTA_BLOQUEO),
+        Renta.fecha_inicio < fecha_fin,
+        Renta.fecha_fin > fecha_inicio,
+    )
+    bloqueo = exists().where(
+        DisponibilidadArticulo.id_articulo == Articulo.id_articulo,
+        DisponibilidadArticulo.disponible == False,  # noqa: E712
+        DisponibilidadArticulo.fecha_inicio < fecha_fin,
+        DisponibilidadArticulo.fecha_fin > fecha_inicio,
+    )
+    return and_(not_(renta_conflictiva), not_(bloqueo))
+
+
+def _ceil_hora(dt: datetime) -> datetime:
+    base = dt.replace(minute=0, second=0, microsecond=0)
+    return base if base == dt else base + timedelta(hours=1)
+
+
+def _intervalos_ocupados(id_articulo: int, desde: datetime, hasta: datetime) -> list[tuple[datetime, datetime]]:
+    """Rentas activas + bloqueos en [desde, hasta), fusionados y ordenados.
+
+    Cada query viene ordenada por fecha_inicio desde la BD; se mezclan con un
+    merge lineal y se fusionan traslapes/contiguos en la misma pasada.
+    """
+
+    rentas = (
+        db.session.query(Renta.fecha_inicio, Renta.fecha_fin)
+        .filter(
+            Renta.id_articulo == id_articulo,
+            Renta.estado_renta.in_(ESTADOS_RENTA_BLOQUEO),
+            Renta.fecha_inicio < hasta,
+            Renta.fecha_fin > desde,
+        )
+        .order_by(Renta.fecha_inicio.asc())
+        .all()
+    )
+    bloqueos = (
+        db.session.query(DisponibilidadArticulo.fecha_inicio, DisponibilidadArticulo.fecha_fin)
+        .filter(
+            DisponibilidadArticulo.id_articulo == id_articulo,
+            DisponibilidadArticulo.disponible == False,  # noqa: E712
+            DisponibilidadArticulo.fecha_inicio < hasta,
+            DisponibilidadArticulo.fecha_fin > desde,
+        )
+        .order_by(DisponibilidadArticulo.fecha_inicio.asc())
+        .all()
+    )
+
+    fusionados: list[list[datetime]] = []
+    i = j = 0
+    while i < len(rentas) or j < len(bloqueos):
+        if j >= len(bloqueos) or (i < len(rentas) and rentas[i][0] <= bloqueos[j][0]):
+            ini, fin = rentas[i]
+            i += 1
+        else:
+            ini, fin = bloqueos[j]
+            j += 1
+        if fusionados and ini <= fusionados[-1][1]:
+            if fin > fusionados[-1][1]:
+                fusionados[-1][1] = fin
+        else:
+            fusionados.append([ini, fin])
+    return [(a, b) for a, b in fusionados]
+
+
+def siguientes_ventanas_libres(
+    id_articulo: int,
+    duracion: timedelta,
+    desde: datetime,
+    hasta: datetime,
+    limite: int = 3,
+) -> list[dict]:
+    """Primeras `limite` ventanas libres de longitud `duracion` en [desde, hasta).
+
+    Las ventanas empiezan en hora exacta (misma regla que crear_renta para
+    rentas por horas) y no se traslapan entre sí. Lineal en el número de
+    intervalos ocupados del horizonte.
+    """
+
+    out: list[dict] = []
+    cursor = _ceil_hora(desde)
+    ocupados = _intervalos_ocupados(id_articulo, cursor, hasta)
+    ocupados.append((hasta, hasta))  # centinela: hueco final hasta el horizonte
+
+    for ini_ocupado, fin_ocupado in ocupados:
+        limite_hueco = min(ini_ocupado, hasta)
+        while len(out) < limite and cursor + duracion <= limite_hueco:
+            out.append({"inicio": cursor.isoformat(), "fin": (cursor + duracion).isoformat()})
+            cursor = cursor + duracion
+        if len(out) >= limite:
+            break
+        cursor = max(cursor, _ceil_hora(fin_ocupado))
+    return out
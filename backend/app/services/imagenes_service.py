@@ -0,0 +1,293 @@
+"""Pipeline de imágenes de artículos: guardado en streaming, validación y variantes.
+
+- El upload se copia a disco por bloques (sin cargar el archivo completo en
+  memoria) y se corta en IMAGENES_MAX_BYTES.
+- Almacenamiento direccionado por contenido: el archivo queda en
+  `<ab>/<cd>/<sha256><ext>` (dos niveles de shards por los primeros bytes del
+  hash). Fotos idénticas comparten archivo; las filas de ArticuloImagen con el
+  mismo sha256 son sus referencias. Los requests nunca borran archivos del
+  almacén: sin serializar por hash, un upload que deduplica contra un archivo
+  y el borrado de su última fila (o el rollback de otro upload) se pisarían.
+  Los archivos sin referencias los recupera `flask uploads gc` tras su periodo
+  de gracia; deduplicar renueva el mtime del archivo para quedar dentro de él.
+- El tipo real se valida con los magic bytes del primer bloque (JPEG, PNG,
+  WebP); la extensión del nombre no cuenta.
+- Las variantes WebP (miniatura para tarjetas del listado y mediana para el
+  detalle) se generan en un pool de procesos fuera del hilo del request; al
+  terminar se guardan sus URLs en la fila de ArticuloImagen. Mientras no
+  existan, los schemas caen a la imagen original.
+
+Pillow es opcional: sin él se guardan solo los originales.
+"""
+
+import atexit
+import hashlib
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from app.extensions.db import db
+from app.models.articulo import Articulo
+from app.models.articulo_imagen import ArticuloImagen
+from app.utils.errors import ApiError
+
+try:  # Pillow es opcional
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depende del entorno
+    Image = None
+    ImageOps = None
+
+
+IMAGENES_MAX_BYTES_DEFAULT = 10 * 1024 * 1024
+IMAGENES_WORKERS_DEFAULT = 2
+IMAGENES_MINIATURA_PX_DEFAULT = 320
+IMAGENES_MEDIANA_PX_DEFAULT = 1024
+IMAGENES_WEBP_CALIDAD_DEFAULT = 80
+
+BLOQUE_BYTES = 64 * 1024
+PREFIJO_URL = "/uploads/articulos/"
+
+# Sufijos de archivo de cada variante: <stem>.<sufijo>.webp
+VARIANTES = ("thumb", "md")
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def variantes_disponibles() -> bool:
+    return Image is not None
+
+
+# =========================
+# Validación y guardado
+# =========================
+
+
+def detectar_formato(cabecera: bytes) -> str | None:
+    """Extensión canónica según magic bytes (None si no es una imagen soportada)."""
+
+    if cabecera.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if cabecera.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if len(cabecera) >= 12 and cabecera[:4] == b"RIFF" and cabecera[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def ruta_por_hash(sha256: str, ext: str) -> str:
+    """Ruta relativa (con '/') del archivo para un hash: ab/cd/<sha256><ext>."""
+
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+class UploadGuardado:
+    __slots__ = ("filename", "sha256", "nuevo")
+
+    def __init__(self, filename: str, sha256: str, nuevo: bool):
+        self.filename = filename
+        self.sha256 = sha256
+        self.nuevo = nuevo
+
+
+def guardar_upload(archivo, upload_dir: str) -> UploadGuardado:
+    """Copia el upload por bloques calculando su SHA-256 y lo deja en su ruta por hash.
+
+    Se escribe a un temporal y se renombra al final, así un upload cortado o
+    inválido no deja archivos a medias con nombre definitivo. Si el contenido
+    ya existía, el temporal se descarta (dedupe) y `nuevo` es False.
+    """
+
+    max_bytes = _get_config_int("IMAGENES_MAX_BYTES", IMAGENES_MAX_BYTES_DEFAULT, minimo=1)
+    stream = archivo.stream
+    os.makedirs(upload_dir, exist_ok=True)
+
+    primero = stream.read(BLOQUE_BYTES)
+    ext = detectar_formato(primero)
+    if ext is None:
+        raise ApiError("Formato inválido. Solo se permiten: jpg, jpeg, png, webp.", 400)
+
+    tmp_path = os.path.join(upload_dir, f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    total = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            bloque = primero
+            while bloque:
+                total += len(bloque)
+                if total > max_bytes:
+                    raise ApiError(
+                        f"La imagen excede el tamaño máximo ({max_bytes // (1024 * 1024)} MB).",
+                        413,
+                    )
+                digest.update(bloque)
+                out.write(bloque)
+                bloque = stream.read(BLOQUE_BYTES)
+        return mover_a_almacen(tmp_path, digest.hexdigest(), ext, upload_dir)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def mover_a_almacen(tmp_path: str, sha256: str, ext: str, upload_dir: str) -> UploadGuardado:
+    """Mueve un temporal ya verificado a su ruta por hash (o lo descarta si ya existe)."""
+
+    filename = ruta_por_hash(sha256, ext)
+    destino = os.path.join(upload_dir, *filename.split("/"))
+    if os.path.exists(destino):
+        os.remove(tmp_path)
+        # La fila que lo referencia aún no está confirmada: el GC no debe verlo viejo.
+        _renovar_mtime(upload_dir, filename)
+        return UploadGuardado(filename, sha256, nuevo=False)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    os.replace(tmp_path, destino)
+    return UploadGuardado(filename, sha256, nuevo=True)
+
+
+def _renovar_mtime(upload_dir: str, filename: str) -> None:
+    for nombre in (filename, *(nombre_variante(filename, v) for v in VARIANTES)):
+        try:
+            os.utime(os.path.join(upload_dir, *nombre.split("/")))
+        except OSError:
+            pass
+
+
+def nombre_variante(filename: str, variante: str) -> str:
+    carpeta, base = os.path.split(filename)
+    stem, _ = os.path.splitext(base)
+    nombre = f"{stem}.{variante}.webp"
+    return f"{carpeta}/{nombre}" if carpeta else nombre
+
+
+def filename_desde_url(url: str | None) -> str | None:
+    """Ruta relativa del archivo si la URL apunta a /uploads/articulos/ (si no, None)."""
+
+    path = urlparse(url or "").path or ""
+    if PREFIJO_URL not in path:
+        return None
+    partes = [p for p in path.split(PREFIJO_URL, 1)[1].split("/") if p]
+    if not partes or any(p in (".", "..") for p in partes):
+        return None
+    return "/".join(partes)
+
+
+def variantes_existentes(sha256: str) -> tuple[str | None, str | None]:
+    """URLs de variantes ya generadas para el mismo contenido (dedupe)."""
+
+    fila = (
+        ArticuloImagen.query.filter(ArticuloImagen.sha256 == sha256, ArticuloImagen.url_miniatura.isnot(None))
+        .with_entities(ArticuloImagen.url_miniatura, ArticuloImagen.url_mediana)
+        .first()
+    )
+    return (fila[0], fila[1]) if fila else (None, None)
+
+
+# =========================
+# Variantes (pool de procesos)
+# =========================
+
+
+def _generar_variantes(ruta_original: str, destinos: list[tuple[str, int]], calidad: int) -> list[str]:
+    """Corre en el worker: genera cada destino (ruta, ancho máximo) en WebP."""
+
+    generadas = []
+    with Image.open(ruta_original) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+        for ruta, ancho in destinos:
+            copia = im.copy()
+            copia.thumbnail((ancho, ancho))
+            tmp = f"{ruta}.part"
+            copia.save(tmp, "WEBP", quality=calidad, method=4)
+            os.replace(tmp, ruta)
+            generadas.append(ruta)
+    return generadas
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_pendientes = 0  # variantes encoladas aún sin registrar (backlog del pool)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = _get_config_int("IMAGENES_WORKERS", IMAGENES_WORKERS_DEFAULT, minimo=1)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(_pool.shutdown, wait=False)
+        return _pool
+
+
+def variantes_pendientes() -> int:
+    with _pool_lock:
+        return _pendientes
+
+
+def _ajustar_pendientes(n: int) -> None:
+    global _pendientes
+    with _pool_lock:
+        _pendientes += n
+
+
+def _registrar_variantes(app, id_imagen: int, urls: dict[str, str], futuro) -> None:
+    _ajustar_pendientes(-1)
+    try:
+        futuro.result()
+    except Exception:
+        app.logger.exception("[imagenes] no se pudieron generar variantes de la imagen %s", id_imagen)
+        return
+
+    with app.app_context():
+        try:
+            ArticuloImagen.query.filter_by(id=id_imagen).update(
+                {"url_miniatura": urls["thumb"], "url_mediana": urls["md"]},
+                synchronize_session=False,
+            )
+            # Sello de versión del artículo (ETag del detalle).
+            id_articulo = select(ArticuloImagen.id_articulo).where(ArticuloImagen.id == id_imagen).scalar_subquery()
+            db.session.execute(
+                update(Articulo).where(Articulo.id_articulo == id_articulo).values(actualizado_en=datetime.utcnow())
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("[imagenes] no se pudieron registrar variantes de la imagen %s", id_imagen)
+        finally:
+            db.session.remove()
+
+
+def encolar_variantes(imagen: ArticuloImagen, filename: str, upload_dir: str, base_url: str) -> bool:
+    """Manda a generar miniatura y mediana de `imagen` (ya persistida). False si no hay Pillow."""
+
+    if not variantes_disponibles():
+        return False
+
+    anchos = {
+        "thumb": _get_config_int("IMAGENES_MINIATURA_PX", IMAGENES_MINIATURA_PX_DEFAULT, minimo=16),
+        "md": _get_config_int("IMAGENES_MEDIANA_PX", IMAGENES_MEDIANA_PX_DEFAULT, minimo=16),
+    }
+    calidad = _get_config_int("IMAGENES_WEBP_CALIDAD", IMAGENES_WEBP_CALIDAD_DEFAULT, minimo=1)
+    destinos = [(os.path.join(upload_dir, *nombre_variante(filename, v).split("/")), anchos[v]) for v in VARIANTES]
+    urls = {v: f"{base_url}{PREFIJO_URL}{nombre_variante(filename, v)}" for v in VARIANTES}
+
+    app = current_app._get_current_object()
+    futuro = _get_pool().submit(_generar_variantes, os.path.join(upload_dir, *filename.split("/")), destinos, calidad)
+    _ajustar_pendientes(1)
+    futuro.add_done_callback(lambda f, _id=imagen.id: _registrar_variantes(app, _id, urls, f))
+    return True
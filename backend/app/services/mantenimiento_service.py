@@ -0,0 +1,127 @@
+"""Tareas de mantenimiento periódicas (ver tareas_service / `flask jobs`).
+
+Cada tarea trabaja por lotes acotados y devuelve un resumen que queda en el
+historial de ejecuciones.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, update
+
+from app.extensions.db import db
+from app.models.articulo import Articulo
+from app.models.clave_idempotencia import ClaveIdempotencia
+from app.models.renta import Renta
+from app.models.resena import Resena
+from app.models.tarea_programada import EjecucionTarea
+from app.services import renta_service
+from app.services import retencion_service
+from app.services import subidas_service
+from app.services.tareas_service import tarea
+
+
+DEPOSITO_LIBERACION_HORAS_DEFAULT = 72
+JOBS_HISTORIAL_DIAS_DEFAULT = 30
+LOTE_BORRADO = 1000
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def _borrar_por_lotes(modelo, pk, *criterios) -> int:
+    """DELETE en lotes de LOTE_BORRADO filas (transacciones cortas)."""
+
+    total = 0
+    while True:
+        ids = [r[0] for r in db.session.query(pk).filter(*criterios).limit(LOTE_BORRADO).all()]
+        if not ids:
+            return total
+        modelo.query.filter(pk.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        total += len(ids)
+
+
+@tarea("expirar_pagos", cada=60)
+def expirar_pagos():
+    """Expira reservas pendientes de pago vencidas."""
+
+    return {"expiradas": renta_service.expirar_pagos_vencidos()}
+
+
+@tarea("liberar_depositos", cada=15 * 60)
+def liberar_depositos():
+    """Finaliza rentas devueltas sin incidente y libera su depósito."""
+
+    horas = _get_config_int("DEPOSITO_LIBERACION_HORAS", DEPOSITO_LIBERACION_HORAS_DEFAULT, minimo=1)
+    return {"finalizadas": renta_service.finalizar_devoluciones_vencidas(horas)}
+
+
+@tarea("reparar_contadores_articulos", cron="15 3 * * *")
+def reparar_contadores_articulos():
+    """Recalcula rating_promedio / total_resenas de artículos desde las reseñas."""
+
+    # Reseñas al dueño = reseñas del artículo rentado.
+    agregados = (
+        db.session.query(Renta.id_articulo, func.count(Resena.id_resenas), func.avg(Resena.calificacion))
+        .join(Renta, Renta.id == Resena.id_renta)
+        .filter(Resena.id_usuario_resenado == Renta.id_propietario)
+        .group_by(Renta.id_articulo)
+        .all()
+    )
+    esperado = {i: (int(n), round(float(avg or 0), 2)) for i, n, avg in agregados}
+
+    cambios = []
+    actuales = db.session.query(Articulo.id_articulo, Articulo.total_resenas, Articulo.rating_promedio)
+    for id_articulo, total, rating in actuales.yield_per(1000):
+        n, avg = esperado.get(id_articulo, (0, 0.0))
+        if int(total or 0) != n or round(float(rating or 0), 2) != avg:
+            cambios.append({"id_articulo": id_articulo, "total_resenas": n, "rating_promedio": avg})
+
+    for i in range(0, len(cambios), LOTE_BORRADO):
+        db.session.execute(update(Articulo), cambios[i:i + LOTE_BORRADO])
+        db.session.commit()
+    return {"corregidos": len(cambios)}
+
+
+@tarea("purgar_claves_idempotencia", cada=60 * 60)
+def purgar_claves_idempotencia():
+    """Borra claves Idempotency-Key vencidas."""
+
+    ahora = datetime.utcnow()
+    return {"borradas": _borrar_por_lotes(ClaveIdempotencia, ClaveIdempotencia.id, ClaveIdempotencia.expires_at < ahora)}
+
+
+@tarea("purgar_subidas_imagenes", cada=60 * 60)
+def purgar_subidas_imagenes():
+    """Borra sesiones de upload por chunks vencidas y su staging."""
+
+    return {"borradas": subidas_service.purgar_vencidas()}
+
+
+@tarea("purgar_historial_tareas", cron="30 3 * * *")
+def purgar_historial_tareas():
+    """Recorta el historial de ejecuciones de tareas."""
+
+    dias = _get_config_int("JOBS_HISTORIAL_DIAS", JOBS_HISTORIAL_DIAS_DEFAULT, minimo=1)
+    corte = datetime.utcnow() - timedelta(days=dias)
+    return {"borradas": _borrar_por_lotes(EjecucionTarea, EjecucionTarea.id, EjecucionTarea.inicio < corte)}
+
+
+@tarea("archivar_notificaciones", cron="45 3 * * *")
+def archivar_notificaciones():
+    """Mueve notificaciones leídas antiguas a notificaciones_archivo."""
+
+    return {"archivadas": retencion_service.archivar_notificaciones()}
+
+
+@tarea("archivar_chats", cron="0 4 * * *")
+def archivar_chats():
+    """Mueve el chat de rentas cerradas a mensajes_renta_archivo."""
+
+    return {"archivados": retencion_service.archivar_chats_cerrados()}
@@ -4,6 +4,7 @@ from sqlalchemy.exc import OperationalError, ProgrammingError
 from flask import current_app
 
 from app.extensions.db import db
+from app.models.archivo import NotificacionArchivada
 from app.models.notificacion import Notificacion
 from app.utils.errors import ApiError
 
@@ -131,6 +132,63 @@ def listar_notificaciones(id_usuario: int, limit: int = 50) -> dict:
 	}
 
 
+def listar_notificaciones_archivadas(id_usuario: int, limit: int = 50, antes_de: int | None = None) -> dict:
+	"""Notificaciones movidas al archivo por retención (paginado por id descendente)."""
+	try:
+		q = NotificacionArchivada.query.filter_by(id_usuario=id_usuario)
+		if antes_de is not None:
+			q = q.filter(NotificacionArchivada.id < antes_de)
+		limite = max(1, min(int(limit), 100))
+		items = q.order_by(NotificacionArchivada.id.desc()).limit(limite).all()
+	except (OperationalError, ProgrammingError):
+		return {"items": [], "siguiente": None}
+
+	return {
+		"items": [
+			{
+				"id": n.id,
+				"tipo": n.tipo,
+				"mensaje": n.mensaje,
+				"leida": True,
+				"created_at": n.created_at.isoformat() if n.created_at else None,
+				"meta_json": n.meta_json,
+				"archivada": True,
+			}
+			for n in items
+		],
+		"siguiente": items[-1].id if len(items) == limite else None,
+	}
+
+
+NOTIFICACIONES_LEER_MAX_IDS = 500
+
+
+def marcar_leidas(id_usuario: int, ids: list[int] | None = None, hasta_id: int | None = None) -> int:
+	"""Marca varias notificaciones como leídas con un solo UPDATE.
+
+	- ids: solo esas (del usuario).
+	- hasta_id: todas las no leídas con id <= hasta_id ("todo lo anterior al cursor").
+	- sin ninguno: todas las no leídas del usuario.
+	"""
+	q = Notificacion.query.filter(Notificacion.id_usuario == id_usuario, Notificacion.leida == False)  # noqa: E712
+	if ids is not None:
+		if not ids:
+			return 0
+		if len(ids) > NOTIFICACIONES_LEER_MAX_IDS:
+			raise ApiError(f"Máximo {NOTIFICACIONES_LEER_MAX_IDS} ids por petición.", status_code=400)
+		q = q.filter(Notificacion.id.in_(ids))
+	if hasta_id is not None:
+		q = q.filter(Notificacion.id <= hasta_id)
+
+	try:
+		n = q.update({"leida": True}, synchronize_session=False)
+		db.session.commit()
+	except (OperationalError, ProgrammingError):
+		db.session.rollback()
+		raise ApiError("Notificaciones no disponibles.", status_code=501)
+	return int(n or 0)
+
+
 def marcar_leida(id_notificacion: int, id_usuario: int) -> None:
 	debug = os.getenv("NOTIFICACIONES_DEBUG", "0") == "1"
 	try:
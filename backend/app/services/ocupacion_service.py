@@ -0,0 +1,343 @@
+"""Ocupación precalculada por artículo (bitsets por hora sobre un horizonte móvil).
+
+Cada artículo tiene un bytearray con 1 bit por hora desde `base` (medianoche
+UTC de hace OCUPACION_DIAS_ATRAS días) durante todo el horizonte. Como un día
+son 24 bits = 3 bytes alineados, la vista por días sale directa del mismo
+bitset. Las rentas activas y los bloqueos de DisponibilidadArticulo marcan
+bits; las salidas se devuelven como rangos run-length ([inicio, fin)).
+
+Los bitsets se cachean en proceso y se invalidan en el commit de cualquier
+cambio de Renta (alta, estado, fechas) o DisponibilidadArticulo. Como red de
+seguridad entre workers, cada entrada caduca tras OCUPACION_CACHE_TTL_SECONDS.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.extensions.db import db
+from app.models.disponibilidad_articulo import DisponibilidadArticulo
+from app.models.renta import Renta
+from app.services.disponibilidad_service import ESTADOS_RENTA_BLOQUEO
+from app.utils.errors import ApiError
+
+
+OCUPACION_HORIZONTE_DIAS_DEFAULT = 180
+OCUPACION_DIAS_ATRAS_DEFAULT = 31
+OCUPACION_CACHE_TTL_SECONDS_DEFAULT = 60
+OCUPACION_CACHE_MAX_DEFAULT = 5000
+OCUPACION_BATCH_MAX_IDS = 100
+
+GRANULARIDADES = ("horas", "dias")
+
+_FULL = 0xFF
+
+
+class OcupacionBitmap:
+    """Bitset de horas ocupadas de un artículo a partir de `base`."""
+
+    __slots__ = ("base", "horas", "creado")
+
+    def __init__(self, base: datetime, total_horas: int):
+        self.base = base
+        self.horas = bytearray((total_horas + 7) // 8)
+        self.creado = time.monotonic()
+
+    @property
+    def total_horas(self) -> int:
+        return len(self.horas) * 8
+
+    @property
+    def fin(self) -> datetime:
+        return self.base + timedelta(hours=self.total_horas)
+
+    def marcar(self, inicio: datetime, fin: datetime) -> None:
+        """Marca [inicio, fin) redondeando hacia fuera a horas completas."""
+
+        a = int((inicio - self.base).total_seconds() // 3600)
+        b = -int(-(fin - self.base).total_seconds() // 3600)  # ceil
+        _set_rango(self.horas, max(0, a), min(self.total_horas, b))
+
+    def libre(self, inicio: datetime, fin: datetime) -> bool:
+        """True si ninguna hora de [inicio, fin) está ocupada (fuera del bitset cuenta como libre)."""
+
+        a = int((inicio - self.base).total_seconds() // 3600)
+        b = -int(-(fin - self.base).total_seconds() // 3600)
+        return next(_runs(self.horas, max(0, a), min(self.total_horas, b)), None) is None
+
+    def dias(self) -> bytearray:
+        """Bitset por días: un día está ocupado si alguna de sus horas lo está."""
+
+        n_dias = self.total_horas // 24
+        out = bytearray((n_dias + 7) // 8)
+        h = self.horas
+        for d in range(n_dias):
+            if h[3 * d] or h[3 * d + 1] or h[3 * d + 2]:
+                out[d >> 3] |= 0x80 >> (d & 7)
+        return out
+
+    def rangos(self, desde: datetime, hasta: datetime, granularidad: str = "horas") -> list[dict]:
+        """Rangos ocupados (RLE) dentro de [desde, hasta)."""
+
+        if granularidad == "dias":
+            bits = self.dias()
+            paso = timedelta(days=1)
+            a = int((desde - self.base).total_seconds() // 86400)
+            b = -int(-(hasta - self.base).total_seconds() // 86400)
+            total = self.total_horas // 24
+        else:
+            bits = self.horas
+            paso = timedelta(hours=1)
+            a = int((desde - self.base).total_seconds() // 3600)
+            b = -int(-(hasta - self.base).total_seconds() // 3600)
+            total = self.total_horas
+
+        out = []
+        for ini, fin in _runs(bits, max(0, a), min(total, b)):
+            out.append(
+                {
+                    "inicio": (self.base + paso * ini).isoformat(),
+                    "fin": (self.base + paso * fin).isoformat(),
+                }
+            )
+        return out
+
+
+def _set_rango(bits: bytearray, a: int, b: int) -> None:
+    """Pone a 1 los bits [a, b) (MSB primero), usando slices para bytes completos."""
+
+    if b <= a:
+        return
+    byte_a, byte_b = a >> 3, (b - 1) >> 3
+    mask_a = 0xFF >> (a & 7)
+    mask_b = (0xFF << (7 - ((b - 1) & 7))) & 0xFF
+    if byte_a == byte_b:
+        bits[byte_a] |= mask_a & mask_b
+        return
+    bits[byte_a] |= mask_a
+    if byte_b - byte_a > 1:
+        bits[byte_a + 1:byte_b] = b"\xff" * (byte_b - byte_a - 1)
+    bits[byte_b] |= mask_b
+
+
+def _bit(bits: bytearray, i: int) -> bool:
+    return bool(bits[i >> 3] & (0x80 >> (i & 7)))
+
+
+def _runs(bits: bytearray, a: int, b: int):
+    """Genera (inicio, fin) de rachas de 1s en [a, b). Salta bytes 0x00/0xFF enteros."""
+
+    i = a
+    inicio = None
+    while i < b:
+        if (i & 7) == 0 and i + 8 <= b:
+            byte = bits[i >> 3]
+            if byte == 0:
+                if inicio is not None:
+                    yield inicio, i
+                    inicio = None
+                i += 8
+                continue
+            if byte == _FULL:
+                if inicio is None:
+                    inicio = i
+                i += 8
+                continue
+        if _bit(bits, i):
+            if inicio is None:
+                inicio = i
+        elif inicio is not None:
+            yield inicio, i
+            inicio = None
+        i += 1
+    if inicio is not None:
+        yield inicio, b
+
+
+# =========================
+# Cache en proceso
+# =========================
+
+_cache: "OrderedDict[int, OcupacionBitmap]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def _ventana_horizonte() -> tuple[datetime, int]:
+    hoy = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    atras = _get_config_int("OCUPACION_DIAS_ATRAS", OCUPACION_DIAS_ATRAS_DEFAULT)
+    adelante = _get_config_int("OCUPACION_HORIZONTE_DIAS", OCUPACION_HORIZONTE_DIAS_DEFAULT, minimo=1)
+    return hoy - timedelta(days=atras), (atras + adelante) * 24
+
+
+def invalidar(ids_articulo) -> None:
+    with _cache_lock:
+        for id_articulo in ids_articulo:
+            _cache.pop(int(id_articulo), None)
+
+
+def limpiar_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def estadisticas() -> dict:
+    with _cache_lock:
+        return {"items": len(_cache), **_stats}
+
+
+def _construir(ids: list[int], base: datetime, total_horas: int) -> dict[int, OcupacionBitmap]:
+    """Construye bitsets para varios artículos con 1 query de rentas + 1 de bloqueos."""
+
+    out = {i: OcupacionBitmap(base, total_horas) for i in ids}
+    if not ids:
+        return out
+    fin = out[ids[0]].fin
+
+    rentas = (
+        db.session.query(Renta.id_articulo, Renta.fecha_inicio, Renta.fecha_fin)
+        .filter(
+            Renta.id_articulo.in_(ids),
+            Renta.estado_renta.in_(ESTADOS_RENTA_BLOQUEO),
+            Renta.fecha_inicio < fin,
+            Renta.fecha_fin > base,
+        )
+        .all()
+    )
+    bloqueos = (
+        db.session.query(
+            DisponibilidadArticulo.id_articulo,
+            DisponibilidadArticulo.fecha_inicio,
+            DisponibilidadArticulo.fecha_fin,
+        )
+        .filter(
+            DisponibilidadArticulo.id_articulo.in_(ids),
+            DisponibilidadArticulo.disponible == False,  # noqa: E712
+            DisponibilidadArticulo.fecha_inicio < fin,
+            DisponibilidadArticulo.fecha_fin > base,
+        )
+        .all()
+    )
+    for id_articulo, ini, f in list(rentas) + list(bloqueos):
+        if ini and f:
+            out[id_articulo].marcar(ini, f)
+    return out
+
+
+def obtener_bitmaps(ids: list[int]) -> dict[int, OcupacionBitmap]:
+    """Bitsets del horizonte móvil para varios artículos (cache + 1 build por lote)."""
+
+    base, total_horas = _ventana_horizonte()
+    ttl = _get_config_int("OCUPACION_CACHE_TTL_SECONDS", OCUPACION_CACHE_TTL_SECONDS_DEFAULT)
+    ahora = time.monotonic()
+
+    out: dict[int, OcupacionBitmap] = {}
+    faltantes: list[int] = []
+    with _cache_lock:
+        for i in ids:
+            bm = _cache.get(i)
+            if bm is not None and bm.base == base and (ahora - bm.creado) <= ttl:
+                _cache.move_to_end(i)
+                out[i] = bm
+            else:
+                faltantes.append(i)
+        _stats["hits"] += len(out)
+        _stats["misses"] += len(faltantes)
+
+    if faltantes:
+        nuevos = _construir(faltantes, base, total_horas)
+        out.update(nuevos)
+        maximo = _get_config_int("OCUPACION_CACHE_MAX", OCUPACION_CACHE_MAX_DEFAULT, minimo=1)
+        with _cache_lock:
+            _cache.update(nuevos)
+            while len(_cache) > maximo:
+                _cache.popitem(last=False)
+    return out
+
+
+def ocupacion_articulos(
+    ids: list[int],
+    desde: datetime,
+    hasta: datetime,
+    granularidad: str = "horas",
+) -> dict[int, list[dict]]:
+    """Rangos ocupados por artículo en [desde, hasta)."""
+
+    if not isinstance(desde, datetime) or not isinstance(hasta, datetime) or hasta <= desde:
+        raise ApiError("Rango de fechas inválido.", status_code=400)
+    if granularidad not in GRANULARIDADES:
+        raise ApiError("granularidad inválida. Usa: horas|dias", status_code=400)
+
+    ids = list(dict.fromkeys(int(i) for i in ids))
+    if len(ids) > OCUPACION_BATCH_MAX_IDS:
+        raise ApiError(f"Máximo {OCUPACION_BATCH_MAX_IDS} artículos por consulta.", status_code=400)
+
+    bitmaps = bitmaps_para_rango(ids, desde, hasta)
+    return {i: bitmaps[i].rangos(desde, hasta, granularidad) for i in ids}
+
+
+def bitmaps_para_rango(ids: list[int], desde: datetime, hasta: datetime) -> dict[int, OcupacionBitmap]:
+    """Bitsets que cubren [desde, hasta).
+
+    Dentro del horizonte usa los bitsets cacheados; fuera de él construye
+    bitsets temporales de la ventana pedida (sin cachear).
+    """
+
+    base, total_horas = _ventana_horizonte()
+    fin_horizonte = base + timedelta(hours=total_horas)
+    if desde >= base and hasta <= fin_horizonte:
+        return obtener_bitmaps(ids)
+    b0 = desde.replace(hour=0, minute=0, second=0, microsecond=0)
+    horas = -int(-(hasta - b0).total_seconds() // 86400) * 24
+    return _construir(ids, b0, horas)
+
+
+# =========================
+# Invalidación por eventos de sesión
+# =========================
+
+_CAMPOS_RENTA_OCUPACION = ("estado_renta", "fecha_inicio", "fecha_fin", "id_articulo")
+
+
+def _renta_afecta_ocupacion(obj: Renta) -> bool:
+    st = sa_inspect(obj)
+    return any(st.attrs[c].history.has_changes() for c in _CAMPOS_RENTA_OCUPACION)
+
+
+@event.listens_for(Session, "after_flush")
+def _recolectar_articulos_afectados(session, flush_context):
+    afectados = session.info.setdefault("ocupacion_articulos_afectados", set())
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (Renta, DisponibilidadArticulo)) and obj.id_articulo is not None:
+            afectados.add(obj.id_articulo)
+    for obj in session.dirty:
+        if isinstance(obj, DisponibilidadArticulo) and obj.id_articulo is not None:
+            afectados.add(obj.id_articulo)
+        elif isinstance(obj, Renta) and obj.id_articulo is not None and _renta_afecta_ocupacion(obj):
+            afectados.add(obj.id_articulo)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_en_commit(session):
+    afectados = session.info.pop("ocupacion_articulos_afectados", None)
+    if afectados:
+        invalidar(afectados)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_en_rollback(session, previous_transaction):
+    session.info.pop("ocupacion_articulos_afectados", None)
@@ -0,0 +1,241 @@
+"""Cache en proceso de datos de referencia: categorías y puntos de entrega activos.
+
+Cambian pocas veces al año, así que cada worker los guarda completos en
+memoria y los comparte entre requests. Cada tipo lleva un número de versión:
+cualquier commit que toque Categoria o PuntoEntrega (el CRUD de puntos en
+admin_service, seeds, scripts) sube la versión y la siguiente lectura recarga.
+
+Los demás workers se enteran por un sello compartido en la BD, que se revisa
+cada REFERENCIA_CACHE_VERIFICAR_SECONDS con una consulta de agregados:
+count + max(updated_at) para puntos de entrega y count + max(id) para
+categorías. REFERENCIA_CACHE_TTL_SECONDS queda como tope para cambios que el
+sello no ve (renombrar una categoría a mano en SQL).
+
+Las escrituras no confían en la cache: `punto_entrega_activo(id,
+confirmar=True)` relee `activo` en la BD cuando la cache lo da por activo.
+
+`sello(tipo)` es un hash del contenido cargado: sirve de versión para los
+ETags sin consultar la BD y coincide entre workers con los mismos datos.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.extensions.db import db
+from app.models.categoria import Categoria
+from app.models.punto_entrega import PuntoEntrega
+
+
+REFERENCIA_CACHE_TTL_SECONDS_DEFAULT = 300
+REFERENCIA_CACHE_VERIFICAR_SECONDS_DEFAULT = 5
+
+CATEGORIAS = "categorias"
+PUNTOS_ENTREGA = "puntos_entrega"
+TIPOS = (CATEGORIAS, PUNTOS_ENTREGA)
+
+
+class _Entrada:
+    __slots__ = ("items", "indice", "sello", "version", "version_bd", "cargado", "verificado")
+
+    def __init__(self, items: tuple, version: int, version_bd: tuple):
+        self.items = items
+        self.indice = {d["id"]: d for d in items}
+        self.sello = hashlib.sha1(
+            json.dumps(items, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        self.version = version
+        self.version_bd = version_bd
+        self.cargado = self.verificado = time.monotonic()
+
+
+_entradas: dict[str, _Entrada] = {}
+_versiones = {t: 0 for t in TIPOS}
+_stats = {t: {"hits": 0, "misses": 0} for t in TIPOS}
+_lock = threading.Lock()
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def _cargar_categorias() -> tuple:
+    filas = db.session.query(Categoria.id, Categoria.nombre).order_by(Categoria.nombre.asc()).all()
+    return tuple({"id": i, "nombre": n} for i, n in filas)
+
+
+def _cargar_puntos_entrega() -> tuple:
+    filas = (
+        db.session.query(PuntoEntrega.id, PuntoEntrega.nombre, PuntoEntrega.direccion)
+        .filter(PuntoEntrega.activo.is_(True))
+        .order_by(PuntoEntrega.id.asc())
+        .all()
+    )
+    # Campos mínimos + placeholders para compat sin migraciones extra
+    return tuple(
+        {
+            "id": i,
+            "nombre": n,
+            "direccion": d,  # aproximada
+            "ciudad": None,
+            "estado": None,
+            "horario": None,
+            "notas": None,
+        }
+        for i, n, d in filas
+    )
+
+
+def _version_bd_categorias() -> tuple:
+    return tuple(db.session.query(func.count(Categoria.id), func.max(Categoria.id)).one())
+
+
+def _version_bd_puntos_entrega() -> tuple:
+    # Todas las filas, no solo activas: desactivar toca updated_at.
+    return tuple(db.session.query(func.count(PuntoEntrega.id), func.max(PuntoEntrega.updated_at)).one())
+
+
+_CARGADORES = {
+    CATEGORIAS: _cargar_categorias,
+    PUNTOS_ENTREGA: _cargar_puntos_entrega,
+}
+
+_VERSIONES_BD = {
+    CATEGORIAS: _version_bd_categorias,
+    PUNTOS_ENTREGA: _version_bd_puntos_entrega,
+}
+
+
+def _obtener(tipo: str) -> _Entrada:
+    ttl = _get_config_int("REFERENCIA_CACHE_TTL_SECONDS", REFERENCIA_CACHE_TTL_SECONDS_DEFAULT)
+    intervalo = _get_config_int("REFERENCIA_CACHE_VERIFICAR_SECONDS", REFERENCIA_CACHE_VERIFICAR_SECONDS_DEFAULT)
+    ahora = time.monotonic()
+    with _lock:
+        version = _versiones[tipo]
+        entrada = _entradas.get(tipo)
+        vigente = entrada is not None and entrada.version == version and ahora - entrada.cargado < ttl
+        if vigente and ahora - entrada.verificado < intervalo:
+            _stats[tipo]["hits"] += 1
+            return entrada
+
+    # Sello compartido: otro worker pudo cambiar los datos. Se lee antes de
+    # cargar, así un cambio concurrente con la carga fuerza otra recarga.
+    version_bd = _VERSIONES_BD[tipo]()
+    if vigente and version_bd == entrada.version_bd:
+        with _lock:
+            entrada.verificado = time.monotonic()
+            _stats[tipo]["hits"] += 1
+        return entrada
+
+    with _lock:
+        _stats[tipo]["misses"] += 1
+    # La carga va fuera del lock; si se invalidó mientras tanto, no se guarda.
+    entrada = _Entrada(_CARGADORES[tipo](), version, version_bd)
+    with _lock:
+        if _versiones[tipo] == version:
+            _entradas[tipo] = entrada
+    return entrada
+
+
+def categorias() -> list[dict]:
+    return list(_obtener(CATEGORIAS).items)
+
+
+def puntos_entrega_activos() -> list[dict]:
+    return list(_obtener(PUNTOS_ENTREGA).items)
+
+
+def punto_entrega_activo(id_punto: int, confirmar: bool = False) -> dict | None:
+    """Copia del punto activo con ese id, o None si no existe o está inactivo.
+
+    Con `confirmar` (rutas de escritura) se relee `activo` en la BD cuando la
+    cache lo da por activo: otro worker pudo desactivarlo desde la última
+    verificación del sello.
+    """
+
+    p = _obtener(PUNTOS_ENTREGA).indice.get(int(id_punto))
+    if p is None:
+        return None
+    if confirmar:
+        activo = db.session.query(PuntoEntrega.activo).filter(PuntoEntrega.id == int(id_punto)).scalar()
+        if not activo:
+            invalidar((PUNTOS_ENTREGA,))
+            return None
+    return dict(p)
+
+
+def sello(tipo: str) -> str:
+    return _obtener(tipo).sello
+
+
+def invalidar(tipos=TIPOS) -> None:
+    with _lock:
+        for tipo in tipos:
+            _versiones[tipo] += 1
+            _entradas.pop(tipo, None)
+
+
+def estadisticas() -> dict:
+    with _lock:
+        return {
+            t: {
+                "version": _versiones[t],
+                "cargado": t in _entradas,
+                "items": len(_entradas[t].items) if t in _entradas else 0,
+                **_stats[t],
+            }
+            for t in TIPOS
+        }
+
+
+def precargar() -> None:
+    """Carga todos los tipos (arranque). Si la BD aún no tiene tablas, se deja para el primer uso."""
+
+    try:
+        for tipo in TIPOS:
+            _obtener(tipo)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning("No se pudieron precargar datos de referencia: %s", e)
+    finally:
+        # No dejar una conexión tomada (con --preload el proceso padre luego hace fork).
+        db.session.remove()
+
+
+# =========================
+# Invalidación por eventos de sesión
+# =========================
+
+_MODELOS = ((Categoria, CATEGORIAS), (PuntoEntrega, PUNTOS_ENTREGA))
+
+
+@event.listens_for(Session, "after_flush")
+def _recolectar_tipos_afectados(session, flush_context):
+    afectados = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        for modelo, tipo in _MODELOS:
+            if isinstance(obj, modelo):
+                if afectados is None:
+                    afectados = session.info.setdefault("referencia_tipos_afectados", set())
+                afectados.add(tipo)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_en_commit(session):
+    afectados = session.info.pop("referencia_tipos_afectados", None)
+    if afectados:
+        invalidar(afectados)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_en_rollback(session, previous_transaction):
+    session.info.pop("referencia_tipos_afectados", None)
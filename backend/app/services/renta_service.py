@@ -9,16 +9,20 @@ from flask import current_app
 
 from app.extensions.db import db
 from sqlalchemy.exc import OperationalError, ProgrammingError
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, case, func, or_
 from app.models.articulo import Articulo
 from app.models.incidente_renta import IncidenteRenta
 from app.models.mensaje_renta import MensajeRenta
 from app.models.chat_lectura import ChatLectura
-from app.models.punto_entrega import PuntoEntrega
-from app.models.renta import Renta
+from app.models.renta import ESTADOS_PUBLICOS, Renta
 from app.models.usuario import Usuario
 from app.services.disponibilidad_service import validar_disponibilidad_articulo
+from app.services import cotizacion_service
 from app.services import notificacion_service
+from app.services import referencia_service
+from app.services import reserva_lock_service
+from app.services import retencion_service
+from app.utils import replicas
 from app.utils.errors import ApiError
 
 
@@ -53,17 +57,8 @@ ESTADOS_RENTA_ACTIVOS_OCUPACION = [
 def _estado_publico(renta: Renta) -> str:
     """Estado público (bonito) sin cambiar los valores internos de BD."""
 
-    estado_interno = renta.estado_renta
-    if estado_interno == "en_curso":
-        return "devuelta" if renta.devuelto else "en_uso"
-    if estado_interno == "completada":
-        return "finalizada"
-    if estado_interno == "con_incidente":
-        return "incidente"
-    if estado_interno == "cancelada":
-        notas = (renta.notas_devolucion or "")
-        return "expirada" if "EXPIRACION_PAGO" in notas else "cancelada"
-    return estado_interno
+    # La columna persistida puede ir atrasada respecto a cambios aún sin flush.
+    return renta.calcular_estado_publico()
 
 
 def _append_ts_note(renta: Renta, key: str, dt: datetime | None = None) -> None:
@@ -329,14 +324,40 @@ def listar_rentas_mias(
     for x in items:
         _marcar_expirada_si_corresponde(x)
 
+    # No leídos de chat de toda la página en una sola query agrupada.
+    unread = chat_unread_counts([x.id for x in items], id_usuario_actual)
+    out_items = []
+    for x in items:
+        d = renta_inbox_to_dict(x)
+        d["chat_unread_count"] = unread.get(x.id, 0)
+        out_items.append(d)
+
     return {
         "page": page_int,
         "per_page": per_page_int,
         "total": int(total),
-        "items": [renta_inbox_to_dict(x) for x in items],
+        "items": out_items,
     }
 
 
+def conteos_bandeja(id_usuario_actual: int) -> dict:
+    """Conteo por estado público para ambos roles con un solo GROUP BY."""
+
+    rol = case((Renta.id_arrendatario == id_usuario_actual, "arrendatario"), else_="dueno")
+    filas = (
+        db.session.query(rol, Renta.estado_publico, func.count(Renta.id))
+        .filter(or_(Renta.id_arrendatario == id_usuario_actual, Renta.id_propietario == id_usuario_actual))
+        .group_by(rol, Renta.estado_publico)
+        .all()
+    )
+
+    out = {r: {e: 0 for e in ESTADOS_PUBLICOS} for r in ("arrendatario", "dueno")}
+    for r, estado_publico, n in filas:
+        if estado_publico:
+            out[r][estado_publico] = out[r].get(estado_publico, 0) + int(n)
+    return out
+
+
 def _require_participante_renta(renta: Renta, id_usuario_actual: int) -> None:
     if id_usuario_actual not in (renta.id_arrendatario, renta.id_propietario):
         raise ApiError("No autorizado", 403)
@@ -362,42 +383,153 @@ def chat_unread_count(id_renta: int, id_usuario_actual: int) -> int:
     return int(q.count())
 
 
+def _upsert_chat_lecturas(id_usuario: int, ids_renta: list[int], cuando: datetime) -> None:
+    """Fija last_read_at de varias rentas en una sola sentencia (upsert por (id_renta, id_usuario))."""
+
+    if not ids_renta:
+        return
+    filas = [{"id_renta": i, "id_usuario": id_usuario, "last_read_at": cuando} for i in ids_renta]
+    dialecto = db.session.get_bind().dialect.name
+    if dialecto == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        stmt = mysql_insert(ChatLectura).values(filas)
+        stmt = stmt.on_duplicate_key_update(last_read_at=stmt.inserted.last_read_at)
+    elif dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        stmt = sqlite_insert(ChatLectura).values(filas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id_renta", "id_usuario"],
+            set_={"last_read_at": stmt.excluded.last_read_at},
+        )
+    else:
+        # Fallback genérico: leer y escribir (sigue siendo 1 commit).
+        existentes = {
+            x.id_renta: x
+            for x in ChatLectura.query.filter(
+                ChatLectura.id_usuario == id_usuario, ChatLectura.id_renta.in_(ids_renta)
+            ).all()
+        }
+        for i in ids_renta:
+            if i in existentes:
+                existentes[i].last_read_at = cuando
+            else:
+                db.session.add(ChatLectura(id_renta=i, id_usuario=id_usuario, last_read_at=cuando))
+        return
+    db.session.execute(stmt)
+
+
 def chat_marcar_leido(id_renta: int, id_usuario_actual: int) -> None:
     renta: Renta | None = Renta.query.get(id_renta)
     if not renta:
         raise ApiError("Renta no encontrada", 404)
     _require_participante_renta(renta, id_usuario_actual)
 
-    now = datetime.utcnow()
-    lectura = ChatLectura.query.filter_by(id_renta=renta.id, id_usuario=id_usuario_actual).first()
-    if not lectura:
-        lectura = ChatLectura(id_renta=renta.id, id_usuario=id_usuario_actual, last_read_at=now)
-        db.session.add(lectura)
-    else:
-        lectura.last_read_at = now
+    _upsert_chat_lecturas(id_usuario_actual, [renta.id], datetime.utcnow())
     db.session.commit()
 
 
-def chat_unread_total(id_usuario_actual: int) -> int:
-    """Total de mensajes sin leer en chats de rentas activas del usuario."""
+CHAT_LEIDO_BATCH_MAX = 200
+
+
+def chat_marcar_leidos(ids_renta: list[int], id_usuario_actual: int) -> int:
+    """Marca como leídos los chats de varias rentas con un solo upsert."""
 
     try:
-        min_dt = datetime(1970, 1, 1)
-        q = (
-            db.session.query(func.count(MensajeRenta.id))
-            .join(Renta, MensajeRenta.id_renta == Renta.id)
-            .outerjoin(
-                ChatLectura,
-                and_(ChatLectura.id_renta == Renta.id, ChatLectura.id_usuario == id_usuario_actual),
-            )
+        ids = list(dict.fromkeys(int(i) for i in (ids_renta or [])))
+    except (TypeError, ValueError):
+        raise ApiError("ids debe ser una lista de enteros.", 400)
+    if not ids:
+        return 0
+    if len(ids) > CHAT_LEIDO_BATCH_MAX:
+        raise ApiError(f"Máximo {CHAT_LEIDO_BATCH_MAX} rentas por petición.", 400)
+
+    propias = {
+        r[0]
+        for r in db.session.query(Renta.id)
+        .filter(
+            Renta.id.in_(ids),
+            or_(Renta.id_arrendatario == id_usuario_actual, Renta.id_propietario == id_usuario_actual),
+        )
+        .all()
+    }
+    if len(propias) != len(ids):
+        raise ApiError("No tienes permisos sobre alguna de las rentas.", 403)
+
+    _upsert_chat_lecturas(id_usuario_actual, ids, datetime.utcnow())
+    db.session.commit()
+    return len(ids)
+
+
+# Estados donde el chat puede estar habilitado (pendiente_pago no cuenta)
+ESTADOS_RENTA_CHAT = ("pagada", "confirmada", "en_curso", "con_incidente")
+
+CHAT_UNREAD_BATCH_MAX = 100
+
+
+def _query_chat_unread(id_usuario_actual: int):
+    """Base: mensajes de otros posteriores a mi última lectura en chats habilitados."""
+
+    min_dt = datetime(1970, 1, 1)
+    return (
+        db.session.query(MensajeRenta.id_renta, func.count(MensajeRenta.id))
+        .join(Renta, MensajeRenta.id_renta == Renta.id)
+        .outerjoin(
+            ChatLectura,
+            and_(ChatLectura.id_renta == Renta.id, ChatLectura.id_usuario == id_usuario_actual),
+        )
+        .filter(
+            or_(Renta.id_arrendatario == id_usuario_actual, Renta.id_propietario == id_usuario_actual),
+            Renta.estado_renta.in_(ESTADOS_RENTA_CHAT),
+            MensajeRenta.id_emisor != id_usuario_actual,
+            MensajeRenta.created_at > func.coalesce(ChatLectura.last_read_at, min_dt),
+        )
+    )
+
+
+def chat_unread_counts(ids_renta: list[int], id_usuario_actual: int) -> dict[int, int]:
+    """No leídos por renta para varias rentas con una sola query agrupada.
+
+    Solo incluye rentas donde el usuario participa; las demás se omiten.
+    """
+
+    ids = list(dict.fromkeys(int(i) for i in ids_renta or []))
+    if not ids:
+        return {}
+    if len(ids) > CHAT_UNREAD_BATCH_MAX:
+        raise ApiError(f"Máximo {CHAT_UNREAD_BATCH_MAX} rentas por consulta.", 400)
+
+    try:
+        visibles = {
+            r[0]
+            for r in db.session.query(Renta.id)
             .filter(
+                Renta.id.in_(ids),
                 or_(Renta.id_arrendatario == id_usuario_actual, Renta.id_propietario == id_usuario_actual),
-                # Estados donde el chat puede estar habilitado (pendiente_pago no cuenta)
-                Renta.estado_renta.in_(["pagada", "confirmada", "en_curso", "con_incidente"]),
-                MensajeRenta.id_emisor != id_usuario_actual,
-                MensajeRenta.created_at > func.coalesce(ChatLectura.last_read_at, min_dt),
             )
+            .all()
+        }
+        filas = (
+            _query_chat_unread(id_usuario_actual)
+            .filter(MensajeRenta.id_renta.in_(ids))
+            .group_by(MensajeRenta.id_renta)
+            .all()
         )
+    except (OperationalError, ProgrammingError):
+        return {}
+
+    out = {i: 0 for i in ids if i in visibles}
+    for id_renta, n in filas:
+        out[id_renta] = int(n or 0)
+    return out
+
+
+def chat_unread_total(id_usuario_actual: int) -> int:
+    """Total de mensajes sin leer en chats de rentas activas del usuario."""
+
+    try:
+        q = _query_chat_unread(id_usuario_actual).with_entities(func.count(MensajeRenta.id))
         total = q.scalar() or 0
         return int(total)
     except (OperationalError, ProgrammingError):
@@ -493,6 +625,12 @@ def _marcar_expirada_si_corresponde(renta: Renta) -> bool:
     """Marca como cancelada por expiración de pago. Devuelve True si modificó."""
     if not _es_expirable(renta):
         return False
+    if replicas.replica_actual() is not None:
+        # Leída de réplica (posible retraso): confirmar en la primaria antes de cancelar.
+        with replicas.primaria():
+            db.session.refresh(renta)
+        if not _es_expirable(renta):
+            return False
     if renta.estado_renta == "cancelada" and "EXPIRACION_PAGO" in (renta.notas_devolucion or ""):
         return False
 
@@ -565,6 +703,7 @@ def _modalidad_desde_unidad_precio(unidad_precio: str | None) -> str:
 def _renta_to_dict(renta: Renta, id_usuario_actual: int | None = None, roles: list[str] | None = None) -> dict:
     """
     Serialización sencilla de Renta para respuestas JSON.
+    Fechas y Decimal van tal cual: el proveedor JSON de la app los convierte.
     """
     unidad_precio = renta.articulo.unidad_precio if renta.articulo else None
     modalidad = (getattr(renta, "modalidad", None) or _modalidad_desde_unidad_precio(unidad_precio))
@@ -611,10 +750,10 @@ def _renta_to_dict(renta: Renta, id_usuario_actual: int | None = None, roles: li
                 "id": incidente.id,
                 "descripcion": incidente.descripcion,
                 "decision": incidente.decision,
-                "monto_retenido": float(incidente.monto_retenido) if incidente.monto_retenido is not None else None,
+                "monto_retenido": incidente.monto_retenido,
                 "nota": incidente.nota,
-                "created_at": incidente.created_at.isoformat() if incidente.created_at else None,
-                "resolved_at": incidente.resolved_at.isoformat() if incidente.resolved_at else None,
+                "created_at": incidente.created_at,
+                "resolved_at": incidente.resolved_at,
             }
     except (OperationalError, ProgrammingError):
         # Tabla nueva aún no existe (sin migraciones): no romper el flujo existente
@@ -644,8 +783,8 @@ def _renta_to_dict(renta: Renta, id_usuario_actual: int | None = None, roles: li
         "id_articulo": renta.id_articulo,
         "id_arrendatario": renta.id_arrendatario,
         "id_propietario": renta.id_propietario,
-        "fecha_inicio": renta.fecha_inicio.isoformat() if renta.fecha_inicio else None,
-        "fecha_fin": renta.fecha_fin.isoformat() if renta.fecha_fin else None,
+        "fecha_inicio": renta.fecha_inicio,
+        "fecha_fin": renta.fecha_fin,
         "modalidad": modalidad,
         "cantidad_unidades": cantidad_unidades,
         "precio_total_renta": subtotal_renta,
@@ -656,11 +795,9 @@ def _renta_to_dict(renta: Renta, id_usuario_actual: int | None = None, roles: li
         "entregado": renta.entregado,
         "devuelto": renta.devuelto,
         "deposito_liberado": renta.deposito_liberado,
-        "fecha_entrega": renta.fecha_entrega.isoformat() if renta.fecha_entrega else None,
-        "fecha_devolucion": renta.fecha_devolucion.isoformat() if renta.fecha_devolucion else None,
-        "fecha_liberacion_deposito": (
-            renta.fecha_liberacion_deposito.isoformat() if renta.fecha_liberacion_deposito else None
-        ),
+        "fecha_entrega": renta.fecha_entrega,
+        "fecha_devolucion": renta.fecha_devolucion,
+        "fecha_liberacion_deposito": renta.fecha_liberacion_deposito,
         "notas_entrega": renta.notas_entrega,
         "notas_devolucion": renta.notas_devolucion,
         # Coordinación / privacidad
@@ -685,18 +822,15 @@ def _renta_to_dict(renta: Renta, id_usuario_actual: int | None = None, roles: li
         "reembolso_simulado": reembolso_simulado,
         "monto_reembolso": monto_reembolso,
         "incidente": incidente_obj,
-        "fecha_creacion": renta.fecha_creacion.isoformat() if renta.fecha_creacion else None,
+        "fecha_creacion": renta.fecha_creacion,
         "articulo": {
             "id": renta.articulo.id_articulo,
             "id_articulo": renta.articulo.id_articulo,
             "titulo": renta.articulo.titulo,
-            "precio_base": float(renta.articulo.precio_base),
-            "precio_renta_dia": (
-                float(renta.articulo.precio_base) if renta.articulo.unidad_precio == "por_dia" else None
-            ),
-            "precio_renta_hora": (
-                float(renta.articulo.precio_base) if renta.articulo.unidad_precio == "por_hora" else None
-            ),
+            "precio_base": float(renta.articulo.precio_base or 0),
+            "precio_renta_dia": renta.articulo.precio_por_dia,
+            "precio_renta_hora": renta.articulo.precio_por_hora,
+            "precio_renta_semana": renta.articulo.precio_por_semana,
             "unidad_precio": renta.articulo.unidad_precio,
             "monto_deposito": float(renta.articulo.monto_deposito) if renta.articulo.monto_deposito is not None else 0.0,
             "deposito_garantia": float(renta.articulo.monto_deposito) if renta.articulo.monto_deposito is not None else 0.0,
@@ -717,6 +851,7 @@ def _validar_no_traslape_rentas(id_articulo: int, fecha_inicio: datetime, fecha_
         .filter(Renta.estado_renta.in_(estados_activos))
         .filter(Renta.fecha_inicio < fecha_fin)
         .filter(Renta.fecha_fin > fecha_inicio)
+        .with_for_update(read=True)
     )
 
     if q.first() is not None:
@@ -736,16 +871,7 @@ def listar_ocupacion_articulo(id_articulo: int, desde: datetime, hasta: datetime
         .filter(Renta.fecha_fin > desde)
         .order_by(Renta.fecha_inicio.asc())
     )
-
-    items = []
-    for r in q.all():
-        items.append(
-            {
-                "inicio": r.fecha_inicio.isoformat() if r.fecha_inicio else None,
-                "fin": r.fecha_fin.isoformat() if r.fecha_fin else None,
-            }
-        )
-    return items
+    return [{"inicio": r.fecha_inicio, "fin": r.fecha_fin} for r in q.all()]
 
 
 def crear_renta(data: dict, id_usuario_actual: int) -> dict:
@@ -755,112 +881,14 @@ def crear_renta(data: dict, id_usuario_actual: int) -> dict:
     Pasos:
     - Verificar que el artículo exista y esté activo/publicado.
     - Verificar que el usuario actual exista.
-    - Validar disponibilidad (sin solapamientos).
     - Calcular precio_total_renta + depósito.
-    - Crear registro en 'rentas'.
-    """
+    - Bajo el lock de reserva del artículo: validar disponibilidad (sin
+      solapamientos) y crear el registro en 'rentas'.
 
-    id_articulo = data["id_articulo"]
-    fecha_inicio: datetime = data["fecha_inicio"]
-    fecha_fin: datetime = data["fecha_fin"]
-    modalidad = data.get("modalidad")
-
-    articulo: Articulo | None = Articulo.query.get(id_articulo)
-    if not articulo:
-        raise ApiError("El artículo especificado no existe.", status_code=404)
-
-    # En tu DDL tienes estado_publicacion; aquí asumimos que 'eliminado'
-    # o 'pausado' no deben permitir nuevas rentas.
-    if articulo.estado_publicacion not in ("publicado", "borrador"):
-        raise ApiError(
-            "El artículo no está disponible para renta.",
-            status_code=400,
-        )
-
-    arrendatario: Usuario | None = Usuario.query.get(id_usuario_actual)
-    if not arrendatario:
-        raise ApiError("El usuario autenticado no existe.", status_code=404)
-
-    # validar que no se rente su propio artículo (opcional, pero lógico)
-    if articulo.id_propietario == id_usuario_actual:
-        raise ApiError("No puedes rentar tu propio artículo.", status_code=403)
-
-    # Validar disponibilidad (rentas + bloqueos)
-    validar_disponibilidad_articulo(id_articulo, fecha_inicio, fecha_fin)
-
-    # Validar disponibilidad por traslapes contra rentas activas
-    _validar_no_traslape_rentas(id_articulo, fecha_inicio, fecha_fin)
-
-    # BD real: 1 modalidad por artículo (unidad_precio).
-    unidad_articulo = getattr(articulo, "unidad_precio", None)
-    permite_horas = unidad_articulo == "por_hora"
-    permite_dias = unidad_articulo == "por_dia"
-
-    unidad_precio_calc = _unidad_precio_desde_modalidad(modalidad)
-    if unidad_precio_calc is None:
-        # default: inferir de la unidad del artículo
-        if permite_horas:
-            unidad_precio_calc = "por_hora"
-            modalidad = "horas"
-        elif permite_dias:
-            unidad_precio_calc = "por_dia"
-            modalidad = "dias"
-        else:
-            raise ApiError(
-                "Este artículo no se renta por horas ni por días.",
-                status_code=400,
-            )
-    else:
-        if unidad_precio_calc == "por_hora" and not permite_horas:
-            raise ApiError("Este artículo se renta por día, no por horas.", status_code=400)
-        if unidad_precio_calc == "por_dia" and not permite_dias:
-            raise ApiError("Este artículo se renta por hora, no por días.", status_code=400)
-
-    # Validación extra para modalidad horas: solo horas exactas (sin minutos)
-    if unidad_precio_calc == "por_hora":
-        if (
-            fecha_inicio.minute != 0
-            or fecha_fin.minute != 0
-            or fecha_inicio.second != 0
-            or fecha_fin.second != 0
-            or fecha_inicio.microsecond != 0
-            or fecha_fin.microsecond != 0
-        ):
-            raise ApiError("Solo se permiten horas exactas (sin minutos).", status_code=400)
-
-        segundos = (fecha_fin - fecha_inicio).total_seconds()
-        if segundos < 3600:
-            raise ApiError("La renta por horas debe ser de al menos 1 hora.", status_code=400)
-        if int(segundos) % 3600 != 0:
-            raise ApiError("Solo se permiten horas exactas (sin minutos).", status_code=400)
-
-        unidades = int(segundos // 3600)
-    else:
-        # Calcular unidades y precio según modalidad días
-        unidades = _calcular_unidades(unidad_precio_calc, fecha_inicio, fecha_fin)
-
-    # Precio por unidad (BD real: siempre precio_base)
-    precio_unit = float(articulo.precio_base)
-
-    precio_total_renta = precio_unit * unidades
-    monto_deposito = articulo.monto_deposito if articulo.monto_deposito is not None else 0
-
-    renta = Renta(
-        id_articulo=articulo.id_articulo,
-        id_arrendatario=arrendatario.id_usuario,
-        id_propietario=articulo.id_propietario,
-        fecha_inicio=fecha_inicio,
-        fecha_fin=fecha_fin,
-        precio_total_renta=precio_total_renta,
-        monto_deposito=monto_deposito,
-        estado_renta="pendiente_pago",
-        entregado=False,
-        devuelto=False,
-        deposito_liberado=False,
-    )
+    La sección crítica se reintenta ante deadlock / lock wait timeout.
+    """
 
-    db.session.add(renta)
-    db.session.commit()
+    renta = reserva_lock_service.ejecutar_con_reintentos(_reservar_renta, data, id_usuario_actual)
 
     # Notificar a ambos (best-effort, dedupe por event_key)
     try:
@@ -884,6 +912,114 @@ def crear_renta(data: dict, id_usuario_actual: int) -> dict:
     return _renta_to_dict(renta, id_usuario_actual=id_usuario_actual)
 
 
+def _reservar_renta(data: dict, id_usuario_actual: int) -> Renta:
+    id_articulo = data["id_articulo"]
+    fecha_inicio: datetime = data["fecha_inicio"]
+    fecha_fin: datetime = data["fecha_fin"]
+    modalidad = data.get("modalidad")
+
+    # Todo bajo el lock del artículo: en MySQL el FOR UPDATE abre la
+    # transacción, así las lecturas (artículo, traslapes) son posteriores a
+    # cualquier reserva confirmada mientras se esperaba.
+    with reserva_lock_service.bloquear_articulo(id_articulo):
+        articulo: Articulo | None = db.session.get(Articulo, id_articulo)
+        if not articulo:
+            raise ApiError("El artículo especificado no existe.", status_code=404)
+
+        # En tu DDL tienes estado_publicacion; aquí asumimos que 'eliminado'
+        # o 'pausado' no deben permitir nuevas rentas.
+        if articulo.estado_publicacion not in ("publicado", "borrador"):
+            raise ApiError(
+                "El artículo no está disponible para renta.",
+                status_code=400,
+            )
+
+        arrendatario: Usuario | None = Usuario.query.get(id_usuario_actual)
+        if not arrendatario:
+            raise ApiError("El usuario autenticado no existe.", status_code=404)
+
+        # validar que no se rente su propio artículo (opcional, pero lógico)
+        if articulo.id_propietario == id_usuario_actual:
+            raise ApiError("No puedes rentar tu propio artículo.", status_code=403)
+
+        # Modalidades según tarifas guardadas (hora y/o día/semana).
+        permite_horas = articulo.permite_horas
+        permite_dias = articulo.permite_dias
+
+        unidad_precio_calc = _unidad_precio_desde_modalidad(modalidad)
+        if unidad_precio_calc is None:
+            # default: inferir de la unidad principal del artículo
+            if permite_dias:
+                unidad_precio_calc = "por_dia"
+                modalidad = "dias"
+            elif permite_horas:
+                unidad_precio_calc = "por_hora"
+                modalidad = "horas"
+            else:
+                raise ApiError(
+                    "Este artículo no se renta por horas ni por días.",
+                    status_code=400,
+                )
+        else:
+            if unidad_precio_calc == "por_hora" and not permite_horas:
+                raise ApiError("Este artículo se renta por día, no por horas.", status_code=400)
+            if unidad_precio_calc == "por_dia" and not permite_dias:
+                raise ApiError("Este artículo se renta por hora, no por días.", status_code=400)
+
+        # Validación extra para modalidad horas: solo horas exactas (sin minutos)
+        if unidad_precio_calc == "por_hora":
+            if (
+                fecha_inicio.minute != 0
+                or fecha_fin.minute != 0
+                or fecha_inicio.second != 0
+                or fecha_fin.second != 0
+                or fecha_inicio.microsecond != 0
+                or fecha_fin.microsecond != 0
+            ):
+                raise ApiError("Solo se permiten horas exactas (sin minutos).", status_code=400)
+
+            segundos = (fecha_fin - fecha_inicio).total_seconds()
+            if segundos < 3600:
+                raise ApiError("La renta por horas debe ser de al menos 1 hora.", status_code=400)
+            if int(segundos) % 3600 != 0:
+                raise ApiError("Solo se permiten horas exactas (sin minutos).", status_code=400)
+
+            unidades = int(segundos // 3600)
+        else:
+            # Calcular unidades y precio según modalidad días
+            unidades = _calcular_unidades(unidad_precio_calc, fecha_inicio, fecha_fin)
+
+        # Precio: mejor combinación semanas + días + horas con las tarifas del artículo
+        horas_cobradas = unidades if unidad_precio_calc == "por_hora" else unidades * 24
+        precio_total_renta = cotizacion_service.precio_renta(articulo, horas_cobradas)["precio_total"]
+        monto_deposito = articulo.monto_deposito if articulo.monto_deposito is not None else 0
+
+        # Validar disponibilidad (rentas + bloqueos)
+        validar_disponibilidad_articulo(id_articulo, fecha_inicio, fecha_fin)
+
+        # Validar disponibilidad por traslapes contra rentas activas
+        _validar_no_traslape_rentas(id_articulo, fecha_inicio, fecha_fin)
+
+        renta = Renta(
+            id_articulo=articulo.id_articulo,
+            id_arrendatario=arrendatario.id_usuario,
+            id_propietario=articulo.id_propietario,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            precio_total_renta=precio_total_renta,
+            monto_deposito=monto_deposito,
+            estado_renta="pendiente_pago",
+            entregado=False,
+            devuelto=False,
+            deposito_liberado=False,
+        )
+
+        db.session.add(renta)
+        db.session.commit()
+
+    return renta
+
+
 def obtener_renta(id_renta: int, id_usuario_actual: int) -> dict:
     renta: Renta | None = Renta.query.get(id_renta)
     if not renta:
@@ -897,6 +1033,40 @@ def obtener_renta(id_renta: int, id_usuario_actual: int) -> dict:
     return _renta_to_dict(renta, id_usuario_actual=id_usuario_actual)
 
 
+def version_renta(id_renta: int, id_usuario_actual: int) -> tuple | None:
+    """Sello de versión para el ETag de obtener_renta (sin cargar ni serializar la renta).
+
+    Incluye el sello del artículo: la respuesta embebe su título, tarifas,
+    depósito y ubicación. None si no aplica: la renta no existe, el usuario no
+    participa (la vista responde 404/403) o sigue pendiente de pago (puede
+    expirar al leerse).
+    """
+
+    fila = (
+        db.session.query(
+            Renta.id_arrendatario,
+            Renta.id_propietario,
+            Renta.estado_renta,
+            Renta.fecha_actualizacion,
+            Articulo.actualizado_en,
+        )
+        .outerjoin(Articulo, Articulo.id_articulo == Renta.id_articulo)
+        .filter(Renta.id == id_renta)
+        .first()
+    )
+    if not fila or id_usuario_actual not in (fila[0], fila[1]) or fila[2] == "pendiente_pago":
+        return None
+
+    # El incidente vive en su tabla; su resolución no siempre toca la renta.
+    incidente = (
+        db.session.query(func.max(IncidenteRenta.id), func.max(IncidenteRenta.resolved_at))
+        .filter(IncidenteRenta.id_renta == id_renta)
+        .one()
+    )
+    # La respuesta depende del usuario (códigos OTP, dirección): va en el sello.
+    return (id_usuario_actual, fila[3], fila[4], *incidente)
+
+
 def generar_recibo_pdf(id_renta: int, id_usuario_actual: int) -> bytes:
     renta: Renta | None = Renta.query.get(id_renta)
     if not renta:
@@ -1249,20 +1419,7 @@ def devolver(id_renta: int, id_usuario_actual: int) -> dict:
     return _renta_to_dict(renta, id_usuario_actual=id_usuario_actual)
 
 
-def finalizar(id_renta: int, id_usuario_actual: int) -> dict:
-    renta: Renta | None = Renta.query.get(id_renta)
-    if not renta:
-        raise ApiError("Renta no encontrada.", status_code=404)
-
-    if renta.id_propietario != id_usuario_actual:
-        raise ApiError("Solo el dueño puede finalizar la renta.", status_code=403)
-
-    if renta.estado_renta != "en_curso" or not renta.devuelto:
-        # Idempotencia
-        if renta.estado_renta == "completada" and renta.deposito_liberado:
-            return _renta_to_dict(renta, id_usuario_actual=id_usuario_actual)
-        raise ApiError("La renta debe estar devuelta para finalizarse.", status_code=400)
-
+def _completar_y_liberar_deposito(renta: Renta) -> None:
     renta.estado_renta = "completada"
     renta.deposito_liberado = True
     renta.fecha_liberacion_deposito = datetime.utcnow()
@@ -1293,9 +1450,67 @@ def finalizar(id_renta: int, id_usuario_actual: int) -> dict:
         event_key=f"DEPOSITO_LIBERADO:{renta.id}:{renta.id_arrendatario}",
     )
 
+
+def finalizar(id_renta: int, id_usuario_actual: int) -> dict:
+    renta: Renta | None = Renta.query.get(id_renta)
+    if not renta:
+        raise ApiError("Renta no encontrada.", status_code=404)
+
+    if renta.id_propietario != id_usuario_actual:
+        raise ApiError("Solo el dueño puede finalizar la renta.", status_code=403)
+
+    if renta.estado_renta != "en_curso" or not renta.devuelto:
+        # Idempotencia
+        if renta.estado_renta == "completada" and renta.deposito_liberado:
+            return _renta_to_dict(renta, id_usuario_actual=id_usuario_actual)
+        raise ApiError("La renta debe estar devuelta para finalizarse.", status_code=400)
+
+    _completar_y_liberar_deposito(renta)
+
     return _renta_to_dict(renta, id_usuario_actual=id_usuario_actual)
 
 
+# =========================
+# Mantenimiento por lotes (scheduler)
+# =========================
+
+
+def expirar_pagos_vencidos(limite: int = 500) -> int:
+    """Expira en bloque las reservas sin pago (lo mismo que se hace lazy al leerlas)."""
+
+    corte = datetime.utcnow() - timedelta(minutes=_get_pago_expira_minutos())
+    rentas = (
+        Renta.query.filter(
+            Renta.estado_renta == "pendiente_pago",
+            Renta.fecha_creacion < corte,
+        )
+        .order_by(Renta.id.asc())
+        .limit(limite)
+        .all()
+    )
+    return sum(1 for r in rentas if _marcar_expirada_si_corresponde(r))
+
+
+def finalizar_devoluciones_vencidas(horas: int, limite: int = 200) -> int:
+    """Finaliza y libera depósito de rentas devueltas hace más de `horas` sin incidente."""
+
+    corte = datetime.utcnow() - timedelta(hours=horas)
+    rentas = (
+        Renta.query.filter(
+            Renta.estado_renta == "en_curso",
+            Renta.devuelto == True,  # noqa: E712
+            or_(Renta.deposito_liberado.is_(None), Renta.deposito_liberado == False),  # noqa: E712
+            Renta.fecha_devolucion < corte,
+        )
+        .order_by(Renta.id.asc())
+        .limit(limite)
+        .all()
+    )
+    for renta in rentas:
+        _completar_y_liberar_deposito(renta)
+    return len(rentas)
+
+
 def reportar_incidente(id_renta: int, id_usuario_actual: int, descripcion: str | None) -> dict:
     renta: Renta | None = Renta.query.get(id_renta)
     if not renta:
@@ -1576,25 +1791,16 @@ def coordinar_renta(id_renta: int, id_usuario_actual: int, payload: dict) -> dic
                 raise ApiError("id_punto_entrega inválido.", status_code=400)
 
             try:
-                p: PuntoEntrega | None = PuntoEntrega.query.get(id_punto_int)
-                if not p or not getattr(p, "activo", False):
+                pe = referencia_service.punto_entrega_activo(id_punto_int, confirmar=True)
+                if not pe:
                     raise ApiError("Punto de entrega no disponible.", status_code=400)
-                pe = {
-                    "id": p.id,
-                    "nombre": p.nombre,
-                    "direccion": p.direccion,
-                    "ciudad": None,
-                    "estado": None,
-                    "horario": None,
-                    "notas": None,
-                }
             except (OperationalError, ProgrammingError):
                 # Compat: si faltan migraciones, no rompemos, pero tampoco permitimos selección.
                 raise ApiError("Puntos de entrega no disponibles.", status_code=501)
 
             _pe_set_in_notes(renta, pe)
             # Para UX: mostrar el nombre del punto como zona pública y evitar dirección privada
-            renta.zona_publica = p.nombre
+            renta.zona_publica = pe["nombre"]
             renta.direccion_entrega = None
 
     ventanas_entrega = payload.get("ventanas_entrega_propuestas")
@@ -1890,6 +2096,43 @@ def obtener_chat(id_renta: int, id_usuario_actual: int) -> list[dict]:
     ]
 
 
+def obtener_chat_historial(id_renta: int, id_usuario_actual: int) -> list[dict]:
+    """Chat completo (incluye lo archivado por retención); también para rentas cerradas.
+
+    Las fechas van tal cual: el proveedor JSON de la app las convierte.
+    """
+
+    renta: Renta | None = Renta.query.get(id_renta)
+    if not renta:
+        raise ApiError("Renta no encontrada.", status_code=404)
+    if id_usuario_actual not in (renta.id_arrendatario, renta.id_propietario):
+        raise ApiError("No tienes permisos para ver el chat.", status_code=403)
+
+    try:
+        archivados = retencion_service.mensajes_archivados(renta.id)
+        vivos = (
+            MensajeRenta.query.filter_by(id_renta=renta.id)
+            .order_by(MensajeRenta.created_at.asc(), MensajeRenta.id.asc())
+            .all()
+        )
+    except (OperationalError, ProgrammingError):
+        raise ApiError("Chat no disponible (faltan migraciones).", status_code=501)
+
+    items = [(m, True) for m in archivados] + [(m, False) for m in vivos]
+    items.sort(key=lambda x: (x[0].created_at or datetime.min, x[0].id))
+    return [
+        {
+            "id": m.id,
+            "id_renta": m.id_renta,
+            "id_emisor": m.id_emisor,
+            "mensaje": m.mensaje,
+            "created_at": m.created_at,
+            "archivado": archivado,
+        }
+        for m, archivado in items
+    ]
+
+
 def enviar_chat(id_renta: int, id_usuario_actual: int, payload: dict) -> dict:
     renta: Renta | None = Renta.query.get(id_renta)
     if not renta:
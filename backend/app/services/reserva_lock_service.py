@@ -0,0 +1,160 @@
+"""Coordinador de reservas: serializa la creación de rentas por artículo.
+
+- MySQL: bloqueo exclusivo de la fila del artículo (SELECT ... FOR UPDATE),
+  que se libera al hacer commit/rollback de la transacción. El FOR UPDATE abre
+  una transacción nueva: con REPEATABLE READ el snapshot se fija en la primera
+  lectura, y uno tomado antes del lock no vería rentas confirmadas mientras se
+  esperaba. Los chequeos de traslape además son lecturas con lock (FOR SHARE).
+- SQLite (dev/tests): no hay bloqueo de filas; usamos locks en proceso
+  repartidos en franjas (striped) por id_articulo.
+
+Artículos distintos reservan en paralelo; los conflictos sobre el mismo
+artículo se resuelven esperando el lock o reintentando con jitter ante
+deadlock / lock wait timeout.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.extensions.db import db
+from app.models.articulo import Articulo
+from app.utils.errors import ApiError
+
+
+RESERVA_LOCK_STRIPES = 64
+RESERVA_LOCK_TIMEOUT_SECONDS_DEFAULT = 10
+RESERVA_LOCK_REINTENTOS_DEFAULT = 3
+RESERVA_LOCK_BACKOFF_MS_DEFAULT = 25
+
+# Códigos MySQL: 1213 = deadlock, 1205 = lock wait timeout.
+_MYSQL_CODIGOS_REINTENTABLES = (1213, 1205)
+
+_stripes = [threading.Lock() for _ in range(RESERVA_LOCK_STRIPES)]
+
+_INFO_ESCRIBIO = "reserva_lock_escribio"
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def _dialecto() -> str:
+    try:
+        return db.session.get_bind().dialect.name
+    except Exception:
+        return ""
+
+
+def _es_error_reintentable(err: OperationalError) -> bool:
+    orig = getattr(err, "orig", None)
+    args = getattr(orig, "args", None) or ()
+    if args and args[0] in _MYSQL_CODIGOS_REINTENTABLES:
+        return True
+    # SQLite: escritor concurrente
+    return "database is locked" in str(orig or err).lower()
+
+
+def _lock_local(id_articulo: int) -> threading.Lock:
+    return _stripes[int(id_articulo) % RESERVA_LOCK_STRIPES]
+
+
+@event.listens_for(Session, "after_flush")
+def _marcar_escritura(session, flush_context):
+    session.info[_INFO_ESCRIBIO] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _limpiar_escritura(session, *args):
+    session.info.pop(_INFO_ESCRIBIO, None)
+
+
+def _iniciar_transaccion() -> None:
+    # Cierra la transacción de solo lectura en curso (auth, validaciones previas)
+    # para que el FOR UPDATE sea su primera sentencia. Con escrituras del
+    # llamador sin confirmar no se toca: quedan las lecturas con lock.
+    s = db.session
+    if s.new or s.dirty or s.deleted or s.info.get(_INFO_ESCRIBIO):
+        return
+    s.commit()
+
+
+@contextmanager
+def bloquear_articulo(id_articulo: int):
+    """Toma el lock de reserva del artículo durante el bloque.
+
+    En MySQL el lock de fila dura hasta el commit/rollback de la transacción
+    actual, por lo que el commit de la renta debe ocurrir dentro del bloque.
+    El artículo queda cargado (con lo último confirmado) en la sesión:
+    `db.session.get(Articulo, id)` dentro del bloque no vuelve a consultar.
+    """
+
+    if _dialecto() == "mysql":
+        _iniciar_transaccion()
+        (
+            Articulo.query.filter(Articulo.id_articulo == id_articulo)
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
+        try:
+            yield
+        except Exception:
+            # Liberar el lock de fila de inmediato si la reserva se rechaza.
+            db.session.rollback()
+            raise
+        return
+
+    lock = _lock_local(id_articulo)
+    timeout = _get_config_int("RESERVA_LOCK_TIMEOUT_SECONDS", RESERVA_LOCK_TIMEOUT_SECONDS_DEFAULT, minimo=1)
+    if not lock.acquire(timeout=timeout):
+        raise ApiError(
+            "El artículo está siendo reservado por otra persona. Intenta de nuevo.",
+            status_code=409,
+            payload={"code": "RESERVA_EN_CURSO"},
+        )
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def ejecutar_con_reintentos(fn, *args, **kwargs):
+    """Ejecuta fn reintentando ante deadlock / lock wait timeout.
+
+    Cada reintento hace rollback y espera un backoff exponencial con jitter
+    completo (0..base*2^n ms). Otros errores se propagan sin reintentar.
+    """
+
+    reintentos = _get_config_int("RESERVA_LOCK_REINTENTOS", RESERVA_LOCK_REINTENTOS_DEFAULT)
+    base_ms = _get_config_int("RESERVA_LOCK_BACKOFF_MS", RESERVA_LOCK_BACKOFF_MS_DEFAULT, minimo=1)
+
+    intento = 0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except OperationalError as err:
+            db.session.rollback()
+            if intento >= reintentos or not _es_error_reintentable(err):
+                raise
+            espera_ms = random.uniform(0, base_ms * (2 ** intento))
+            intento += 1
+            current_app.logger.warning(
+                "[reservas] conflicto de lock (%s); reintento %s/%s en %.0fms",
+                getattr(err, "orig", None) or err,
+                intento,
+                reintentos,
+                espera_ms,
+            )
+            time.sleep(espera_ms / 1000.0)
@@ -0,0 +1,118 @@
+"""Retención: mueve notificaciones leídas antiguas y chats de rentas cerradas a tablas de archivo.
+
+Se trabaja por lotes de RETENCION_LOTE ids: INSERT ... SELECT al archivo y
+DELETE de la tabla viva en la misma transacción corta, hasta
+RETENCION_MAX_LOTES por corrida. Así las tablas vivas (y sus COUNT de no
+leídos / listados) solo cargan lo reciente. Lo archivado se sigue pudiendo
+consultar bajo demanda (historial de chat y notificaciones archivadas).
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert, literal, select
+
+from app.extensions.db import db
+from app.models.archivo import MensajeRentaArchivado, NotificacionArchivada
+from app.models.mensaje_renta import MensajeRenta
+from app.models.notificacion import Notificacion
+from app.models.renta import Renta
+
+
+RETENCION_NOTIFICACIONES_DIAS_DEFAULT = 90
+RETENCION_CHAT_DIAS_DEFAULT = 30
+RETENCION_LOTE_DEFAULT = 500
+RETENCION_MAX_LOTES_DEFAULT = 200
+
+ESTADOS_RENTA_CERRADA = ("completada", "cancelada")
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def _mover_por_lotes(seleccionar_ids, mover_lote) -> int:
+    lote = _get_config_int("RETENCION_LOTE", RETENCION_LOTE_DEFAULT, minimo=1)
+    max_lotes = _get_config_int("RETENCION_MAX_LOTES", RETENCION_MAX_LOTES_DEFAULT, minimo=1)
+
+    total = 0
+    for _ in range(max_lotes):
+        ids = seleccionar_ids(lote)
+        if not ids:
+            break
+        try:
+            mover_lote(ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        total += len(ids)
+        if len(ids) < lote:
+            break
+    return total
+
+
+def archivar_notificaciones() -> int:
+    """Archiva notificaciones leídas con más de RETENCION_NOTIFICACIONES_DIAS días."""
+
+    dias = _get_config_int("RETENCION_NOTIFICACIONES_DIAS", RETENCION_NOTIFICACIONES_DIAS_DEFAULT, minimo=1)
+    corte = datetime.utcnow() - timedelta(days=dias)
+    ahora = datetime.utcnow()
+
+    def _ids(lote: int) -> list[int]:
+        return [
+            r[0]
+            for r in db.session.query(Notificacion.id)
+            .filter(Notificacion.leida == True, Notificacion.created_at < corte)  # noqa: E712
+            .order_by(Notificacion.id.asc())
+            .limit(lote)
+            .all()
+        ]
+
+    def _mover(ids: list[int]) -> None:
+        cols = ("id", "id_usuario", "tipo", "mensaje", "leida", "created_at", "meta_json")
+        sel = select(*(getattr(Notificacion, c) for c in cols), literal(ahora)).where(Notificacion.id.in_(ids))
+        db.session.execute(insert(NotificacionArchivada).from_select([*cols, "archivada_en"], sel))
+        Notificacion.query.filter(Notificacion.id.in_(ids)).delete(synchronize_session=False)
+
+    return _mover_por_lotes(_ids, _mover)
+
+
+def archivar_chats_cerrados() -> int:
+    """Archiva mensajes de rentas completadas/canceladas hace más de RETENCION_CHAT_DIAS días."""
+
+    dias = _get_config_int("RETENCION_CHAT_DIAS", RETENCION_CHAT_DIAS_DEFAULT, minimo=0)
+    corte = datetime.utcnow() - timedelta(days=dias)
+    ahora = datetime.utcnow()
+
+    def _ids(lote: int) -> list[int]:
+        return [
+            r[0]
+            for r in db.session.query(MensajeRenta.id)
+            .join(Renta, Renta.id == MensajeRenta.id_renta)
+            .filter(Renta.estado_renta.in_(ESTADOS_RENTA_CERRADA), Renta.fecha_actualizacion < corte)
+            .order_by(MensajeRenta.id.asc())
+            .limit(lote)
+            .all()
+        ]
+
+    def _mover(ids: list[int]) -> None:
+        cols = ("id", "id_renta", "id_emisor", "mensaje", "created_at")
+        sel = select(*(getattr(MensajeRenta, c) for c in cols), literal(ahora)).where(MensajeRenta.id.in_(ids))
+        db.session.execute(insert(MensajeRentaArchivado).from_select([*cols, "archivado_en"], sel))
+        MensajeRenta.query.filter(MensajeRenta.id.in_(ids)).delete(synchronize_session=False)
+
+    return _mover_por_lotes(_ids, _mover)
+
+
+def mensajes_archivados(id_renta: int) -> list[MensajeRentaArchivado]:
+    return (
+        MensajeRentaArchivado.query.filter_by(id_renta=id_renta)
+        .order_by(MensajeRentaArchivado.created_at.asc(), MensajeRentaArchivado.id.asc())
+        .all()
+    )
+
@@ -0,0 +1,187 @@
+"""Health check profundo (/api/health/deep) con tiempos por dependencia.
+
+Revisa la ida y vuelta a la BD (primaria y réplicas), el estado del pool, el
+espacio libre y la escritura en UPLOADS_ARTICULOS_DIR, la antigüedad de la
+última ejecución de cada tarea programada, el acierto de las caches en proceso
+y el backlog de trabajo asíncrono (variantes de imágenes en cola).
+
+El resultado se cachea HEALTH_CACHE_SECONDS por proceso y solo un hilo lo
+recalcula a la vez: los probes del balanceador no multiplican la carga sobre
+la BD.
+
+Estado: "ok"; "degradado" (réplica caída, poco disco, tarea atrasada) sigue
+respondiendo 200; "error" (primaria o uploads no disponibles) responde 503.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import text
+
+from app.extensions import pool as db_pool
+from app.extensions.db import db
+from app.models.tarea_programada import BloqueoTarea
+from app.services import (
+    cotizacion_service,
+    imagenes_service,
+    ocupacion_service,
+    referencia_service,
+    tareas_service,
+)
+
+
+HEALTH_CACHE_SECONDS_DEFAULT = 2
+HEALTH_UPLOADS_MIN_LIBRE_MB_DEFAULT = 512
+
+_cache: dict = {}
+_lock = threading.Lock()
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def _ms(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 2)
+
+
+def _error(e: Exception) -> dict:
+    # Igual que /api/db-health: tipo y mensaje, sin credenciales.
+    return {"ok": False, "error_type": e.__class__.__name__, "error": str(e)[:300]}
+
+
+def _chequear_db() -> dict:
+    out = {}
+    for key, engine in db.engines.items():
+        t0 = time.perf_counter()
+        try:
+            # Conexión propia del pool: no depende de la sesión del request.
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            out[key or "primaria"] = {"ok": True, "latencia_ms": _ms(t0)}
+        except Exception as e:
+            out[key or "primaria"] = {**_error(e), "latencia_ms": _ms(t0)}
+    return out
+
+
+def _chequear_uploads() -> dict:
+    directorio = current_app.config["UPLOADS_ARTICULOS_DIR"]
+    minimo_mb = _get_config_int("HEALTH_UPLOADS_MIN_LIBRE_MB", HEALTH_UPLOADS_MIN_LIBRE_MB_DEFAULT)
+    t0 = time.perf_counter()
+    try:
+        uso = shutil.disk_usage(directorio)
+        with tempfile.NamedTemporaryFile(dir=directorio, prefix=".health-") as f:
+            f.write(b"ok")
+            f.flush()
+            os.fsync(f.fileno())
+    except Exception as e:
+        return {**_error(e), "escribible": False, "latencia_ms": _ms(t0)}
+
+    libre_mb = uso.free // (1024 * 1024)
+    return {
+        "ok": True,
+        "escribible": True,
+        "latencia_ms": _ms(t0),
+        "libre_mb": libre_mb,
+        "libre_pct": round(uso.free * 100 / uso.total, 1) if uso.total else None,
+        "poco_espacio": libre_mb < minimo_mb,
+    }
+
+
+def _chequear_tareas() -> dict:
+    ahora = datetime.utcnow()
+    try:
+        ultimas = tareas_service.ultimas_ejecuciones()
+        lider = db.session.get(BloqueoTarea, tareas_service.LOCK_LIDER)
+    except Exception as e:
+        db.session.rollback()
+        return _error(e)
+
+    tareas = {}
+    for nombre, t in tareas_service.tareas_registradas().items():
+        ultima = ultimas.get(nombre)
+        if ultima is None:
+            tareas[nombre] = {"ultima": None, "edad_segundos": None, "atrasada": False}
+            continue
+        edad = int((ahora - (ultima.fin or ultima.inicio)).total_seconds())
+        # Solo los intervalos tienen un periodo fijo con el que comparar.
+        periodo = getattr(t.disparador, "segundos", None)
+        tareas[nombre] = {
+            "ultima": ultima.estado,
+            "edad_segundos": edad,
+            "atrasada": bool(periodo) and edad > 2 * periodo,
+        }
+    return {
+        "ok": True,
+        "lider_vigente": bool(lider and lider.expires_at > ahora),
+        "tareas": tareas,
+    }
+
+
+def _con_tasa(stats: dict) -> dict:
+    total = stats.get("hits", 0) + stats.get("misses", 0)
+    return {**stats, "tasa_acierto": round(stats["hits"] / total, 3) if total else None}
+
+
+def estadisticas_caches() -> dict:
+    return {
+        "referencia": {t: _con_tasa(s) for t, s in referencia_service.estadisticas().items()},
+        "ocupacion": _con_tasa(ocupacion_service.estadisticas()),
+        "cotizacion": _con_tasa(cotizacion_service.estadisticas()),
+    }
+
+
+def _calcular(app) -> tuple[dict, int]:
+    t0 = time.perf_counter()
+    checks = {
+        "db": _chequear_db(),
+        "db_pool": db_pool.estadisticas(app),
+        "uploads": _chequear_uploads(),
+        "tareas": _chequear_tareas(),
+        "caches": estadisticas_caches(),
+        "backlog": {"variantes_imagenes": imagenes_service.variantes_pendientes()},
+    }
+
+    status = "ok"
+    replicas_ok = all(d["ok"] for k, d in checks["db"].items() if k != "primaria")
+    tareas = checks["tareas"].get("tareas", {})
+    if (
+        not replicas_ok
+        or not checks["tareas"]["ok"]
+        or checks["uploads"].get("poco_espacio")
+        or any(d["atrasada"] for d in tareas.values())
+    ):
+        status = "degradado"
+    if not checks["db"]["primaria"]["ok"] or not checks["uploads"]["ok"]:
+        status = "error"
+
+    resultado = {
+        "status": status,
+        "service": "micro-renta-backend",
+        "generado_en": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+        "duracion_ms": _ms(t0),
+        "checks": checks,
+    }
+    return resultado, (503 if status == "error" else 200)
+
+
+def chequeo_profundo(app) -> tuple[dict, int]:
+    """Resultado cacheado HEALTH_CACHE_SECONDS (un solo cálculo a la vez por proceso)."""
+
+    ttl = _get_config_int("HEALTH_CACHE_SECONDS", HEALTH_CACHE_SECONDS_DEFAULT)
+    with _lock:
+        previo = _cache.get(id(app))
+        if previo is not None and time.monotonic() - previo[0] < ttl:
+            return previo[1], previo[2]
+        resultado, codigo = _calcular(app)
+        _cache[id(app)] = (time.monotonic(), resultado, codigo)
+        return resultado, codigo
@@ -0,0 +1,215 @@
+"""Uploads reanudables de imágenes por chunks.
+
+Protocolo:
+1. init: el cliente declara tamaño total y SHA-256; se crea la sesión y un
+   archivo de staging en `<uploads>/.staging/<id>.part`.
+2. PUT por offset: cada chunk se escribe en su posición. Se aceptan offsets
+   ya recibidos (reintentos) pero no huecos; `recibido` es el siguiente
+   offset que falta, así que tras un corte el cliente consulta el estado y
+   reenvía solo desde ahí.
+3. finalizar: con todo recibido, se verifica el hash sobre el staging y el
+   archivo pasa al almacenamiento por contenido (imagenes_service).
+
+Cada request es corto (un chunk), así un worker no queda ocupado durante
+toda la subida en conexiones lentas.
+"""
+
+import hashlib
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update
+
+from app.extensions.db import db
+from app.models.subida_imagen import SubidaImagen
+from app.services import imagenes_service
+from app.utils.errors import ApiError
+
+
+IMAGENES_CHUNK_MAX_BYTES_DEFAULT = 4 * 1024 * 1024
+IMAGENES_SUBIDA_TTL_HORAS_DEFAULT = 24
+
+CARPETA_STAGING = ".staging"
+
+_RE_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def _ruta_staging(id_subida: str, upload_dir: str | None = None) -> str:
+    upload_dir = upload_dir or current_app.config["UPLOADS_ARTICULOS_DIR"]
+    return os.path.join(upload_dir, CARPETA_STAGING, f"{id_subida}.part")
+
+
+def _borrar_staging(id_subida: str, upload_dir: str | None = None) -> None:
+    try:
+        os.remove(_ruta_staging(id_subida, upload_dir))
+    except OSError:
+        pass
+
+
+def subida_to_dict(subida: SubidaImagen) -> dict:
+    return {
+        "id_subida": subida.id,
+        "id_articulo": subida.id_articulo,
+        "tamano_total": int(subida.tamano_total),
+        "recibido": int(subida.recibido),
+        "completa": int(subida.recibido) >= int(subida.tamano_total),
+        "tamano_chunk_max": _get_config_int("IMAGENES_CHUNK_MAX_BYTES", IMAGENES_CHUNK_MAX_BYTES_DEFAULT, minimo=1),
+        "expires_at": subida.expires_at.isoformat(),
+    }
+
+
+def iniciar(id_articulo: int, id_usuario: int, data: dict) -> SubidaImagen:
+    try:
+        tamano = int(data.get("tamano"))
+    except (TypeError, ValueError):
+        raise ApiError("tamano es requerido (bytes).", 400)
+    max_bytes = _get_config_int("IMAGENES_MAX_BYTES", imagenes_service.IMAGENES_MAX_BYTES_DEFAULT, minimo=1)
+    if tamano < 1:
+        raise ApiError("tamano debe ser mayor a 0.", 400)
+    if tamano > max_bytes:
+        raise ApiError(f"La imagen excede el tamaño máximo ({max_bytes // (1024 * 1024)} MB).", 413)
+
+    sha256 = str(data.get("sha256") or "").strip().lower()
+    if not _RE_SHA256.match(sha256):
+        raise ApiError("sha256 inválido (64 caracteres hex).", 400)
+
+    ttl = _get_config_int("IMAGENES_SUBIDA_TTL_HORAS", IMAGENES_SUBIDA_TTL_HORAS_DEFAULT, minimo=1)
+    ahora = datetime.utcnow()
+    subida = SubidaImagen(
+        id=uuid.uuid4().hex,
+        id_articulo=id_articulo,
+        id_usuario=id_usuario,
+        nombre_original=(str(data.get("nombre") or "")[:255] or None),
+        tamano_total=tamano,
+        sha256_esperado=sha256,
+        recibido=0,
+        created_at=ahora,
+        updated_at=ahora,
+        expires_at=ahora + timedelta(hours=ttl),
+    )
+
+    ruta = _ruta_staging(subida.id)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "wb"):
+        pass
+
+    db.session.add(subida)
+    db.session.commit()
+    return subida
+
+
+def obtener(id_articulo: int, id_subida: str, id_usuario: int) -> SubidaImagen:
+    subida = db.session.get(SubidaImagen, id_subida)
+    if not subida or subida.id_articulo != id_articulo:
+        raise ApiError("Subida no encontrada.", 404)
+    if subida.id_usuario != id_usuario:
+        raise ApiError("No autorizado", 403)
+    if subida.expires_at < datetime.utcnow():
+        raise ApiError("La subida expiró. Inicia una nueva.", 410)
+    return subida
+
+
+def escribir_chunk(subida: SubidaImagen, offset: int, stream, longitud: int | None) -> SubidaImagen:
+    """Escribe el cuerpo del request en `offset` y avanza `recibido` si es contiguo."""
+
+    recibido = int(subida.recibido)
+    total = int(subida.tamano_total)
+    if offset < 0:
+        raise ApiError("offset inválido.", 400)
+    if offset > recibido:
+        raise ApiError(
+            "Offset fuera de orden: faltan bytes anteriores.",
+            409,
+            payload={"recibido": recibido},
+        )
+
+    max_chunk = _get_config_int("IMAGENES_CHUNK_MAX_BYTES", IMAGENES_CHUNK_MAX_BYTES_DEFAULT, minimo=1)
+    if longitud is not None and longitud > max_chunk:
+        raise ApiError(f"El chunk excede {max_chunk} bytes.", 413)
+
+    escritos = 0
+    with open(_ruta_staging(subida.id), "r+b") as out:
+        out.seek(offset)
+        while True:
+            bloque = stream.read(imagenes_service.BLOQUE_BYTES)
+            if not bloque:
+                break
+            if offset == 0 and escritos == 0 and imagenes_service.detectar_formato(bloque) is None:
+                raise ApiError("Formato inválido. Solo se permiten: jpg, jpeg, png, webp.", 400)
+            escritos += len(bloque)
+            if escritos > max_chunk:
+                raise ApiError(f"El chunk excede {max_chunk} bytes.", 413)
+            if offset + escritos > total:
+                raise ApiError("El chunk excede el tamaño declarado.", 400)
+            out.write(bloque)
+
+    nuevo = offset + escritos
+    if nuevo > recibido:
+        # Condicional: dos reintentos concurrentes nunca hacen retroceder el offset.
+        db.session.execute(
+            update(SubidaImagen)
+            .where(SubidaImagen.id == subida.id, SubidaImagen.recibido < nuevo)
+            .values(recibido=nuevo, updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+        db.session.refresh(subida)
+    return subida
+
+
+def finalizar(subida: SubidaImagen, upload_dir: str) -> imagenes_service.UploadGuardado:
+    """Verifica el hash del staging y lo mueve al almacenamiento por contenido."""
+
+    if int(subida.recibido) < int(subida.tamano_total):
+        raise ApiError(
+            "La subida está incompleta.",
+            409,
+            payload={"recibido": int(subida.recibido)},
+        )
+
+    ruta = _ruta_staging(subida.id, upload_dir)
+    digest = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        cabecera = f.read(imagenes_service.BLOQUE_BYTES)
+        bloque = cabecera
+        while bloque:
+            digest.update(bloque)
+            bloque = f.read(imagenes_service.BLOQUE_BYTES)
+
+    ext = imagenes_service.detectar_formato(cabecera)
+    if digest.hexdigest() != subida.sha256_esperado or ext is None:
+        # El contenido no es el declarado: se descarta la sesión completa.
+        db.session.delete(subida)
+        db.session.commit()
+        _borrar_staging(subida.id, upload_dir)
+        raise ApiError("El hash del archivo no coincide con el declarado.", 422)
+
+    guardado = imagenes_service.mover_a_almacen(ruta, subida.sha256_esperado, ext, upload_dir)
+    db.session.delete(subida)
+    return guardado
+
+
+def purgar_vencidas(limite: int = 500) -> int:
+    """Borra sesiones vencidas y su staging."""
+
+    vencidas = (
+        SubidaImagen.query.filter(SubidaImagen.expires_at < datetime.utcnow())
+        .order_by(SubidaImagen.expires_at.asc())
+        .limit(limite)
+        .all()
+    )
+    for subida in vencidas:
+        _borrar_staging(subida.id)
+        db.session.delete(subida)
+    db.session.commit()
+    return len(vencidas)
@@ -0,0 +1,348 @@
+"""Scheduler en proceso para tareas de mantenimiento (`flask jobs ...`).
+
+- Disparadores: Intervalo (cada N segundos) y Cron (5 campos, UTC).
+- Un solo ejecutor entre instancias: el que tiene el lease de la fila
+  `bloqueos_tareas` "scheduler". Los demás quedan en espera y toman el relevo
+  si el lease vence sin renovarse.
+- Cada tarea además toma su propia fila de lock mientras corre, así que un
+  `flask jobs once` manual no se pisa con el ejecutor programado.
+- Cada ejecución queda en `ejecuciones_tareas` (estado, resultado, duración);
+  al arrancar, las próximas ejecuciones se calculan desde ese historial.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions.db import db
+from app.models.tarea_programada import BloqueoTarea, EjecucionTarea
+
+
+JOBS_LEASE_SECONDS_DEFAULT = 60
+JOBS_TICK_SECONDS_DEFAULT = 5
+JOBS_TAREA_LOCK_SECONDS_DEFAULT = 1800
+
+LOCK_LIDER = "scheduler"
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+# =========================
+# Disparadores
+# =========================
+
+
+class Intervalo:
+    """Cada `segundos`, contando desde la última ejecución."""
+
+    __slots__ = ("segundos",)
+
+    def __init__(self, segundos: int):
+        if segundos < 1:
+            raise ValueError("El intervalo debe ser de al menos 1 segundo.")
+        self.segundos = int(segundos)
+
+    def siguiente(self, desde: datetime) -> datetime:
+        return desde + timedelta(seconds=self.segundos)
+
+    def __str__(self) -> str:
+        return f"cada {self.segundos}s"
+
+
+def _campo_cron(expr: str, minimo: int, maximo: int) -> frozenset[int]:
+    valores: set[int] = set()
+    for parte in expr.split(","):
+        paso = 1
+        if "/" in parte:
+            parte, p = parte.split("/", 1)
+            paso = int(p)
+            if paso < 1:
+                raise ValueError(f"Paso inválido en cron: {expr}")
+        if parte == "*":
+            a, b = minimo, maximo
+        elif "-" in parte:
+            a, b = (int(x) for x in parte.split("-", 1))
+        else:
+            a = b = int(parte)
+        if a < minimo or b > maximo or a > b:
+            raise ValueError(f"Valor fuera de rango en cron: {expr}")
+        valores.update(range(a, b + 1, paso))
+    return frozenset(valores)
+
+
+class Cron:
+    """Expresión cron de 5 campos: minuto hora día-mes mes día-semana (0/7 = domingo).
+
+    Como en cron clásico, si día-mes y día-semana están restringidos basta con
+    que coincida cualquiera de los dos.
+    """
+
+    __slots__ = ("expr", "minutos", "horas", "dias_mes", "meses", "dias_semana", "_dom_libre", "_dow_libre")
+
+    def __init__(self, expr: str):
+        partes = str(expr).split()
+        if len(partes) != 5:
+            raise ValueError("La expresión cron debe tener 5 campos.")
+        self.expr = " ".join(partes)
+        self.minutos = _campo_cron(partes[0], 0, 59)
+        self.horas = _campo_cron(partes[1], 0, 23)
+        self.dias_mes = _campo_cron(partes[2], 1, 31)
+        self.meses = _campo_cron(partes[3], 1, 12)
+        self.dias_semana = frozenset(d % 7 for d in _campo_cron(partes[4], 0, 7))
+        self._dom_libre = partes[2] == "*"
+        self._dow_libre = partes[4] == "*"
+
+    def _dia_ok(self, t: datetime) -> bool:
+        dom = t.day in self.dias_mes
+        dow = (t.isoweekday() % 7) in self.dias_semana
+        if self._dom_libre and self._dow_libre:
+            return True
+        if self._dom_libre:
+            return dow
+        if self._dow_libre:
+            return dom
+        return dom or dow
+
+    def siguiente(self, desde: datetime) -> datetime:
+        t = desde.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = t + timedelta(days=366 * 5)
+        while t < limite:
+            if t.month not in self.meses:
+                anio, mes = (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+                t = datetime(anio, mes, 1)
+                continue
+            if not self._dia_ok(t):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+            if t.hour not in self.horas:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutos:
+                t += timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"La expresión cron nunca se cumple: {self.expr}")
+
+    def __str__(self) -> str:
+        return f"cron '{self.expr}'"
+
+
+# =========================
+# Registro
+# =========================
+
+
+class Tarea:
+    __slots__ = ("nombre", "fn", "disparador", "descripcion")
+
+    def __init__(self, nombre: str, fn, disparador, descripcion: str = ""):
+        self.nombre = nombre
+        self.fn = fn
+        self.disparador = disparador
+        self.descripcion = descripcion
+
+
+_registro: dict[str, Tarea] = {}
+
+
+def tarea(nombre: str, cada: int | None = None, cron: str | None = None, descripcion: str = ""):
+    """Registra una función como tarea programada (exactamente uno de cada/cron)."""
+
+    if (cada is None) == (cron is None):
+        raise ValueError("Indica exactamente uno de: cada, cron.")
+    disparador = Intervalo(cada) if cada is not None else Cron(cron)
+
+    def deco(fn):
+        _registro[nombre] = Tarea(nombre, fn, disparador, descripcion or (fn.__doc__ or "").strip().split("\n")[0])
+        return fn
+
+    return deco
+
+
+def tareas_registradas() -> dict[str, Tarea]:
+    # Las tareas se registran al importar el módulo de mantenimiento.
+    from app.services import mantenimiento_service  # noqa: F401
+
+    return dict(_registro)
+
+
+# =========================
+# Locks con lease (fila en BD)
+# =========================
+
+
+def owner_actual() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def tomar_lock(nombre: str, owner: str, segundos: int) -> bool:
+    """Toma o renueva el lock `nombre`. Devuelve False si lo tiene otro y no ha vencido."""
+
+    ahora = datetime.utcnow()
+    vence = ahora + timedelta(seconds=segundos)
+    n = (
+        BloqueoTarea.query.filter(
+            BloqueoTarea.nombre == nombre,
+            or_(BloqueoTarea.owner == owner, BloqueoTarea.expires_at < ahora),
+        ).update({"owner": owner, "expires_at": vence, "updated_at": ahora}, synchronize_session=False)
+    )
+    if n:
+        db.session.commit()
+        return True
+
+    try:
+        db.session.add(BloqueoTarea(nombre=nombre, owner=owner, expires_at=vence, updated_at=ahora))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        # Ya existe y es de otro (vigente).
+        db.session.rollback()
+        return False
+
+
+def soltar_lock(nombre: str, owner: str) -> None:
+    try:
+        BloqueoTarea.query.filter_by(nombre=nombre, owner=owner).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
+# =========================
+# Ejecución
+# =========================
+
+
+def _resumen(resultado) -> str | None:
+    if resultado is None:
+        return None
+    try:
+        return json.dumps(resultado, default=str, ensure_ascii=False)[:4000]
+    except Exception:
+        return str(resultado)[:4000]
+
+
+def ejecutar_tarea(nombre: str, owner: str | None = None) -> EjecucionTarea:
+    """Ejecuta una tarea registrada ya mismo y deja registro en el historial."""
+
+    registro = tareas_registradas()
+    if nombre not in registro:
+        raise KeyError(nombre)
+    t = registro[nombre]
+    owner = owner or owner_actual()
+
+    ejecucion = EjecucionTarea(nombre=nombre, owner=owner, estado="en_curso", inicio=datetime.utcnow())
+    lock_segundos = _get_config_int("JOBS_TAREA_LOCK_SECONDS", JOBS_TAREA_LOCK_SECONDS_DEFAULT, minimo=1)
+    if not tomar_lock(f"tarea:{nombre}", owner, lock_segundos):
+        ejecucion.estado = "omitida"
+        ejecucion.resultado = "La tarea ya se está ejecutando en otro proceso."
+        ejecucion.fin = ejecucion.inicio
+        ejecucion.duracion_ms = 0
+        db.session.add(ejecucion)
+        db.session.commit()
+        return ejecucion
+
+    db.session.add(ejecucion)
+    db.session.commit()
+    id_ejecucion = ejecucion.id
+
+    t0 = time.monotonic()
+    try:
+        resultado = t.fn()
+        estado, error = "ok", None
+    except Exception as err:
+        db.session.rollback()
+        current_app.logger.exception("[jobs] la tarea %s falló", nombre)
+        resultado, estado, error = None, "error", f"{err.__class__.__name__}: {err}"[:4000]
+    finally:
+        soltar_lock(f"tarea:{nombre}", owner)
+
+    ejecucion = db.session.get(EjecucionTarea, id_ejecucion)
+    ejecucion.estado = estado
+    ejecucion.resultado = _resumen(resultado)
+    ejecucion.error = error
+    ejecucion.fin = datetime.utcnow()
+    ejecucion.duracion_ms = int((time.monotonic() - t0) * 1000)
+    db.session.commit()
+    return ejecucion
+
+
+def ultimas_ejecuciones() -> dict[str, EjecucionTarea]:
+    """Última ejecución por tarea (una query agrupada + una por ids)."""
+
+    sub = (
+        db.session.query(func.max(EjecucionTarea.id))
+        .filter(EjecucionTarea.estado != "omitida")
+        .group_by(EjecucionTarea.nombre)
+    )
+    filas = EjecucionTarea.query.filter(EjecucionTarea.id.in_(sub)).all()
+    return {e.nombre: e for e in filas}
+
+
+def _proximas_desde_historial(registro: dict[str, Tarea], ahora: datetime) -> dict[str, datetime]:
+    ultimas = ultimas_ejecuciones()
+    out = {}
+    for nombre, t in registro.items():
+        ultima = ultimas.get(nombre)
+        if isinstance(t.disparador, Intervalo):
+            # Sin historial: corre en el primer ciclo.
+            out[nombre] = t.disparador.siguiente(ultima.inicio) if ultima else ahora
+        else:
+            out[nombre] = t.disparador.siguiente(ahora)
+    return out
+
+
+def correr(detener: threading.Event | None = None, max_ciclos: int | None = None, owner: str | None = None) -> None:
+    """Bucle del scheduler: elección de líder por lease + ejecución de tareas vencidas."""
+
+    registro = tareas_registradas()
+    owner = owner or owner_actual()
+    detener = detener or threading.Event()
+    lease = _get_config_int("JOBS_LEASE_SECONDS", JOBS_LEASE_SECONDS_DEFAULT, minimo=5)
+    tick = _get_config_int("JOBS_TICK_SECONDS", JOBS_TICK_SECONDS_DEFAULT, minimo=1)
+
+    es_lider = False
+    proximas: dict[str, datetime] = {}
+    ciclos = 0
+    try:
+        while not detener.is_set():
+            lider_ahora = tomar_lock(LOCK_LIDER, owner, lease)
+            if lider_ahora and not es_lider:
+                current_app.logger.info("[jobs] %s es el ejecutor de tareas", owner)
+                # Recalcular desde el historial: otro ejecutor pudo haber corrido tareas.
+                proximas = _proximas_desde_historial(registro, datetime.utcnow())
+            elif es_lider and not lider_ahora:
+                current_app.logger.warning("[jobs] %s perdió el liderazgo", owner)
+            es_lider = lider_ahora
+
+            if es_lider:
+                for nombre in sorted(proximas, key=proximas.get):
+                    if detener.is_set() or proximas[nombre] > datetime.utcnow():
+                        continue
+                    ejecutar_tarea(nombre, owner)
+                    proximas[nombre] = registro[nombre].disparador.siguiente(datetime.utcnow())
+                    # Renovar el lease entre tareas largas.
+                    if not tomar_lock(LOCK_LIDER, owner, lease):
+                        es_lider = False
+                        break
+
+            ciclos += 1
+            if max_ciclos is not None and ciclos >= max_ciclos:
+                break
+            detener.wait(tick)
+    finally:
+        if es_lider:
+            soltar_lock(LOCK_LIDER, owner)
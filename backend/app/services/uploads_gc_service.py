@@ -0,0 +1,207 @@
+"""Recolector de archivos huérfanos en UPLOADS_ARTICULOS_DIR (`flask uploads gc`).
+
+Es el único que borra archivos del almacén por contenido: los requests solo
+quitan filas (ver imagenes_service).
+
+- Referencias: se leen de articulos_imagenes por lotes de id (keyset) y se
+  guardan como digest de 8 bytes de la ruta relativa. Una colisión solo haría
+  conservar un huérfano, nunca borrar un archivo en uso.
+- Las filas de artículos con borrado lógico (estado "eliminado") dejan de
+  contar como referencia UPLOADS_GC_ELIMINADOS_DIAS después del borrado
+  (actualizado_en); hasta entonces se conservan por si se restaura. Un archivo
+  compartido con un artículo vigente sigue referenciado por la fila de este.
+- El directorio se recorre en streaming con os.scandir (pila de carpetas), sin
+  listar todo en memoria.
+- Se ignoran archivos más nuevos que UPLOADS_GC_GRACIA_HORAS (uploads en curso
+  cuya fila aún no existe), la carpeta de cuarentena y el staging de uploads
+  por chunks (lo limpia la tarea purgar_subidas_imagenes).
+- Acciones: reportar (por defecto), cuarentena (mover a .cuarentena/ con la
+  misma ruta) o borrar; con tope de archivos por segundo.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from sqlalchemy import or_
+
+from app.extensions.db import db
+from app.models.articulo import Articulo
+from app.models.articulo_imagen import ArticuloImagen
+from app.services import imagenes_service, subidas_service
+
+
+UPLOADS_GC_LOTE_DEFAULT = 5000
+UPLOADS_GC_GRACIA_HORAS_DEFAULT = 24
+UPLOADS_GC_MAX_POR_SEGUNDO_DEFAULT = 200
+UPLOADS_GC_ELIMINADOS_DIAS_DEFAULT = 30
+
+CARPETA_CUARENTENA = ".cuarentena"
+_CARPETAS_IGNORADAS = (CARPETA_CUARENTENA, subidas_service.CARPETA_STAGING)
+ACCIONES = ("reportar", "cuarentena", "borrar")
+
+# Sufijos derivados de un archivo referenciado (precomprimidos).
+_SUFIJOS_DERIVADOS = (".br", ".gz")
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def _clave(rel: str) -> bytes:
+    return hashlib.blake2b(rel.encode("utf-8"), digest_size=8).digest()
+
+
+def referencias_en_bd(lote: int | None = None) -> set[bytes]:
+    """Set de claves de los archivos referenciados (originales + variantes)."""
+
+    lote = lote or _get_config_int("UPLOADS_GC_LOTE", UPLOADS_GC_LOTE_DEFAULT, minimo=1)
+    dias = _get_config_int("UPLOADS_GC_ELIMINADOS_DIAS", UPLOADS_GC_ELIMINADOS_DIAS_DEFAULT)
+    corte_eliminados = datetime.utcnow() - timedelta(days=dias)
+    refs: set[bytes] = set()
+    ultimo_id = 0
+    while True:
+        filas = (
+            db.session.query(
+                ArticuloImagen.id,
+                ArticuloImagen.url_imagen,
+                ArticuloImagen.url_miniatura,
+                ArticuloImagen.url_mediana,
+            )
+            .join(Articulo, Articulo.id_articulo == ArticuloImagen.id_articulo)
+            .filter(ArticuloImagen.id > ultimo_id)
+            .filter(or_(Articulo.estado != "eliminado", Articulo.actualizado_en > corte_eliminados))
+            .order_by(ArticuloImagen.id.asc())
+            .limit(lote)
+            .all()
+        )
+        if not filas:
+            break
+        for _id, *urls in filas:
+            for url in urls:
+                rel = imagenes_service.filename_desde_url(url)
+                if rel:
+                    refs.add(_clave(rel))
+            original = imagenes_service.filename_desde_url(urls[0])
+            if original:
+                # Variantes aún no registradas en la fila (pool en curso).
+                for v in imagenes_service.VARIANTES:
+                    refs.add(_clave(imagenes_service.nombre_variante(original, v)))
+        ultimo_id = filas[-1][0]
+        if len(filas) < lote:
+            break
+    return refs
+
+
+def recorrer(upload_dir: str):
+    """Genera (ruta_relativa, DirEntry) de cada archivo, en streaming."""
+
+    pendientes = [""]
+    while pendientes:
+        rel_dir = pendientes.pop()
+        try:
+            it = os.scandir(os.path.join(upload_dir, rel_dir) if rel_dir else upload_dir)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if rel not in _CARPETAS_IGNORADAS:
+                        pendientes.append(rel)
+                elif entry.is_file(follow_symlinks=False):
+                    yield rel, entry
+
+
+def _referenciado(rel: str, refs: set[bytes]) -> bool:
+    if _clave(rel) in refs:
+        return True
+    for sufijo in _SUFIJOS_DERIVADOS:
+        if rel.endswith(sufijo) and _clave(rel[: -len(sufijo)]) in refs:
+            return True
+    return False
+
+
+def _aplicar(accion: str, upload_dir: str, rel: str) -> None:
+    origen = os.path.join(upload_dir, *rel.split("/"))
+    if accion == "borrar":
+        os.remove(origen)
+    else:
+        destino = os.path.join(upload_dir, CARPETA_CUARENTENA, *rel.split("/"))
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(origen, destino)
+
+
+def recolectar(
+    accion: str = "reportar",
+    upload_dir: str | None = None,
+    gracia_horas: int | None = None,
+    max_por_segundo: int | None = None,
+    limite: int | None = None,
+    al_encontrar=None,
+) -> dict:
+    """Busca huérfanos y aplica `accion`. Devuelve el resumen (bytes recuperables/recuperados)."""
+
+    if accion not in ACCIONES:
+        raise ValueError(f"Acción inválida: {accion}. Usa: {'|'.join(ACCIONES)}")
+
+    upload_dir = upload_dir or current_app.config["UPLOADS_ARTICULOS_DIR"]
+    if gracia_horas is None:
+        gracia_horas = _get_config_int("UPLOADS_GC_GRACIA_HORAS", UPLOADS_GC_GRACIA_HORAS_DEFAULT, minimo=0)
+    if max_por_segundo is None:
+        max_por_segundo = _get_config_int("UPLOADS_GC_MAX_POR_SEGUNDO", UPLOADS_GC_MAX_POR_SEGUNDO_DEFAULT, minimo=0)
+    corte = (datetime.now() - timedelta(hours=gracia_horas)).timestamp()
+    intervalo = 1.0 / max_por_segundo if max_por_segundo else 0.0
+
+    refs = referencias_en_bd()
+    resumen = {
+        "accion": accion,
+        "referencias": len(refs),
+        "revisados": 0,
+        "huerfanos": 0,
+        "bytes_huerfanos": 0,
+        "procesados": 0,
+        "bytes_recuperados": 0,
+        "errores": 0,
+    }
+
+    siguiente = time.monotonic()
+    for rel, entry in recorrer(upload_dir):
+        resumen["revisados"] += 1
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        if st.st_mtime > corte or _referenciado(rel, refs):
+            continue
+
+        resumen["huerfanos"] += 1
+        resumen["bytes_huerfanos"] += st.st_size
+        if al_encontrar:
+            al_encontrar(rel, st.st_size)
+        if accion == "reportar":
+            continue
+        if limite is not None and resumen["procesados"] >= limite:
+            continue
+
+        # Ritmo fijo: no saturar el disco / el volumen compartido.
+        if intervalo:
+            espera = siguiente - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            siguiente = max(siguiente, time.monotonic()) + intervalo
+        try:
+            _aplicar(accion, upload_dir, rel)
+        except OSError:
+            resumen["errores"] += 1
+            continue
+        resumen["procesados"] += 1
+        resumen["bytes_recuperados"] += st.st_size
+    return resumen
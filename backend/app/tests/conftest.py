@@ -121,8 +121,9 @@ def make_articulo(db_session, make_categoria):
 			titulo=titulo,
 			descripcion="Desc",
 			id_categoria=cat.id,
-			precio_base=100,
-			unidad_precio=unidad,
+			precio_por_hora=100 if unidad == "por_hora" else None,
+			precio_por_dia=100 if unidad == "por_dia" else None,
+			precio_por_semana=100 if unidad == "por_semana" else None,
 			monto_deposito=50,
 			estado_publicacion="publicado",
 		)
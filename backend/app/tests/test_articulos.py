@@ -2,6 +2,10 @@
 import io
 
 
+# Cabecera JPEG válida (magic bytes) + relleno; basta para la validación del upload.
+JPEG_FALSO = b"\xff\xd8\xff\xe0" + b"fake-jpg"
+
+
 def test_editar_articulo_owner_puede_actualizar(client, make_user, auth_header, make_articulo):
 	dueno = make_user("dueno_edit@test.com")
 	art = make_articulo(dueno.id_usuario)
@@ -25,7 +29,8 @@ def test_editar_articulo_owner_puede_actualizar(client, make_user, auth_header,
 	assert data["titulo"] == "Nuevo título"
 	assert data["descripcion"] == "Nueva descripción"
 	assert float(data["precio_renta_dia"]) == 120.0
-	assert data.get("precio_renta_hora") in (None, 0, "", 0.0)
+	# Se persisten todas las tarifas, no solo la modalidad principal
+	assert float(data["precio_renta_hora"]) == 25.0
 	assert float(data["deposito_garantia"]) == 99.0
 	# estado_publicacion puede venir del auto schema
 	assert data.get("estado_publicacion") in ("pausado", None)
@@ -52,7 +57,7 @@ def test_imagenes_dueno_puede_subir(client, app, tmp_path, make_user, auth_heade
 
 	resp = client.post(
 		f"/api/articulos/{art.id_articulo}/imagenes",
-		data={"imagenes": (io.BytesIO(b"fake-jpg"), "foto1.jpg")},
+		data={"imagenes": (io.BytesIO(JPEG_FALSO), "foto1.jpg")},
 		headers=auth_header(dueno.id_usuario),
 		content_type="multipart/form-data",
 	)
@@ -73,13 +78,220 @@ def test_imagenes_no_dueno_no_puede_subir(client, app, tmp_path, make_user, auth
 
 	resp = client.post(
 		f"/api/articulos/{art.id_articulo}/imagenes",
-		data={"imagenes": (io.BytesIO(b"fake-jpg"), "foto1.jpg")},
+		data={"imagenes": (io.BytesIO(JPEG_FALSO), "foto1.jpg")},
 		headers=auth_header(ajeno.id_usuario),
 		content_type="multipart/form-data",
 	)
 	assert resp.status_code == 403
 
 
+def test_imagenes_valida_magic_bytes_y_listado_usa_miniatura(
+	client, app, db_session, tmp_path, make_user, auth_header, make_articulo
+):
+	from app.models.articulo_imagen import ArticuloImagen
+
+	app.config["UPLOADS_ARTICULOS_DIR"] = str(tmp_path)
+	dueno = make_user("dueno_img_magic@test.com")
+	art = make_articulo(dueno.id_usuario, titulo="Miniatura test")
+
+	# Extensión .jpg pero contenido que no es imagen => 400 y nada en disco.
+	resp = client.post(
+		f"/api/articulos/{art.id_articulo}/imagenes",
+		data={"imagenes": (io.BytesIO(b"<?php echo 1; ?>"), "foto.jpg")},
+		headers=auth_header(dueno.id_usuario),
+		content_type="multipart/form-data",
+	)
+	assert resp.status_code == 400
+	assert list(tmp_path.iterdir()) == []
+
+	# PNG real con nombre .jpg: se acepta y se guarda con la extensión detectada.
+	resp = client.post(
+		f"/api/articulos/{art.id_articulo}/imagenes",
+		data={"imagenes": (io.BytesIO(b"\x89PNG\r\n\x1a\n" + b"0" * 200_000), "foto.jpg")},
+		headers=auth_header(dueno.id_usuario),
+		content_type="multipart/form-data",
+	)
+	assert resp.status_code == 201
+	url = resp.get_json()["data"]["imagenes"][0]
+	assert url.endswith(".png")
+	assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == [url.rsplit("/", 1)[1]]
+
+	# Sin variante: el listado cae al original; con miniatura, la usa.
+	lista = client.get("/api/articulos?q=Miniatura test").get_json()["data"]
+	item = next(a for a in lista if a["id"] == art.id_articulo)
+	assert item["imagen_principal_url"] == url
+
+	img = ArticuloImagen.query.filter_by(id_articulo=art.id_articulo).one()
+	img.url_miniatura = url.replace(".png", ".thumb.webp")
+	db_session.commit()
+	lista = client.get("/api/articulos?q=Miniatura test").get_json()["data"]
+	item = next(a for a in lista if a["id"] == art.id_articulo)
+	assert item["imagen_principal_url"].endswith(".thumb.webp")
+
+
+def test_imagenes_dedupe_por_hash_y_gc_recupera_sin_referencias(
+	client, app, tmp_path, make_user, auth_header, make_articulo
+):
+	import hashlib
+	import os
+	import time
+
+	from app.services import uploads_gc_service
+
+	app.config["UPLOADS_ARTICULOS_DIR"] = str(tmp_path)
+	dueno = make_user("dueno_img_dedupe@test.com")
+	a1 = make_articulo(dueno.id_usuario)
+	a2 = make_articulo(dueno.id_usuario)
+	contenido = JPEG_FALSO + b"dedupe"
+	sha = hashlib.sha256(contenido).hexdigest()
+	archivo = tmp_path / sha[:2] / sha[2:4] / f"{sha}.jpg"
+	viejo = time.time() - 48 * 3600
+
+	urls = []
+	for i, art in enumerate((a1, a2)):
+		if i == 1:
+			# Archivo viejo: deduplicar contra él lo saca del periodo de gracia del GC.
+			os.utime(archivo, (viejo, viejo))
+		resp = client.post(
+			f"/api/articulos/{art.id_articulo}/imagenes",
+			data={"imagenes": (io.BytesIO(contenido), "foto.jpg")},
+			headers=auth_header(dueno.id_usuario),
+			content_type="multipart/form-data",
+		)
+		assert resp.status_code == 201
+		urls.append(resp.get_json()["data"]["imagenes_detalle"][0])
+
+	assert urls[0]["url_imagen"] == urls[1]["url_imagen"]
+	assert urls[0]["url_imagen"].endswith(f"/uploads/articulos/{sha[:2]}/{sha[2:4]}/{sha}.jpg")
+	assert archivo.read_bytes() == contenido
+	assert archivo.stat().st_mtime > viejo + 3600
+	assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+	resp = client.delete(
+		f"/api/articulos/{a1.id_articulo}/imagenes/{urls[0]['id']}",
+		headers=auth_header(dueno.id_usuario),
+	)
+	assert resp.status_code == 200
+	assert archivo.exists()
+
+	resp = client.delete(
+		f"/api/articulos/{a2.id_articulo}/imagenes/{urls[1]['id']}",
+		headers=auth_header(dueno.id_usuario),
+	)
+	assert resp.status_code == 200
+	# El request no borra (otro upload podría estar deduplicando): lo recupera el GC.
+	assert archivo.exists()
+
+	with app.app_context():
+		assert uploads_gc_service.recolectar("borrar", gracia_horas=1)["procesados"] == 0
+		os.utime(archivo, (viejo, viejo))
+		assert uploads_gc_service.recolectar("borrar", gracia_horas=1)["procesados"] == 1
+	assert not archivo.exists()
+
+
+def test_uploads_cache_inmutable_etag_range_y_x_accel(client, app, tmp_path):
+	import gzip
+	import hashlib
+
+	app.config["UPLOADS_ARTICULOS_DIR"] = str(tmp_path)
+	contenido = JPEG_FALSO + b"0123456789" * 10
+	sha = hashlib.sha256(contenido).hexdigest()
+	rel = f"{sha[:2]}/{sha[2:4]}/{sha}.jpg"
+	(tmp_path / sha[:2] / sha[2:4]).mkdir(parents=True)
+	(tmp_path / rel).write_bytes(contenido)
+	(tmp_path / "legado.jpg").write_bytes(contenido)
+
+	resp = client.get(f"/uploads/articulos/{rel}")
+	assert resp.status_code == 200
+	assert resp.data == contenido
+	assert resp.headers["ETag"] == f'"{sha}"'
+	assert "immutable" in resp.headers["Cache-Control"]
+	assert "max-age=31536000" in resp.headers["Cache-Control"]
+
+	assert client.get(f"/uploads/articulos/{rel}", headers={"If-None-Match": f'"{sha}"'}).status_code == 304
+
+	parcial = client.get(f"/uploads/articulos/{rel}", headers={"Range": "bytes=0-3"})
+	assert parcial.status_code == 206
+	assert parcial.data == contenido[:4]
+
+	legado = client.get("/uploads/articulos/legado.jpg")
+	assert legado.status_code == 200
+	assert "immutable" not in legado.headers["Cache-Control"]
+
+	(tmp_path / f"{rel}.gz").write_bytes(gzip.compress(contenido))
+	comprimido = client.get(f"/uploads/articulos/{rel}", headers={"Accept-Encoding": "gzip"})
+	assert comprimido.headers["Content-Encoding"] == "gzip"
+	assert gzip.decompress(comprimido.data) == contenido
+
+	assert client.get("/uploads/articulos/../../etc/passwd").status_code == 404
+
+	app.config["UPLOADS_SENDFILE_MODO"] = "x-accel"
+	try:
+		resp = client.get(f"/uploads/articulos/{rel}")
+		assert resp.status_code == 200
+		assert resp.data == b""
+		assert resp.headers["X-Accel-Redirect"].endswith(f"/articulos/{rel}")
+		assert resp.headers["ETag"] == f'"{sha}"'
+	finally:
+		app.config["UPLOADS_SENDFILE_MODO"] = ""
+
+
+def test_subida_por_chunks_reanuda_y_verifica_hash(client, app, tmp_path, make_user, auth_header, make_articulo):
+	import hashlib
+
+	app.config["UPLOADS_ARTICULOS_DIR"] = str(tmp_path)
+	app.config["IMAGENES_CHUNK_MAX_BYTES"] = 100
+	dueno = make_user("dueno_chunks@test.com")
+	ajeno = make_user("ajeno_chunks@test.com")
+	art = make_articulo(dueno.id_usuario)
+	h = auth_header(dueno.id_usuario)
+	contenido = JPEG_FALSO + bytes(range(256)) * 2
+	sha = hashlib.sha256(contenido).hexdigest()
+	base = f"/api/articulos/{art.id_articulo}/imagenes/subidas"
+
+	try:
+		resp = client.post(base, json={"tamano": len(contenido), "sha256": sha, "nombre": "foto.jpg"}, headers=h)
+		assert resp.status_code == 201
+		id_subida = resp.get_json()["data"]["id_subida"]
+		url = f"{base}/{id_subida}"
+
+		assert client.get(url, headers=auth_header(ajeno.id_usuario)).status_code == 403
+
+		# Chunk 0, luego un hueco (409 con el offset esperado), luego reintento del mismo chunk.
+		assert client.put(f"{url}?offset=0", data=contenido[:100], headers=h).status_code == 200
+		hueco = client.put(f"{url}?offset=200", data=contenido[200:300], headers=h)
+		assert hueco.status_code == 409
+		assert hueco.get_json()["payload"]["recibido"] == 100
+		assert client.put(f"{url}?offset=0", data=contenido[:100], headers=h).get_json()["data"]["recibido"] == 100
+		assert client.put(f"{url}?offset=100", data=contenido[100:300], headers=h).status_code == 413
+
+		# Finalizar antes de tiempo => 409
+		assert client.post(f"{url}/finalizar", headers=h).status_code == 409
+
+		# Reanudar desde el estado
+		offset = client.get(url, headers=h).get_json()["data"]["recibido"]
+		while offset < len(contenido):
+			r = client.put(url, data=contenido[offset : offset + 100], headers={**h, "Upload-Offset": str(offset)})
+			assert r.status_code == 200
+			offset = r.get_json()["data"]["recibido"]
+
+		fin = client.post(f"{url}/finalizar", headers=h)
+		assert fin.status_code == 201
+		assert fin.get_json()["data"]["imagenes"][0].endswith(f"{sha}.jpg")
+		assert (tmp_path / sha[:2] / sha[2:4] / f"{sha}.jpg").read_bytes() == contenido
+		assert client.get(url, headers=h).status_code == 404
+
+		# Hash declarado distinto del contenido => 422 y sesión descartada.
+		resp = client.post(base, json={"tamano": 10, "sha256": "0" * 64}, headers=h)
+		url = f"{base}/{resp.get_json()['data']['id_subida']}"
+		assert client.put(f"{url}?offset=0", data=JPEG_FALSO[:10].ljust(10, b"x"), headers=h).status_code == 200
+		assert client.post(f"{url}/finalizar", headers=h).status_code == 422
+		assert client.get(url, headers=h).status_code == 404
+		assert list((tmp_path / ".staging").iterdir()) == []
+	finally:
+		app.config["IMAGENES_CHUNK_MAX_BYTES"] = 4 * 1024 * 1024
+
+
 def test_admin_no_puede_publicar(client, make_user, auth_header):
 	admin = make_user("admin_no_publica@test.com")
 	resp = client.post(
@@ -100,7 +312,7 @@ def test_imagenes_eliminar_ok_y_403(client, app, tmp_path, make_user, auth_heade
 
 	up = client.post(
 		f"/api/articulos/{art.id_articulo}/imagenes",
-		data={"imagenes": (io.BytesIO(b"fake-jpg"), "foto1.jpg")},
+		data={"imagenes": (io.BytesIO(JPEG_FALSO), "foto1.jpg")},
 		headers=auth_header(dueno.id_usuario),
 		content_type="multipart/form-data",
 	)
@@ -132,14 +344,14 @@ def test_imagenes_reordenar_y_portada(client, app, tmp_path, make_user, auth_hea
 
 	up1 = client.post(
 		f"/api/articulos/{art.id_articulo}/imagenes",
-		data={"imagenes": (io.BytesIO(b"fake-jpg"), "foto1.jpg")},
+		data={"imagenes": (io.BytesIO(JPEG_FALSO), "foto1.jpg")},
 		headers=auth_header(dueno.id_usuario),
 		content_type="multipart/form-data",
 	)
 	assert up1.status_code == 201
 	up2 = client.post(
 		f"/api/articulos/{art.id_articulo}/imagenes",
-		data={"imagenes": (io.BytesIO(b"fake-jpg"), "foto2.jpg")},
+		data={"imagenes": (io.BytesIO(JPEG_FALSO), "foto2.jpg")},
 		headers=auth_header(dueno.id_usuario),
 		content_type="multipart/form-data",
 	)
@@ -176,3 +388,217 @@ def test_imagenes_reordenar_y_portada(client, app, tmp_path, make_user, auth_hea
 	imgs3 = det3.get_json()["data"]["imagenes"]
 	assert any(i["id"] == ids[0] and i["es_principal"] for i in imgs3)
 	assert all((i["id"] == ids[0]) == bool(i["es_principal"]) for i in imgs3)
+
+
+def test_ocupacion_batch_rle_e_invalidacion(client, db_session, make_user, auth_header, make_articulo):
+	from datetime import datetime, timedelta
+
+	from app.models.disponibilidad_articulo import DisponibilidadArticulo
+
+	dueno = make_user("dueno_ocup@test.com")
+	arr = make_user("arr_ocup@test.com")
+	a1 = make_articulo(dueno.id_usuario, titulo="A1")
+	a2 = make_articulo(dueno.id_usuario, titulo="A2")
+
+	base = (datetime.utcnow() + timedelta(days=10)).replace(hour=10, minute=0, second=0, microsecond=0)
+	r = client.post(
+		"/api/rentas",
+		json={
+			"id_articulo": a1.id_articulo,
+			"fecha_inicio": base.isoformat(),
+			"fecha_fin": (base + timedelta(days=2)).isoformat(),
+		},
+		headers=auth_header(arr.id_usuario),
+	)
+	assert r.status_code == 201
+	id_renta = r.get_json()["data"]["id"]
+
+	desde = (base - timedelta(days=1)).date().isoformat()
+	hasta = (base + timedelta(days=5)).date().isoformat()
+	url = f"/api/articulos/ocupacion?ids={a1.id_articulo},{a2.id_articulo}&desde={desde}&hasta={hasta}"
+
+	resp = client.get(url)
+	assert resp.status_code == 200
+	ocupado = resp.get_json()["data"]["ocupado"]
+	dia0 = base.replace(hour=0)
+	assert ocupado[str(a1.id_articulo)] == [
+		{"inicio": dia0.isoformat(), "fin": (dia0 + timedelta(days=3)).isoformat()}
+	]
+	assert ocupado[str(a2.id_articulo)] == []
+
+	# El endpoint individual conserva los rangos exactos de las rentas (sin bloqueos ni redondeo)
+	db_session.add(
+		DisponibilidadArticulo(
+			id_articulo=a1.id_articulo,
+			fecha_inicio=base + timedelta(days=3),
+			fecha_fin=base + timedelta(days=3, minutes=90),
+			disponible=False,
+			motivo="mantenimiento",
+		)
+	)
+	db_session.commit()
+	det = client.get(f"/api/articulos/{a1.id_articulo}/ocupacion?desde={desde}&hasta={hasta}")
+	assert det.get_json()["data"]["ocupado"] == [
+		{"inicio": base.isoformat(), "fin": (base + timedelta(days=2)).isoformat()}
+	]
+
+	# Cancelar invalida el bitset cacheado (queda solo el bloqueo)
+	c = client.post(f"/api/rentas/{id_renta}/cancelar", json={}, headers=auth_header(arr.id_usuario))
+	assert c.status_code == 200
+	resp2 = client.get(url)
+	assert resp2.get_json()["data"]["ocupado"][str(a1.id_articulo)] == [
+		{"inicio": (dia0 + timedelta(days=3)).isoformat(), "fin": (dia0 + timedelta(days=4)).isoformat()}
+	]
+
+
+def test_ocupacion_rechaza_rangos_largos_y_fechas_extremas(client, app, make_user, make_articulo):
+	dueno = make_user("dueno_ocup_rango@test.com")
+	art = make_articulo(dueno.id_usuario)
+	app.config["OCUPACION_HORIZONTE_DIAS"] = 90
+
+	for base in (f"/api/articulos/ocupacion?ids={art.id_articulo}&", f"/api/articulos/{art.id_articulo}/ocupacion?"):
+		largo = client.get(base + "desde=0002-01-01&hasta=9999-12-30&granularidad=dias")
+		assert largo.status_code == 400
+		assert client.get(base + "desde=2030-01-01&hasta=2030-04-01").status_code == 400
+		assert client.get(base + "desde=2030-01-01&hasta=2030-03-31").status_code == 200
+
+		assert client.get(base + "desde=0001-01-01&hasta=0001-01-02").status_code == 400
+		assert client.get(base + "desde=9999-12-30&hasta=9999-12-31").status_code == 400
+
+
+def test_catalogo_filtra_por_disponibilidad_y_categoria(client, make_user, auth_header, make_articulo, make_categoria):
+	from datetime import datetime, timedelta
+
+	dueno = make_user("dueno_cat@test.com")
+	arr = make_user("arr_cat@test.com")
+	ocupado = make_articulo(dueno.id_usuario, titulo="Taladro ocupado")
+	libre = make_articulo(dueno.id_usuario, titulo="Taladro libre")
+	otro = make_articulo(dueno.id_usuario, titulo="Escalera libre")
+	cat2 = make_categoria(nombre="Otra categoria")
+	otro.id_categoria = cat2.id
+
+	inicio = (datetime.utcnow() + timedelta(days=20)).replace(hour=9, minute=0, second=0, microsecond=0)
+	r = client.post(
+		"/api/rentas",
+		json={
+			"id_articulo": ocupado.id_articulo,
+			"fecha_inicio": inicio.isoformat(),
+			"fecha_fin": (inicio + timedelta(days=2)).isoformat(),
+		},
+		headers=auth_header(arr.id_usuario),
+	)
+	assert r.status_code == 201
+
+	d = inicio.date().isoformat()
+	resp = client.get(f"/api/articulos?disponible_desde={d}&disponible_hasta={d}&q=Taladro")
+	assert resp.status_code == 200
+	ids = {a["id"] for a in resp.get_json()["data"]}
+	assert libre.id_articulo in ids
+	assert ocupado.id_articulo not in ids
+	assert otro.id_articulo not in ids
+
+	resp2 = client.get(f"/api/articulos?disponible_desde={d}&disponible_hasta={d}&id_categoria={cat2.id}")
+	ids2 = {a["id"] for a in resp2.get_json()["data"]}
+	assert ids2 == {otro.id_articulo}
+
+	# ISO 8601 con zona, mezclado con una fecha simple
+	desde_tz = (inicio + timedelta(hours=2)).isoformat() + "+02:00"
+	resp_tz = client.get(
+		"/api/articulos",
+		query_string={"disponible_desde": desde_tz, "disponible_hasta": d, "q": "Taladro"},
+	)
+	assert resp_tz.status_code == 200
+	assert {a["id"] for a in resp_tz.get_json()["data"]} == {libre.id_articulo}
+
+	# 10:00-10:30+02:00 = 08:00-08:30 UTC: antes de la renta (09:00 UTC)
+	antes = client.get(
+		"/api/articulos",
+		query_string={
+			"disponible_desde": (inicio + timedelta(hours=1)).isoformat() + "+02:00",
+			"disponible_hasta": (inicio + timedelta(hours=1, minutes=30)).isoformat() + "+02:00",
+			"q": "Taladro",
+		},
+	)
+	assert {a["id"] for a in antes.get_json()["data"]} == {libre.id_articulo, ocupado.id_articulo}
+
+	bad = client.get(f"/api/articulos?disponible_desde={d}")
+	assert bad.status_code == 400
+
+
+def test_catalogo_filtra_precio_con_tarifa_diaria_efectiva(client, make_user, make_articulo):
+	dueno = make_user("dueno_precio@test.com")
+	por_dia = make_articulo(dueno.id_usuario, titulo="Podadora dia")
+	por_hora = make_articulo(dueno.id_usuario, titulo="Podadora hora", unidad="por_hora")
+	por_semana = make_articulo(dueno.id_usuario, titulo="Podadora semana", unidad="por_semana")
+
+	def ids(**params):
+		resp = client.get("/api/articulos", query_string={"q": "Podadora", **params})
+		assert resp.status_code == 200
+		return {a["id"] for a in resp.get_json()["data"]}
+
+	# por_dia = 100, por_hora = 100 * 24, por_semana = 100 / 7
+	assert ids(precio_min=1000) == {por_hora.id_articulo}
+	assert ids(precio_max=50) == {por_semana.id_articulo}
+	assert ids(precio_min=50, precio_max=150) == {por_dia.id_articulo}
+
+
+def test_siguiente_disponible_salta_rentas_y_bloqueos(client, db_session, make_user, auth_header, make_articulo):
+	from datetime import datetime, timedelta
+
+	from app.models.disponibilidad_articulo import DisponibilidadArticulo
+
+	dueno = make_user("dueno_sig@test.com")
+	arr = make_user("arr_sig@test.com")
+	art = make_articulo(dueno.id_usuario, unidad="por_hora")
+
+	t0 = (datetime.utcnow() + timedelta(days=3)).replace(hour=10, minute=0, second=0, microsecond=0)
+	r = client.post(
+		"/api/rentas",
+		json={
+			"id_articulo": art.id_articulo,
+			"fecha_inicio": t0.isoformat(),
+			"fecha_fin": (t0 + timedelta(hours=3)).isoformat(),
+			"modalidad": "horas",
+		},
+		headers=auth_header(arr.id_usuario),
+	)
+	assert r.status_code == 201
+
+	# Bloqueo contiguo de 13:00 a 14:30 => la siguiente hora exacta libre es 15:00
+	db_session.add(
+		DisponibilidadArticulo(
+			id_articulo=art.id_articulo,
+			fecha_inicio=t0 + timedelta(hours=3),
+			fecha_fin=t0 + timedelta(hours=4, minutes=30),
+			disponible=False,
+			motivo="mantenimiento",
+		)
+	)
+	db_session.commit()
+
+	resp = client.get(
+		f"/api/articulos/{art.id_articulo}/siguiente-disponible"
+		f"?duracion=2&modalidad=horas&limite=2&desde={(t0 + timedelta(hours=1)).isoformat()}"
+	)
+	assert resp.status_code == 200
+	ventanas = resp.get_json()["data"]["ventanas"]
+	assert ventanas == [
+		{"inicio": (t0 + timedelta(hours=5)).isoformat(), "fin": (t0 + timedelta(hours=7)).isoformat()},
+		{"inicio": (t0 + timedelta(hours=7)).isoformat(), "fin": (t0 + timedelta(hours=9)).isoformat()},
+	]
+
+	# `desde` con zona: misma búsqueda expresada en UTC-03:00
+	desde_tz = (t0 - timedelta(hours=2)).isoformat() + "-03:00"
+	resp = client.get(
+		f"/api/articulos/{art.id_articulo}/siguiente-disponible",
+		query_string={"duracion": 2, "modalidad": "horas", "limite": 2, "desde": desde_tz},
+	)
+	assert resp.status_code == 200
+	assert resp.get_json()["data"]["ventanas"] == ventanas
+
+	# Sin modalidad: la que permiten las tarifas (solo por hora => horas); la otra se rechaza.
+	resp = client.get(f"/api/articulos/{art.id_articulo}/siguiente-disponible?duracion=2")
+	assert resp.status_code == 200
+	assert resp.get_json()["data"]["modalidad"] == "horas"
+	resp = client.get(f"/api/articulos/{art.id_articulo}/siguiente-disponible?duracion=2&modalidad=dias")
+	assert resp.status_code == 400
@@ -0,0 +1,35 @@
+import json
+
+
+def test_compresion_gzip_con_umbral_y_exclusiones(client, app, tmp_path, make_user, make_articulo):
+	import gzip
+
+	dueno = make_user("dueno_gzip@test.com")
+	for i in range(15):
+		make_articulo(dueno.id_usuario, titulo=f"Compresible {i}")
+
+	plano = client.get("/api/articulos?q=Compresible")
+	assert "Content-Encoding" not in plano.headers
+
+	resp = client.get("/api/articulos?q=Compresible", headers={"Accept-Encoding": "gzip"})
+	assert resp.headers["Content-Encoding"] == "gzip"
+	assert "Accept-Encoding" in resp.headers["Vary"]
+	assert len(resp.data) < len(plano.data)
+	assert json.loads(gzip.decompress(resp.data)) == plano.get_json()
+
+	# Un nivel fuera de rango se acota (gzip: 1-9) en vez de romper la respuesta.
+	app.config["COMPRESION_NIVEL_GZIP"] = 42
+	alto = client.get("/api/articulos?q=Compresible", headers={"Accept-Encoding": "gzip"})
+	assert alto.status_code == 200
+	assert json.loads(gzip.decompress(alto.data)) == plano.get_json()
+	app.config["COMPRESION_NIVEL_GZIP"] = 6
+
+	# Debajo del umbral no se comprime.
+	chico = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+	assert "Content-Encoding" not in chico.headers
+
+	# Archivos de /uploads se sirven tal cual.
+	app.config["UPLOADS_ARTICULOS_DIR"] = str(tmp_path)
+	(tmp_path / "grande.json").write_text("{}" + " " * 5000)
+	archivo = client.get("/uploads/articulos/grande.json", headers={"Accept-Encoding": "gzip"})
+	assert "Content-Encoding" not in archivo.headers
@@ -0,0 +1,192 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import create_app
+from app.extensions import db
+from app.extensions.pool import PoolMedido
+from app.models.articulo import Articulo
+from app.models.categoria import Categoria
+from app.models.usuario import Usuario
+from app.tests.conftest import PytestConfig
+
+
+def _poblar(titulo: str) -> tuple[int, int]:
+	u = Usuario(
+		nombre="Replica",
+		apellidos="User",
+		correo_electronico="replica_dueno@test.com",
+		hash_contrasena="x",
+		estado_cuenta="activo",
+		verificado=True,
+	)
+	c = Categoria(nombre="CategoriaReplica")
+	db.session.add_all([u, c])
+	db.session.flush()
+	a = Articulo(
+		id_propietario=u.id_usuario,
+		titulo=titulo,
+		descripcion="Desc",
+		id_categoria=c.id,
+		precio_por_dia=100,
+		monto_deposito=0,
+		estado_publicacion="publicado",
+	)
+	db.session.add(a)
+	db.session.commit()
+	return u.id_usuario, a.id_articulo
+
+
+def test_lecturas_a_replica_con_read_your_writes(tmp_path, app):
+	class ConfigReplica(PytestConfig):
+		SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primaria.db'}"
+		SQLALCHEMY_ENGINE_OPTIONS = {}
+		SQLALCHEMY_BINDS = {"replica_0": f"sqlite:///{tmp_path / 'replica.db'}"}
+
+	app_r = create_app(ConfigReplica)
+	with app_r.app_context():
+		db.create_all()
+		replica = db.engines["replica_0"]
+		db.metadata.create_all(replica)
+		id_dueno, id_articulo = _poblar("Original")
+
+		# La réplica tiene la misma fila con otro título para distinguir de dónde se lee.
+		with replica.begin() as conn:
+			for tabla in ("usuarios", "categorias", "articulos"):
+				filas = db.session.execute(db.metadata.tables[tabla].select()).mappings().all()
+				conn.execute(db.metadata.tables[tabla].insert(), [dict(f) for f in filas])
+			conn.execute(
+				db.metadata.tables["articulos"].update().values(titulo="Desde replica")
+			)
+		db.session.remove()
+
+		h = {"Authorization": f"Bearer {create_access_token(identity=str(id_dueno))}"}
+
+	# Otro worker: misma configuración, distinto proceso lógico (sin memoria compartida).
+	app_b = create_app(ConfigReplica)
+
+	client = app_r.test_client()
+	anon = client.get(f"/api/articulos/{id_articulo}")
+	assert anon.get_json()["data"]["titulo"] == "Desde replica"
+
+	# La escritura va a la primaria y devuelve la ventana firmada.
+	edit = client.patch(f"/api/articulos/{id_articulo}", json={"titulo": "Editado"}, headers=h)
+	assert edit.status_code == 200
+	token = edit.headers.get("X-Primaria-Hasta")
+	assert token
+
+	# El autor lee su propio cambio aunque el GET caiga en otro worker (cabecera o cookie).
+	client_b = app_b.test_client()
+	propio = client_b.get(f"/api/articulos/{id_articulo}", headers={**h, "X-Primaria-Hasta": token})
+	assert propio.get_json()["data"]["titulo"] == "Editado"
+	client_cookie = app_b.test_client()
+	client_cookie.set_cookie("primaria_hasta", token)
+	assert client_cookie.get(f"/api/articulos/{id_articulo}").get_json()["data"]["titulo"] == "Editado"
+
+	# Sin token, o con uno manipulado, se lee de la réplica; rutas sin marcar, de la primaria.
+	otro = app_b.test_client()
+	assert otro.get(f"/api/articulos/{id_articulo}").get_json()["data"]["titulo"] == "Desde replica"
+	falso = otro.get(f"/api/articulos/{id_articulo}", headers={"X-Primaria-Hasta": token[:-2] + "xx"})
+	assert falso.get_json()["data"]["titulo"] == "Desde replica"
+	assert otro.get("/api/articulos/mis", headers=h).get_json()["data"][0]["titulo"] == "Editado"
+
+	for app_x in (app_r, app_b):
+		with app_x.app_context():
+			db.session.remove()
+			for engine in db.engines.values():
+				engine.dispose()
+	# La metadata del bind es global a `db`: que no la vea el drop_all de la app de la sesión.
+	db.metadatas.pop("replica_0", None)
+
+
+def test_perfil_de_pool_y_telemetria_en_metrics(tmp_path, app):
+	class ConfigPool(PytestConfig):
+		SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'pool.db'}"
+		SQLALCHEMY_ENGINE_OPTIONS = {}
+		DB_POOL_PERFIL = "worker"
+		DB_POOL_SIZE = "1"
+		DB_POOL_TIMEOUT = "1"
+		METRICS_TOKEN = "secreto"
+
+	app_p = create_app(ConfigPool)
+	with app_p.app_context():
+		engine = db.engine
+		assert isinstance(engine.pool, PoolMedido)
+		assert engine.pool.size() == 1 and engine.pool._max_overflow == 0
+
+		# Pool lleno: el segundo checkout espera pool_timeout y se cuenta como timeout.
+		ocupada = engine.connect()
+		with pytest.raises(PoolTimeoutError):
+			engine.connect()
+		ocupada.close()
+
+	client = app_p.test_client()
+	assert client.get("/api/metrics").status_code == 401
+	data = client.get("/api/metrics", headers={"X-Metrics-Token": "secreto"}).get_json()
+	primaria = data["db_pool"]["primaria"]
+	assert data["db_pool"]["perfil"] == "worker"
+	assert primaria["checkouts"] >= 1
+	assert primaria["esperas"] == 1 and primaria["timeouts"] == 1
+	assert primaria["en_uso"] == 0
+
+	with app_p.app_context():
+		db.engine.dispose()
+
+
+def test_metrics_en_produccion_exige_token(client, app):
+	from app.config import ProdConfig
+
+	assert ProdConfig.METRICS_EXIGE_TOKEN is True
+	app.config.update(METRICS_EXIGE_TOKEN=True, METRICS_TOKEN="")
+	assert client.get("/api/metrics").status_code == 404
+
+	app.config["METRICS_TOKEN"] = "secreto"
+	assert client.get("/api/metrics").status_code == 401
+	assert client.get("/api/metrics", headers={"X-Metrics-Token": "secreto"}).status_code == 200
+
+
+def test_health_deep_reporta_dependencias_y_se_cachea(client, app):
+	from app.services import salud_service
+
+	app.config["HEALTH_CACHE_SECONDS"] = 60
+	salud_service._cache.clear()
+	try:
+		resp = client.get("/api/health/deep")
+		assert resp.status_code == 200
+		data = resp.get_json()
+		checks = data["checks"]
+		assert checks["db"]["primaria"]["ok"] is True
+		assert checks["db"]["primaria"]["latencia_ms"] >= 0
+		assert checks["uploads"]["escribible"] is True
+		assert "purgar_subidas_imagenes" in checks["tareas"]["tareas"]
+		assert "referencia" in checks["caches"]
+		assert checks["backlog"]["variantes_imagenes"] >= 0
+
+		# Dentro de la vigencia se devuelve el mismo resultado sin recalcular.
+		assert client.get("/api/health/deep").get_json()["generado_en"] == data["generado_en"]
+		assert client.get("/api/health/deep").get_json()["duracion_ms"] == data["duracion_ms"]
+	finally:
+		app.config["HEALTH_CACHE_SECONDS"] = 2
+		salud_service._cache.clear()
+
+
+def test_serve_liga_modo_de_worker_con_perfil_de_pool():
+	from argparse import Namespace
+
+	from app.serve import construir
+
+	def _args(modo, **kw):
+		return Namespace(modo=modo, workers=kw.get("workers"), threads=kw.get("threads"), bind=None, app="wsgi:app", preload=None)
+
+	argv, env = construir(_args("gthread", workers=3, threads=8), environ={"PORT": "9000"})
+	assert argv[argv.index("--workers") + 1] == "3"
+	assert argv[argv.index("--threads") + 1] == "8"
+	assert "--preload" in argv and "0.0.0.0:9000" in argv
+	assert env["DB_POOL_PERFIL"] == "web-sync" and env["DB_POOL_SIZE"] == "8"
+	assert env["APP_ENV"] == "production"
+
+	argv, env = construir(_args("gevent"), environ={"WEB_CONCURRENCY": "5", "DB_POOL_SIZE": "12"})
+	assert argv[argv.index("--worker-class") + 1] == "gevent"
+	assert argv[argv.index("--workers") + 1] == "5"
+	assert "--preload" not in argv
+	assert env["DB_POOL_PERFIL"] == "gevent" and env["DB_POOL_SIZE"] == "12"
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+
+
+def test_cron_siguiente_y_intervalo():
+	from app.services.tareas_service import Cron, Intervalo
+
+	c = Cron("15 3 * * *")
+	assert c.siguiente(datetime(2026, 1, 1, 3, 15)) == datetime(2026, 1, 2, 3, 15)
+	assert c.siguiente(datetime(2026, 1, 1, 2, 59, 30)) == datetime(2026, 1, 1, 3, 15)
+
+	# lunes a viernes cada 30 min de 9 a 10: 2026-01-03 es sábado
+	c = Cron("*/30 9-10 * * 1-5")
+	assert c.siguiente(datetime(2026, 1, 2, 10, 45)) == datetime(2026, 1, 5, 9, 0)
+
+	# día-mes y día-semana restringidos: basta cualquiera (domingo 4 o día 10)
+	c = Cron("0 0 10 * 0")
+	assert c.siguiente(datetime(2026, 1, 1)) == datetime(2026, 1, 4)
+
+	assert Intervalo(60).siguiente(datetime(2026, 1, 1)) == datetime(2026, 1, 1, 0, 1)
+
+
+def test_lock_lider_exclusivo_y_relevo_al_vencer(db_session):
+	from app.models.tarea_programada import BloqueoTarea
+	from app.services import tareas_service
+
+	assert tareas_service.tomar_lock("scheduler-test", "a", 60) is True
+	assert tareas_service.tomar_lock("scheduler-test", "b", 60) is False
+	assert tareas_service.tomar_lock("scheduler-test", "a", 60) is True  # renovación
+
+	# Lease vencido: otro nodo toma el relevo
+	fila = db_session.get(BloqueoTarea, "scheduler-test")
+	fila.expires_at = datetime.utcnow() - timedelta(seconds=1)
+	db_session.commit()
+	assert tareas_service.tomar_lock("scheduler-test", "b", 60) is True
+	assert tareas_service.tomar_lock("scheduler-test", "a", 60) is False
+
+	tareas_service.soltar_lock("scheduler-test", "b")
+	assert db_session.get(BloqueoTarea, "scheduler-test") is None
+
+
+def test_cli_jobs_once_expira_pagos_y_guarda_historial(app, db_session, make_user, make_articulo):
+	from app.models.renta import Renta
+	from app.models.tarea_programada import EjecucionTarea
+
+	dueno = make_user("dueno_jobs@test.com")
+	arr = make_user("arr_jobs@test.com")
+	art = make_articulo(dueno.id_usuario)
+	inicio = datetime.utcnow() + timedelta(days=20)
+	renta = Renta(
+		id_articulo=art.id_articulo,
+		id_arrendatario=arr.id_usuario,
+		id_propietario=dueno.id_usuario,
+		fecha_inicio=inicio,
+		fecha_fin=inicio + timedelta(days=1),
+		precio_total_renta=100,
+		monto_deposito=50,
+		estado_renta="pendiente_pago",
+		fecha_creacion=datetime.utcnow() - timedelta(hours=2),
+	)
+	db_session.add(renta)
+	db_session.commit()
+
+	runner = app.test_cli_runner()
+	res = runner.invoke(args=["jobs", "once", "expirar_pagos"])
+	assert res.exit_code == 0, res.output
+	assert '"expiradas": 1' in res.output
+
+	db_session.refresh(renta)
+	assert renta.estado_renta == "cancelada"
+
+	ultima = (
+		EjecucionTarea.query.filter_by(nombre="expirar_pagos").order_by(EjecucionTarea.id.desc()).first()
+	)
+	assert ultima.estado == "ok" and ultima.fin is not None
+
+	res = runner.invoke(args=["jobs", "list"])
+	assert res.exit_code == 0
+	assert "expirar_pagos" in res.output and "(ok," in res.output
+
+	res = runner.invoke(args=["jobs", "once", "no_existe"])
+	assert res.exit_code != 0
+
+
+def test_cli_uploads_gc_cuarentena_respeta_referencias_y_gracia(app, db_session, tmp_path, make_user, make_articulo):
+	import os
+	import time
+
+	from app.models.articulo_imagen import ArticuloImagen
+
+	app.config["UPLOADS_ARTICULOS_DIR"] = str(tmp_path)
+	dueno = make_user("dueno_gc@test.com")
+	art = make_articulo(dueno.id_usuario)
+
+	sha = "ab" * 32
+	(tmp_path / "ab" / "ab").mkdir(parents=True)
+	usado = tmp_path / "ab" / "ab" / f"{sha}.jpg"
+	variante = tmp_path / "ab" / "ab" / f"{sha}.thumb.webp"
+	huerfano = tmp_path / "viejo.jpg"
+	reciente = tmp_path / "reciente.jpg"
+	for p in (usado, variante, huerfano, reciente):
+		p.write_bytes(b"x" * 10)
+	viejo = time.time() - 48 * 3600
+	for p in (usado, variante, huerfano):
+		os.utime(p, (viejo, viejo))
+
+	db_session.add(
+		ArticuloImagen(
+			id_articulo=art.id_articulo,
+			url_imagen=f"http://localhost/uploads/articulos/ab/ab/{sha}.jpg",
+			sha256=sha,
+		)
+	)
+	db_session.commit()
+
+	runner = app.test_cli_runner()
+	res = runner.invoke(args=["uploads", "gc"])
+	assert res.exit_code == 0, res.output
+	assert "huérfanos=1" in res.output
+	assert huerfano.exists()
+
+	res = runner.invoke(args=["uploads", "gc", "--accion", "cuarentena", "--max-por-segundo", "0"])
+	assert res.exit_code == 0, res.output
+	assert "cuarentena=1" in res.output
+	assert not huerfano.exists()
+	assert (tmp_path / ".cuarentena" / "viejo.jpg").exists()
+	assert usado.exists() and variante.exists() and reciente.exists()
+
+	# La cuarentena no se vuelve a revisar.
+	res = runner.invoke(args=["uploads", "gc", "--accion", "borrar"])
+	assert "huérfanos=0" in res.output
+
+
+def test_uploads_gc_recupera_imagenes_de_articulos_eliminados_tras_gracia(app, db_session, tmp_path, make_user, make_articulo):
+	import os
+	import time
+	from datetime import datetime, timedelta
+
+	from app.models.articulo_imagen import ArticuloImagen
+	from app.services import articulo_service, uploads_gc_service
+
+	app.config["UPLOADS_ARTICULOS_DIR"] = str(tmp_path)
+	app.config["UPLOADS_GC_ELIMINADOS_DIAS"] = 30
+	dueno = make_user("dueno_gc_elim@test.com")
+	eliminado = make_articulo(dueno.id_usuario)
+	vigente = make_articulo(dueno.id_usuario)
+
+	viejo = time.time() - 48 * 3600
+	archivos = {}
+	for nombre, art in (("solo", eliminado), ("compartido", eliminado), ("compartido", vigente)):
+		rel = f"{nombre}.jpg"
+		archivos[nombre] = tmp_path / rel
+		archivos[nombre].write_bytes(b"x")
+		os.utime(archivos[nombre], (viejo, viejo))
+		db_session.add(ArticuloImagen(id_articulo=art.id_articulo, url_imagen=f"http://localhost/uploads/articulos/{rel}"))
+	db_session.commit()
+
+	articulo_service.eliminar_articulo(eliminado.id_articulo, dueno.id_usuario)
+
+	# Recién eliminado: se conserva (puede restaurarse).
+	assert uploads_gc_service.recolectar("borrar", gracia_horas=1)["procesados"] == 0
+
+	eliminado.actualizado_en = datetime.utcnow() - timedelta(days=31)
+	db_session.commit()
+	r = uploads_gc_service.recolectar("borrar", gracia_horas=1)
+	assert r["procesados"] == 1
+	assert not archivos["solo"].exists()
+	# Compartido con un artículo vigente: sigue referenciado.
+	assert archivos["compartido"].exists()
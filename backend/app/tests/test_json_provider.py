@@ -0,0 +1,36 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def test_orjson_y_stdlib_serializan_igual_fechas_y_decimal(app):
+	from app.utils.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+
+	payload = {
+		"id": 1,
+		"fecha_inicio": datetime(2026, 1, 2, 10, 30, 0, 123456),
+		"dia": date(2026, 1, 2),
+		"precio": Decimal("125.50"),
+		"nada": None,
+		"titulo": "Cámara réflex",
+		"conteos": {7: 2},
+	}
+	esperado = {
+		"id": 1,
+		"fecha_inicio": "2026-01-02T10:30:00.123456",
+		"dia": "2026-01-02",
+		"precio": 125.5,
+		"nada": None,
+		"titulo": "Cámara réflex",
+		"conteos": {"7": 2},
+	}
+
+	assert json.loads(StdlibJSONProvider(app).dumps(payload)) == esperado
+	if orjson is not None:
+		assert isinstance(app.json, OrjsonProvider)
+		assert json.loads(OrjsonProvider(app).dumps(payload)) == esperado
+
+	with app.test_request_context():
+		resp = app.json.response(payload)
+	assert resp.mimetype == "application/json"
+	assert json.loads(resp.get_data()) == esperado
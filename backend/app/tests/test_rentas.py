@@ -359,6 +359,59 @@ def test_get_puntos_entrega_publicos_solo_activos(client, make_user, auth_header
 	assert all(x["nombre"] != "Inactivo" for x in items)
 
 
+def test_puntos_entrega_cache_se_invalida_con_crud_admin(client, make_user, auth_header, db_session):
+	from app.services import admin_service, referencia_service
+
+	u = make_user("pe_cache@test.com")
+	h = auth_header(u.id_usuario)
+	creado = admin_service.crear_punto_entrega_admin({"nombre": "Kiosco Cache", "direccion": "Norte"})
+
+	primera = client.get("/api/puntos-entrega", headers=h)
+	assert any(x["id"] == creado["id"] for x in primera.get_json()["data"]["items"])
+	hits = referencia_service.estadisticas()["puntos_entrega"]["hits"]
+	client.get("/api/puntos-entrega", headers=h)
+	# ETag + listado salen de la misma entrada en memoria.
+	assert referencia_service.estadisticas()["puntos_entrega"]["hits"] >= hits + 2
+
+	admin_service.desactivar_punto_entrega_admin(creado["id"])
+	segunda = client.get("/api/puntos-entrega", headers={**h, "If-None-Match": primera.headers["ETag"]})
+	assert segunda.status_code == 200
+	assert all(x["id"] != creado["id"] for x in segunda.get_json()["data"]["items"])
+	assert referencia_service.punto_entrega_activo(creado["id"]) is None
+
+
+def test_puntos_entrega_cache_ve_cambios_de_otro_worker(client, make_user, auth_header, db_session):
+	from sqlalchemy import update
+
+	from app.services import admin_service, referencia_service
+
+	u = make_user("pe_worker@test.com")
+	h = auth_header(u.id_usuario)
+	creado = admin_service.crear_punto_entrega_admin({"nombre": "Kiosco Worker", "direccion": "Sur"})
+	assert referencia_service.punto_entrega_activo(creado["id"]) is not None
+
+	# Otro worker lo desactiva: UPDATE sin pasar por el flush de esta sesión (sin invalidación local).
+	db_session.execute(update(PuntoEntrega).where(PuntoEntrega.id == creado["id"]).values(activo=False))
+	db_session.commit()
+
+	# La ruta de escritura relee `activo` aunque la cache aún lo tenga.
+	assert referencia_service.punto_entrega_activo(creado["id"]) is not None
+	assert referencia_service.punto_entrega_activo(creado["id"], confirmar=True) is None
+	assert referencia_service.punto_entrega_activo(creado["id"]) is None
+
+	# Listado: el sello compartido (count + max(updated_at)) se revisa cada REFERENCIA_CACHE_VERIFICAR_SECONDS.
+	db_session.execute(update(PuntoEntrega).where(PuntoEntrega.id == creado["id"]).values(activo=True))
+	db_session.commit()
+	assert referencia_service.punto_entrega_activo(creado["id"]) is None
+	app = client.application
+	app.config["REFERENCIA_CACHE_VERIFICAR_SECONDS"] = 0
+	try:
+		items = client.get("/api/puntos-entrega", headers=h).get_json()["data"]["items"]
+		assert any(x["id"] == creado["id"] for x in items)
+	finally:
+		app.config["REFERENCIA_CACHE_VERIFICAR_SECONDS"] = 5
+
+
 def test_coordinacion_guarda_punto_y_se_refleja_en_resumen(client, make_user, auth_header, make_articulo, db_session):
 	dueno = make_user("dueno_pe@test.com")
 	arr = make_user("arr_pe@test.com")
@@ -685,3 +738,539 @@ def test_admin_resuelve_incidente_idempotente_notifica(client, make_user, auth_h
 	deps_ret2 = Notificacion.query.filter_by(id_usuario=arr.id_usuario, tipo="DEPOSITO_RETENIDO").all()
 	assert len(inc_res2) == 1
 	assert len(deps_ret2) == 1
+
+
+def test_reserva_lock_reintenta_deadlock_y_propaga_otros_errores(app):
+	from sqlalchemy.exc import OperationalError
+
+	from app.services import reserva_lock_service
+
+	class _Deadlock(Exception):
+		pass
+
+	llamadas = {"n": 0}
+
+	def _fn():
+		llamadas["n"] += 1
+		if llamadas["n"] < 3:
+			raise OperationalError("INSERT", {}, _Deadlock(1213, "Deadlock found"))
+		return "ok"
+
+	with app.app_context():
+		app.config["RESERVA_LOCK_BACKOFF_MS"] = 1
+		assert reserva_lock_service.ejecutar_con_reintentos(_fn) == "ok"
+		assert llamadas["n"] == 3
+
+		def _otro():
+			raise OperationalError("INSERT", {}, _Deadlock(1062, "Duplicate entry"))
+
+		try:
+			reserva_lock_service.ejecutar_con_reintentos(_otro)
+			assert False, "debió propagar"
+		except OperationalError:
+			pass
+
+
+def test_reserva_lock_serializa_mismo_articulo(app):
+	from app.services import reserva_lock_service
+
+	with app.app_context():
+		app.config["RESERVA_LOCK_TIMEOUT_SECONDS"] = 1
+		with reserva_lock_service.bloquear_articulo(7):
+			# Mismo artículo: el lock está tomado
+			assert reserva_lock_service._lock_local(7).locked()
+			# Otro artículo (otra franja) sigue libre
+			assert not reserva_lock_service._lock_local(8).locked()
+		assert not reserva_lock_service._lock_local(7).locked()
+
+
+def test_reserva_con_snapshot_previo_ve_renta_confirmada_por_otra_sesion(tmp_path, app, monkeypatch):
+	"""Dos conexiones sobre SQLite en WAL con BEGIN explícito: como REPEATABLE READ,
+	el snapshot de la transacción se fija en su primera lectura."""
+
+	from sqlalchemy import event
+	from sqlalchemy.orm import Session
+
+	from app import create_app
+	from app.extensions import db
+	from app.models.articulo import Articulo
+	from app.models.categoria import Categoria
+	from app.models.usuario import Usuario
+	from app.services import renta_service, reserva_lock_service
+	from app.tests.conftest import PytestConfig
+	from app.utils.errors import ApiError
+
+	class ConfigArchivo(PytestConfig):
+		SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'reservas.db'}"
+		SQLALCHEMY_ENGINE_OPTIONS = {}
+		RESERVA_LOCK_REINTENTOS = 0
+
+	app_f = create_app(ConfigArchivo)
+	with app_f.app_context():
+		engine = db.engine
+
+		@event.listens_for(engine, "connect")
+		def _wal(dbapi_connection, connection_record):
+			dbapi_connection.isolation_level = None
+			dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+		@event.listens_for(engine, "begin")
+		def _begin(conn):
+			conn.exec_driver_sql("BEGIN")
+
+		engine.dispose()
+		db.create_all()
+
+		dueno = Usuario(nombre="D", apellidos="U", correo_electronico="d_snap@test.com", hash_contrasena="x", estado_cuenta="activo", verificado=True)
+		arr = Usuario(nombre="A", apellidos="U", correo_electronico="a_snap@test.com", hash_contrasena="x", estado_cuenta="activo", verificado=True)
+		otro = Usuario(nombre="O", apellidos="U", correo_electronico="o_snap@test.com", hash_contrasena="x", estado_cuenta="activo", verificado=True)
+		cat = Categoria(nombre="CategoriaSnap")
+		db.session.add_all([dueno, arr, otro, cat])
+		db.session.flush()
+		art = Articulo(
+			id_propietario=dueno.id_usuario,
+			titulo="Snap",
+			descripcion="Desc",
+			id_categoria=cat.id,
+			precio_por_dia=100,
+			monto_deposito=0,
+			estado_publicacion="publicado",
+		)
+		db.session.add(art)
+		db.session.commit()
+		ids = (dueno.id_usuario, arr.id_usuario, otro.id_usuario, art.id_articulo)
+
+		# Camino MySQL (lock de fila) sobre SQLite: FOR UPDATE/SHARE no se emiten.
+		monkeypatch.setattr(reserva_lock_service, "_dialecto", lambda: "mysql")
+
+		inicio = datetime.utcnow().replace(microsecond=0) + timedelta(days=3)
+		fin = inicio + timedelta(days=2)
+
+		# Sesión A: una lectura previa (como la de auth) fija el snapshot.
+		assert db.session.get(Usuario, ids[1]) is not None
+
+		# Sesión B (otra conexión) confirma una renta que se traslapa.
+		with Session(engine) as otra:
+			otra.add(
+				Renta(
+					id_articulo=ids[3],
+					id_arrendatario=ids[2],
+					id_propietario=ids[0],
+					fecha_inicio=inicio,
+					fecha_fin=fin,
+					precio_total_renta=200,
+					monto_deposito=0,
+					estado_renta="confirmada",
+				)
+			)
+			otra.commit()
+
+		try:
+			renta_service.crear_renta({"id_articulo": ids[3], "fecha_inicio": inicio, "fecha_fin": fin}, ids[1])
+			assert False, "debió detectar el traslape"
+		except ApiError as e:
+			assert e.status_code in (400, 409)
+
+		assert Renta.query.filter_by(id_articulo=ids[3]).count() == 1
+		db.session.remove()
+
+
+def test_idempotency_key_crear_renta_no_duplica(client, make_user, auth_header, make_articulo):
+	dueno = make_user("dueno_idem@test.com")
+	arr = make_user("arr_idem@test.com")
+	art = make_articulo(dueno.id_usuario)
+
+	inicio = datetime.utcnow() + timedelta(days=40)
+	fin = inicio + timedelta(days=1)
+	body = {"id_articulo": art.id_articulo, "fecha_inicio": _iso(inicio), "fecha_fin": _iso(fin)}
+	headers = {**auth_header(arr.id_usuario), "Idempotency-Key": "crear-1"}
+
+	r1 = client.post("/api/rentas", json=body, headers=headers)
+	assert r1.status_code == 201
+	r2 = client.post("/api/rentas", json=body, headers=headers)
+	assert r2.status_code == 201
+	assert r2.headers.get("Idempotent-Replayed") == "true"
+	assert r2.get_json()["data"]["id"] == r1.get_json()["data"]["id"]
+	assert Renta.query.filter_by(id_articulo=art.id_articulo).count() == 1
+
+	# Misma clave con otra petición => 422
+	otro = {**body, "fecha_fin": _iso(fin + timedelta(days=1))}
+	r3 = client.post("/api/rentas", json=otro, headers=headers)
+	assert r3.status_code == 422
+
+
+def test_idempotency_key_se_libera_si_falla(client, make_user, auth_header, make_articulo):
+	dueno = make_user("dueno_idem2@test.com")
+	arr = make_user("arr_idem2@test.com")
+	art = make_articulo(dueno.id_usuario)
+
+	headers = {**auth_header(arr.id_usuario), "Idempotency-Key": "pagar-1"}
+	r = client.post("/api/rentas/999999/pagar", headers=headers)
+	assert r.status_code == 404
+
+	inicio = datetime.utcnow() + timedelta(days=45)
+	fin = inicio + timedelta(days=1)
+	c = client.post(
+		"/api/rentas",
+		json={"id_articulo": art.id_articulo, "fecha_inicio": _iso(inicio), "fecha_fin": _iso(fin)},
+		headers=auth_header(arr.id_usuario),
+	)
+	id_renta = c.get_json()["data"]["id"]
+	p1 = client.post(f"/api/rentas/{id_renta}/pagar", headers={**auth_header(arr.id_usuario), "Idempotency-Key": "pagar-2"})
+	assert p1.status_code == 200
+	p2 = client.post(f"/api/rentas/{id_renta}/pagar", headers={**auth_header(arr.id_usuario), "Idempotency-Key": "pagar-2"})
+	assert p2.status_code == 200
+	assert p2.get_json() == p1.get_json()
+
+
+def test_idempotency_key_en_curso_abandonada_se_retoma(client, db_session, make_user, auth_header, make_articulo):
+	from app.models.clave_idempotencia import ClaveIdempotencia
+
+	dueno = make_user("dueno_idem3@test.com")
+	arr = make_user("arr_idem3@test.com")
+	art = make_articulo(dueno.id_usuario)
+
+	inicio = datetime.utcnow() + timedelta(days=50)
+	body = {"id_articulo": art.id_articulo, "fecha_inicio": _iso(inicio), "fecha_fin": _iso(inicio + timedelta(days=1))}
+	headers = {**auth_header(arr.id_usuario), "Idempotency-Key": "crear-muerto"}
+
+	# El worker original murió a mitad de la petición: la clave quedó 'en curso'.
+	r1 = client.post("/api/rentas", json=body, headers=headers)
+	assert r1.status_code == 201
+	registro = ClaveIdempotencia.query.filter_by(id_usuario=arr.id_usuario, clave="crear-muerto").one()
+	registro.status_code = None
+	registro.response_json = None
+	Renta.query.filter_by(id_articulo=art.id_articulo).delete()
+	db_session.commit()
+
+	# Reciente: sigue en curso.
+	assert client.post("/api/rentas", json=body, headers=headers).status_code == 409
+
+	# Pasado IDEMPOTENCY_EN_CURSO_SEGUNDOS: el reintento la retoma y ejecuta la vista.
+	registro.created_at = datetime.utcnow() - timedelta(seconds=120)
+	db_session.commit()
+	r2 = client.post("/api/rentas", json=body, headers=headers)
+	assert r2.status_code == 201
+	assert "Idempotent-Replayed" not in r2.headers
+	r3 = client.post("/api/rentas", json=body, headers=headers)
+	assert r3.headers.get("Idempotent-Replayed") == "true"
+	assert r3.get_json()["data"]["id"] == r2.get_json()["data"]["id"]
+	assert Renta.query.filter_by(id_articulo=art.id_articulo).count() == 1
+
+
+def test_cotizar_elige_combinacion_mas_barata_y_marca_ocupadas(
+	client, db_session, make_user, auth_header, make_articulo
+):
+	from datetime import datetime, timedelta
+
+	dueno = make_user("dueno_cot@test.com")
+	arr = make_user("arr_cot@test.com")
+	art = make_articulo(dueno.id_usuario, unidad="por_dia")
+
+	t0 = (datetime.utcnow() + timedelta(days=5)).replace(hour=9, minute=0, second=0, microsecond=0)
+	r = client.post(
+		"/api/rentas",
+		json={
+			"id_articulo": art.id_articulo,
+			"fecha_inicio": t0.isoformat(),
+			"fecha_fin": (t0 + timedelta(days=1)).isoformat(),
+			"modalidad": "dias",
+		},
+		headers=auth_header(arr.id_usuario),
+	)
+	assert r.status_code == 201
+
+	art.precio_por_hora = 10
+	art.precio_por_dia = 100
+	art.precio_por_semana = 500
+	db_session.commit()
+
+	libre = t0 + timedelta(days=2)
+	resp = client.post(
+		"/api/rentas/cotizar",
+		json={
+			"id_articulo": art.id_articulo,
+			"ventanas": [
+				{"fecha_inicio": libre.isoformat(), "fecha_fin": (libre + timedelta(hours=30)).isoformat()},
+				{"fecha_inicio": libre.isoformat(), "fecha_fin": (libre + timedelta(days=6)).isoformat()},
+				{"fecha_inicio": t0.isoformat(), "fecha_fin": (t0 + timedelta(hours=2)).isoformat()},
+			],
+			"calendario": {"anio": libre.year, "mes": libre.month, "duracion": 3, "modalidad": "dias"},
+		},
+	)
+	assert resp.status_code == 200
+	data = resp.get_json()["data"]
+	v30h, v6d, ocupada = data["ventanas"]
+
+	assert v30h["precio_total"] == 160.0
+	assert v30h["desglose"] == {"semanas": 0, "dias": 1, "horas": 6}
+	assert v6d["precio_total"] == 500.0
+	assert v6d["desglose"] == {"semanas": 1, "dias": 0, "horas": 0}
+	assert v30h["disponible"] is True
+	assert ocupada["disponible"] is False
+
+	cal = data["calendario"]
+	assert cal["precio_total"] == 300.0
+	dias = {d["fecha"]: d["disponible"] for d in cal["dias"]}
+	assert dias[libre.date().isoformat()] is True
+
+	# Ventanas con zona: se normalizan a UTC (04:00-05:00 = 09:00 UTC, ocupada)
+	resp_tz = client.post(
+		"/api/rentas/cotizar",
+		json={
+			"id_articulo": art.id_articulo,
+			"ventanas": [
+				{
+					"fecha_inicio": (t0 - timedelta(hours=5)).isoformat() + "-05:00",
+					"fecha_fin": (t0 - timedelta(hours=3)).isoformat() + "-05:00",
+				}
+			],
+		},
+	)
+	assert resp_tz.status_code == 200
+	v_tz = resp_tz.get_json()["data"]["ventanas"][0]
+	assert v_tz["fecha_inicio"] == t0.isoformat()
+	assert v_tz["horas"] == 2
+	assert v_tz["disponible"] is False
+
+
+def test_crear_renta_cobra_semanas_dias_y_horas_con_tarifas_guardadas(
+	client, make_user, auth_header, make_categoria
+):
+	from datetime import datetime, timedelta
+
+	dueno = make_user("dueno_tarifas@test.com")
+	arr = make_user("arr_tarifas@test.com")
+	cat = make_categoria()
+
+	resp = client.post(
+		"/api/articulos",
+		json={
+			"titulo": "Taladro",
+			"descripcion": "Percutor",
+			"id_categoria": cat.id,
+			"precio_renta_hora": 30,
+			"precio_renta_dia": 100,
+			"precio_renta_semana": 500,
+			"deposito_garantia": 50,
+			"ubicacion_texto": "Centro",
+		},
+		headers=auth_header(dueno.id_usuario),
+	)
+	assert resp.status_code == 201
+	art = resp.get_json()["data"]
+	assert (art["precio_renta_hora"], art["precio_renta_dia"], art["precio_renta_semana"]) == (30.0, 100.0, 500.0)
+
+	t0 = (datetime.utcnow() + timedelta(days=3)).replace(hour=8, minute=0, second=0, microsecond=0)
+
+	# 8 días: 1 semana + 1 día (600), no 8 días sueltos (800)
+	r = client.post(
+		"/api/rentas",
+		json={
+			"id_articulo": art["id"],
+			"fecha_inicio": t0.isoformat(),
+			"fecha_fin": (t0 + timedelta(days=8)).isoformat(),
+			"modalidad": "dias",
+		},
+		headers=auth_header(arr.id_usuario),
+	)
+	assert r.status_code == 201
+	assert r.get_json()["data"]["precio_total_renta"] == 600.0
+
+	# 5 horas por hora: 150 > 1 día (100) => se cobra el día
+	t1 = t0 + timedelta(days=10)
+	r = client.post(
+		"/api/rentas",
+		json={
+			"id_articulo": art["id"],
+			"fecha_inicio": t1.isoformat(),
+			"fecha_fin": (t1 + timedelta(hours=5)).isoformat(),
+			"modalidad": "horas",
+		},
+		headers=auth_header(arr.id_usuario),
+	)
+	assert r.status_code == 201
+	assert r.get_json()["data"]["precio_total_renta"] == 100.0
+
+
+def test_notificaciones_leer_en_bloque_por_ids_y_cursor(client, db_session, make_user, auth_header):
+	from app.models.notificacion import Notificacion
+
+	u = make_user("bulk_leer@test.com")
+	otro = make_user("bulk_leer_otro@test.com")
+	ns = [Notificacion(id_usuario=u.id_usuario, tipo="X", mensaje=f"n{i}", leida=False) for i in range(5)]
+	ajena = Notificacion(id_usuario=otro.id_usuario, tipo="X", mensaje="ajena", leida=False)
+	db_session.add_all(ns + [ajena])
+	db_session.commit()
+	ids = [n.id for n in ns]
+
+	r = client.post(
+		"/api/notificaciones/leer",
+		json={"ids": [ids[0], ajena.id]},
+		headers=auth_header(u.id_usuario),
+	)
+	assert r.status_code == 200
+	assert r.get_json()["data"]["actualizadas"] == 1
+
+	r = client.post(
+		"/api/notificaciones/leer",
+		json={"todas": True, "hasta_id": ids[2]},
+		headers=auth_header(u.id_usuario),
+	)
+	assert r.get_json()["data"]["actualizadas"] == 2
+
+	db_session.expire_all()
+	assert [n.leida for n in Notificacion.query.filter(Notificacion.id.in_(ids)).order_by(Notificacion.id)] == [
+		True, True, True, False, False
+	]
+	assert db_session.get(Notificacion, ajena.id).leida is False
+
+	r = client.post("/api/notificaciones/leer", json={}, headers=auth_header(u.id_usuario))
+	assert r.status_code == 400
+
+
+def test_chat_marcar_leidos_batch_upsert(client, db_session, make_user, auth_header, make_articulo):
+	from datetime import datetime, timedelta
+
+	from app.models.chat_lectura import ChatLectura
+	from app.models.renta import Renta
+
+	dueno = make_user("dueno_leidos@test.com")
+	arr = make_user("arr_leidos@test.com")
+	ajeno = make_user("ajeno_leidos@test.com")
+	art = make_articulo(dueno.id_usuario)
+	t0 = datetime.utcnow() + timedelta(days=40)
+	rentas = [
+		Renta(
+			id_articulo=art.id_articulo,
+			id_arrendatario=arr.id_usuario,
+			id_propietario=dueno.id_usuario,
+			fecha_inicio=t0 + timedelta(days=3 * i),
+			fecha_fin=t0 + timedelta(days=3 * i + 1),
+			precio_total_renta=100,
+			monto_deposito=50,
+			estado_renta="pagada",
+		)
+		for i in range(3)
+	]
+	db_session.add_all(rentas)
+	db_session.commit()
+	ids = [r.id for r in rentas]
+
+	viejo = datetime.utcnow() - timedelta(days=1)
+	db_session.add(ChatLectura(id_renta=ids[0], id_usuario=arr.id_usuario, last_read_at=viejo))
+	db_session.commit()
+
+	r = client.post("/api/rentas/chat/marcar-leido", json={"ids": ids}, headers=auth_header(arr.id_usuario))
+	assert r.status_code == 200
+	assert r.get_json()["data"]["actualizadas"] == 3
+
+	db_session.expire_all()
+	lecturas = ChatLectura.query.filter(ChatLectura.id_usuario == arr.id_usuario, ChatLectura.id_renta.in_(ids)).all()
+	assert len(lecturas) == 3
+	assert all(x.last_read_at > viejo for x in lecturas)
+
+	r = client.post("/api/rentas/chat/marcar-leido", json={"ids": ids}, headers=auth_header(ajeno.id_usuario))
+	assert r.status_code == 403
+
+
+def test_inbox_y_batch_incluyen_no_leidos_por_renta(client, db_session, make_user, auth_header, make_articulo):
+	from datetime import datetime, timedelta
+
+	from app.models.chat_lectura import ChatLectura
+	from app.models.mensaje_renta import MensajeRenta
+	from app.models.renta import Renta
+
+	dueno = make_user("dueno_unread_batch@test.com")
+	arr = make_user("arr_unread_batch@test.com")
+	art = make_articulo(dueno.id_usuario)
+	t0 = datetime.utcnow() + timedelta(days=60)
+	r1, r2 = [
+		Renta(
+			id_articulo=art.id_articulo,
+			id_arrendatario=arr.id_usuario,
+			id_propietario=dueno.id_usuario,
+			fecha_inicio=t0 + timedelta(days=3 * i),
+			fecha_fin=t0 + timedelta(days=3 * i + 1),
+			precio_total_renta=100,
+			monto_deposito=50,
+			estado_renta="pagada",
+		)
+		for i in range(2)
+	]
+	db_session.add_all([r1, r2])
+	db_session.commit()
+
+	antes = datetime.utcnow() - timedelta(minutes=10)
+	for i in range(3):
+		db_session.add(MensajeRenta(id_renta=r1.id, id_emisor=dueno.id_usuario, mensaje=f"a{i}", created_at=antes + timedelta(minutes=i)))
+	db_session.add(MensajeRenta(id_renta=r2.id, id_emisor=dueno.id_usuario, mensaje="b", created_at=antes))
+	db_session.add(MensajeRenta(id_renta=r2.id, id_emisor=arr.id_usuario, mensaje="propio", created_at=antes + timedelta(minutes=5)))
+	# r1: leído hasta después del primer mensaje => quedan 2
+	db_session.add(ChatLectura(id_renta=r1.id, id_usuario=arr.id_usuario, last_read_at=antes + timedelta(seconds=30)))
+	db_session.commit()
+
+	resp = client.get("/api/rentas/mias?rol=arrendatario&estado=activas", headers=auth_header(arr.id_usuario))
+	assert resp.status_code == 200
+	por_id = {x["id_renta"]: x["chat_unread_count"] for x in resp.get_json()["data"]["items"]}
+	assert por_id[r1.id] == 2
+	assert por_id[r2.id] == 1
+
+	resp = client.get(
+		f"/api/rentas/chat/unread-counts?ids={r1.id},{r2.id},999999",
+		headers=auth_header(arr.id_usuario),
+	)
+	assert resp.status_code == 200
+	assert resp.get_json()["data"]["counts"] == {str(r1.id): 2, str(r2.id): 1}
+
+
+def test_conteos_bandeja_agrupa_por_rol_y_estado_publico(client, db_session, make_user, auth_header, make_articulo):
+	from datetime import datetime, timedelta
+
+	from app.models.renta import Renta
+
+	dueno = make_user("dueno_conteos@test.com")
+	arr = make_user("arr_conteos@test.com")
+	art = make_articulo(dueno.id_usuario)
+	t0 = datetime.utcnow() + timedelta(days=90)
+
+	def _renta(i, estado, **kw):
+		return Renta(
+			id_articulo=art.id_articulo,
+			id_arrendatario=arr.id_usuario,
+			id_propietario=dueno.id_usuario,
+			fecha_inicio=t0 + timedelta(days=3 * i),
+			fecha_fin=t0 + timedelta(days=3 * i + 1),
+			precio_total_renta=100,
+			monto_deposito=50,
+			estado_renta=estado,
+			**kw,
+		)
+
+	rentas = [
+		_renta(0, "pagada"),
+		_renta(1, "en_curso"),
+		_renta(2, "en_curso", devuelto=True),
+		_renta(3, "cancelada", notas_devolucion="EXPIRACION_PAGO"),
+	]
+	db_session.add_all(rentas)
+	db_session.commit()
+	assert [r.estado_publico for r in rentas] == ["pagada", "en_uso", "devuelta", "expirada"]
+
+	# El listener mantiene la columna al cambiar estado_renta.
+	rentas[0].estado_renta = "completada"
+	db_session.commit()
+	assert rentas[0].estado_publico == "finalizada"
+
+	resp = client.get("/api/rentas/mias/conteos", headers=auth_header(arr.id_usuario))
+	assert resp.status_code == 200
+	data = resp.get_json()["data"]
+	assert data["arrendatario"]["finalizada"] == 1
+	assert data["arrendatario"]["en_uso"] == 1
+	assert data["arrendatario"]["devuelta"] == 1
+	assert data["arrendatario"]["expirada"] == 1
+	assert data["arrendatario"]["pagada"] == 0
+	assert sum(data["dueno"].values()) == 0
+
+	resp = client.get("/api/rentas/mias/conteos", headers=auth_header(dueno.id_usuario))
+	assert sum(resp.get_json()["data"]["dueno"].values()) == 4
@@ -0,0 +1,65 @@
+def test_etag_condicional_articulo_categorias_y_renta(client, db_session, make_user, auth_header, make_articulo):
+	from datetime import datetime, timedelta
+
+	from app.models.renta import Renta
+
+	dueno = make_user("dueno_etag@test.com")
+	arr = make_user("arr_etag@test.com")
+	ajeno = make_user("ajeno_etag@test.com")
+	art = make_articulo(dueno.id_usuario)
+
+	url = f"/api/articulos/{art.id_articulo}"
+	r1 = client.get(url)
+	etag = r1.headers["ETag"]
+	assert etag.startswith('W/"')
+	assert "no-cache" in r1.headers["Cache-Control"]
+	r2 = client.get(url, headers={"If-None-Match": etag})
+	assert r2.status_code == 304
+	assert r2.data == b""
+
+	client.patch(url, json={"titulo": "Otro título"}, headers=auth_header(dueno.id_usuario))
+	r3 = client.get(url, headers={"If-None-Match": etag})
+	assert r3.status_code == 200
+	assert r3.headers["ETag"] != etag
+	assert r3.get_json()["data"]["titulo"] == "Otro título"
+
+	cats = client.get("/api/categorias")
+	assert client.get("/api/categorias", headers={"If-None-Match": cats.headers["ETag"]}).status_code == 304
+
+	h = auth_header(arr.id_usuario)
+	puntos = client.get("/api/puntos-entrega", headers=h)
+	assert client.get("/api/puntos-entrega", headers={**h, "If-None-Match": puntos.headers["ETag"]}).status_code == 304
+
+	t0 = datetime.utcnow() + timedelta(days=120)
+	renta = Renta(
+		id_articulo=art.id_articulo,
+		id_arrendatario=arr.id_usuario,
+		id_propietario=dueno.id_usuario,
+		fecha_inicio=t0,
+		fecha_fin=t0 + timedelta(days=1),
+		precio_total_renta=100,
+		monto_deposito=50,
+		estado_renta="pagada",
+	)
+	db_session.add(renta)
+	db_session.commit()
+
+	url = f"/api/rentas/{renta.id}"
+	r1 = client.get(url, headers=h)
+	etag = r1.headers["ETag"]
+	assert "private" in r1.headers["Cache-Control"]
+	assert client.get(url, headers={**h, "If-None-Match": etag}).status_code == 304
+	# Otro usuario: ETag distinto (la respuesta depende del usuario) y sin 304 ajeno.
+	assert client.get(url, headers={**auth_header(dueno.id_usuario), "If-None-Match": etag}).status_code == 200
+	assert client.get(url, headers={**auth_header(ajeno.id_usuario), "If-None-Match": etag}).status_code == 403
+
+	# La renta embebe datos del artículo: editarlo invalida el ETag de la renta.
+	client.patch(f"/api/articulos/{art.id_articulo}", json={"titulo": "Editado"}, headers=auth_header(dueno.id_usuario))
+	r2 = client.get(url, headers={**h, "If-None-Match": etag})
+	assert r2.status_code == 200
+	assert r2.get_json()["data"]["articulo"]["titulo"] == "Editado"
+	etag = r2.headers["ETag"]
+
+	renta.estado_renta = "confirmada"
+	db_session.commit()
+	assert client.get(url, headers={**h, "If-None-Match": etag}).status_code == 200
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+
+def test_retencion_archiva_por_lotes_y_se_consulta_bajo_demanda(
+	app, client, db_session, make_user, auth_header, make_articulo
+):
+	from app.models.archivo import MensajeRentaArchivado, NotificacionArchivada
+	from app.models.mensaje_renta import MensajeRenta
+	from app.models.notificacion import Notificacion
+	from app.models.renta import Renta
+	from app.services import retencion_service
+
+	dueno = make_user("dueno_ret@test.com")
+	arr = make_user("arr_ret@test.com")
+	art = make_articulo(dueno.id_usuario)
+	viejo = datetime.utcnow() - timedelta(days=200)
+
+	renta = Renta(
+		id_articulo=art.id_articulo,
+		id_arrendatario=arr.id_usuario,
+		id_propietario=dueno.id_usuario,
+		fecha_inicio=viejo,
+		fecha_fin=viejo + timedelta(days=1),
+		precio_total_renta=100,
+		monto_deposito=50,
+		estado_renta="completada",
+		fecha_creacion=viejo,
+	)
+	db_session.add(renta)
+	db_session.flush()
+	for i in range(5):
+		db_session.add(
+			MensajeRenta(id_renta=renta.id, id_emisor=arr.id_usuario, mensaje=f"m{i}", created_at=viejo + timedelta(minutes=i))
+		)
+	for i in range(3):
+		db_session.add(Notificacion(id_usuario=arr.id_usuario, tipo="X", mensaje=f"n{i}", leida=True, created_at=viejo))
+	# No leída: se conserva aunque sea vieja
+	db_session.add(Notificacion(id_usuario=arr.id_usuario, tipo="X", mensaje="pendiente", leida=False, created_at=viejo))
+	db_session.commit()
+	# onupdate de fecha_actualizacion: forzar una renta cerrada hace tiempo
+	db_session.query(Renta).filter_by(id=renta.id).update({"fecha_actualizacion": viejo})
+	db_session.commit()
+
+	app.config["RETENCION_LOTE"] = 2
+	try:
+		assert retencion_service.archivar_chats_cerrados() == 5
+		assert retencion_service.archivar_notificaciones() == 3
+	finally:
+		app.config["RETENCION_LOTE"] = 500
+
+	assert MensajeRenta.query.filter_by(id_renta=renta.id).count() == 0
+	assert MensajeRentaArchivado.query.filter_by(id_renta=renta.id).count() == 5
+	assert Notificacion.query.filter_by(id_usuario=arr.id_usuario).count() == 1
+	assert NotificacionArchivada.query.filter_by(id_usuario=arr.id_usuario).count() == 3
+
+	r = client.get(f"/api/rentas/{renta.id}/chat/historial", headers=auth_header(arr.id_usuario))
+	assert r.status_code == 200
+	items = r.get_json()["data"]["items"]
+	assert [m["mensaje"] for m in items] == ["m0", "m1", "m2", "m3", "m4"]
+	assert all(m["archivado"] for m in items)
+	primero = MensajeRentaArchivado.query.filter_by(id_renta=renta.id).order_by(MensajeRentaArchivado.id).first()
+	assert items[0]["created_at"] == primero.created_at.isoformat()
+
+	r = client.get("/api/notificaciones/archivadas?limit=2", headers=auth_header(arr.id_usuario))
+	data = r.get_json()["data"]
+	assert len(data["items"]) == 2 and data["siguiente"] is not None
+	r = client.get(f"/api/notificaciones/archivadas?limit=2&antes_de={data['siguiente']}", headers=auth_header(arr.id_usuario))
+	assert len(r.get_json()["data"]["items"]) == 1
+
+	r = client.get(f"/api/rentas/{renta.id}/chat/historial", headers=auth_header(make_user("otro_ret@test.com").id_usuario))
+	assert r.status_code == 403
@@ -0,0 +1,132 @@
+"""Compresión de respuestas (gzip / brotli) negociada por Accept-Encoding.
+
+Se aplica en after_request a respuestas comprimibles (JSON, texto) de al
+menos COMPRESION_MIN_BYTES. Las respuestas en streaming se comprimen por
+chunks sin juntar el cuerpo. Se dejan tal cual:
+- respuestas que ya traen Content-Encoding, parciales (206), 304, 204;
+- archivos servidos con send_file (direct_passthrough), p. ej. /uploads;
+- respuestas con `Cache-Control: no-transform`.
+
+brotli es opcional: sin el paquete solo se ofrece gzip.
+"""
+
+import gzip
+import zlib
+
+from flask import request
+
+try:  # brotli es opcional
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+
+COMPRESION_MIN_BYTES_DEFAULT = 1024
+COMPRESION_NIVEL_GZIP_DEFAULT = 6
+COMPRESION_NIVEL_BR_DEFAULT = 5
+
+MIMETYPES_COMPRIMIBLES = frozenset(
+    {
+        "application/json",
+        "application/javascript",
+        "application/xml",
+        "image/svg+xml",
+    }
+)
+PREFIJOS_EXCLUIDOS = ("/uploads/",)
+
+
+def _config_int(app, key: str, default: int, minimo: int = 0, maximo: int | None = None) -> int:
+    try:
+        v = max(minimo, int(app.config.get(key, default)))
+        return v if maximo is None else min(maximo, v)
+    except Exception:
+        return default
+
+
+def _elegir_encoding() -> str | None:
+    aceptadas = request.accept_encodings
+    candidatas = []
+    if brotli is not None and aceptadas["br"]:
+        candidatas.append((aceptadas["br"], 1, "br"))
+    if aceptadas["gzip"]:
+        candidatas.append((aceptadas["gzip"], 0, "gzip"))
+    if not candidatas:
+        return None
+    # Mayor q; a igual q, brotli.
+    return max(candidatas)[2]
+
+
+def _comprimible(response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return False
+    if response.cache_control.no_transform:
+        return False
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in MIMETYPES_COMPRIMIBLES
+
+
+def _comprimir(datos: bytes, encoding: str, nivel: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(datos, quality=nivel)
+    return gzip.compress(datos, compresslevel=nivel, mtime=0)
+
+
+def _comprimir_stream(chunks, encoding: str, nivel: int):
+    if encoding == "br":
+        c = brotli.Compressor(quality=nivel)
+        for chunk in chunks:
+            salida = c.process(chunk)
+            if salida:
+                yield salida
+        yield c.finish()
+    else:
+        c = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            salida = c.compress(chunk)
+            if salida:
+                yield salida
+        yield c.flush()
+
+
+def _ajustar_etag(response, encoding: str) -> None:
+    # Un ETag fuerte identifica bytes exactos: la versión comprimida lleva otro.
+    etag, debil = response.get_etag()
+    if etag and not debil:
+        response.set_etag(f"{etag}-{encoding}")
+
+
+def init_compresion(app) -> None:
+    if not app.config.get("COMPRESION_HABILITADA", True):
+        return
+
+    @app.after_request
+    def _comprimir_respuesta(response):
+        if request.path.startswith(PREFIJOS_EXCLUIDOS) or not _comprimible(response):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = _elegir_encoding()
+        if encoding is None:
+            return response
+
+        nivel = (
+            _config_int(app, "COMPRESION_NIVEL_BR", COMPRESION_NIVEL_BR_DEFAULT, maximo=11)
+            if encoding == "br"
+            else _config_int(app, "COMPRESION_NIVEL_GZIP", COMPRESION_NIVEL_GZIP_DEFAULT, minimo=1, maximo=9)
+        )
+
+        if response.is_streamed:
+            response.response = _comprimir_stream(response.iter_encoded(), encoding, nivel)
+            response.headers.pop("Content-Length", None)
+        else:
+            datos = response.get_data()
+            if len(datos) < _config_int(app, "COMPRESION_MIN_BYTES", COMPRESION_MIN_BYTES_DEFAULT):
+                return response
+            response.set_data(_comprimir(datos, encoding, nivel))
+
+        response.headers["Content-Encoding"] = encoding
+        _ajustar_etag(response, encoding)
+        return response
@@ -0,0 +1,50 @@
+"""ETag débil + GET condicional a partir de sellos de versión.
+
+`etag_condicional(version_fn)` llama a `version_fn(**view_args)` antes de la
+vista. Con el sello (p. ej. `actualizado_en`, `fecha_actualizacion` o
+max(updated_at) de una lista) se arma el ETag sin serializar el cuerpo; si
+coincide con If-None-Match se responde 304 sin ejecutar la vista.
+
+`version_fn` devuelve None cuando no hay que cachear (recurso inexistente,
+sin permiso, estado que cambia al leerse): entonces se ejecuta la vista
+normal, que decide el 404/403.
+"""
+
+import hashlib
+from functools import wraps
+
+from flask import make_response, request
+
+
+def etag_de(endpoint: str, version) -> str:
+    return hashlib.sha1(f"{endpoint}:{version!r}".encode("utf-8")).hexdigest()[:20]
+
+
+def etag_condicional(version_fn, privado: bool = False):
+    """Decorador de vistas GET. `privado` marca Cache-Control private (datos por usuario)."""
+
+    def deco(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_fn(**kwargs)
+            if version is None:
+                return view(*args, **kwargs)
+
+            etag = etag_de(request.endpoint, version)
+            if request.if_none_match.contains_weak(etag):
+                resp = make_response("", 304)
+            else:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+
+            resp.set_etag(etag, weak=True)
+            # Se puede guardar, pero siempre se revalida con el ETag.
+            resp.cache_control.no_cache = True
+            if privado:
+                resp.cache_control.private = True
+            return resp
+
+        return wrapper
+
+    return deco
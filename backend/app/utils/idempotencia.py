@@ -0,0 +1,189 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+
+from app.extensions.db import db
+from app.models.clave_idempotencia import ClaveIdempotencia
+from app.utils.errors import ApiError
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL_HOURS_DEFAULT = 24
+# Más que el timeout del worker (SERVE_TIMEOUT): pasado esto, la petición original murió.
+IDEMPOTENCY_EN_CURSO_SEGUNDOS_DEFAULT = 60
+IDEMPOTENCY_KEY_MAX_LEN = 120
+
+
+def _get_ttl() -> timedelta:
+    try:
+        v = int(current_app.config.get("IDEMPOTENCY_TTL_HOURS", IDEMPOTENCY_TTL_HOURS_DEFAULT))
+        return timedelta(hours=max(1, v))
+    except Exception:
+        return timedelta(hours=IDEMPOTENCY_TTL_HOURS_DEFAULT)
+
+
+def _get_en_curso() -> timedelta:
+    try:
+        v = int(current_app.config.get("IDEMPOTENCY_EN_CURSO_SEGUNDOS", IDEMPOTENCY_EN_CURSO_SEGUNDOS_DEFAULT))
+        return timedelta(seconds=max(1, v))
+    except Exception:
+        return timedelta(seconds=IDEMPOTENCY_EN_CURSO_SEGUNDOS_DEFAULT)
+
+
+def _tomar_clave_abandonada(previo: ClaveIdempotencia, now: datetime) -> ClaveIdempotencia | None:
+    """Reclama una clave 'en curso' cuyo worker murió (timeout, kill) sin liberarla.
+
+    UPDATE condicionado al created_at leído: si dos reintentos llegan a la vez,
+    solo uno la toma.
+    """
+
+    tomadas = (
+        ClaveIdempotencia.query.filter_by(id=previo.id, created_at=previo.created_at)
+        .filter(ClaveIdempotencia.status_code.is_(None))
+        .update(
+            {"created_at": now, "expires_at": now + _get_ttl()},
+            synchronize_session=False,
+        )
+    )
+    db.session.commit()
+    if not tomadas:
+        return None
+    return db.session.get(ClaveIdempotencia, previo.id, populate_existing=True)
+
+
+def _hash_request() -> str:
+    h = hashlib.sha256()
+    h.update(request.method.encode("utf-8"))
+    h.update(b"\n")
+    h.update(request.full_path.encode("utf-8"))
+    h.update(b"\n")
+    h.update(request.get_data(cache=True) or b"")
+    return h.hexdigest()
+
+
+def _replay(registro: ClaveIdempotencia) -> Response:
+    resp = Response(
+        registro.response_json or "",
+        status=int(registro.status_code),
+        mimetype="application/json",
+    )
+    resp.headers["Idempotent-Replayed"] = "true"
+    return resp
+
+
+def _reservar_clave(id_usuario: int, clave: str, req_hash: str) -> ClaveIdempotencia | Response:
+    """Devuelve la respuesta guardada (replay) o un registro nuevo 'en curso'."""
+
+    now = datetime.utcnow()
+    previo = ClaveIdempotencia.query.filter_by(id_usuario=id_usuario, clave=clave).first()
+    if previo is not None:
+        if previo.expires_at <= now:
+            db.session.delete(previo)
+            db.session.commit()
+        else:
+            if previo.request_hash != req_hash:
+                raise ApiError(
+                    "Idempotency-Key ya se usó con una petición distinta.",
+                    status_code=422,
+                    payload={"code": "IDEMPOTENCY_KEY_REUSED"},
+                )
+            if previo.status_code is None:
+                if previo.created_at <= now - _get_en_curso():
+                    tomado = _tomar_clave_abandonada(previo, now)
+                    if tomado is not None:
+                        return tomado
+                raise ApiError(
+                    "La petición original sigue en curso. Intenta de nuevo en unos segundos.",
+                    status_code=409,
+                    payload={"code": "IDEMPOTENCY_IN_PROGRESS"},
+                )
+            return _replay(previo)
+
+    registro = ClaveIdempotencia(
+        id_usuario=id_usuario,
+        clave=clave,
+        endpoint=(request.endpoint or "")[:120],
+        request_hash=req_hash,
+        created_at=now,
+        expires_at=now + _get_ttl(),
+    )
+    try:
+        db.session.add(registro)
+        db.session.commit()
+    except IntegrityError:
+        # Carrera con un reintento simultáneo: el otro ganó la clave.
+        db.session.rollback()
+        raise ApiError(
+            "La petición original sigue en curso. Intenta de nuevo en unos segundos.",
+            status_code=409,
+            payload={"code": "IDEMPOTENCY_IN_PROGRESS"},
+        )
+    return registro
+
+
+def _liberar_clave(id_registro: int) -> None:
+    try:
+        db.session.rollback()
+        ClaveIdempotencia.query.filter_by(id=id_registro).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
+def idempotente(view):
+    """Soporte genérico de header Idempotency-Key para endpoints mutantes.
+
+    Debe ir debajo de @jwt_required(): la clave es por usuario. Sin header, la
+    vista se ejecuta normal. Con header, se guarda (usuario, clave, hash de la
+    petición) -> respuesta 2xx durante IDEMPOTENCY_TTL_HOURS; los reintentos
+    devuelven la respuesta guardada con una sola búsqueda indexada, sin tocar
+    las tablas de negocio. Si la vista falla, la clave se libera; si el worker
+    muere sin liberarla, un reintento la retoma tras IDEMPOTENCY_EN_CURSO_SEGUNDOS.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        clave = (request.headers.get(IDEMPOTENCY_HEADER) or "").strip()
+        if not clave:
+            return view(*args, **kwargs)
+        if len(clave) > IDEMPOTENCY_KEY_MAX_LEN:
+            raise ApiError("Idempotency-Key demasiado larga.", status_code=400)
+
+        try:
+            id_usuario = int(get_jwt_identity())
+        except (TypeError, ValueError):
+            raise ApiError("Token inválido", 401)
+
+        try:
+            reservado = _reservar_clave(id_usuario, clave, _hash_request())
+        except (OperationalError, ProgrammingError):
+            # Compat: sin la tabla (faltan migraciones) no rompemos el endpoint.
+            db.session.rollback()
+            return view(*args, **kwargs)
+
+        if isinstance(reservado, Response):
+            return reservado
+
+        id_registro = reservado.id
+        try:
+            resp = make_response(view(*args, **kwargs))
+        except Exception:
+            _liberar_clave(id_registro)
+            raise
+
+        if not (200 <= resp.status_code < 300) or not resp.is_json:
+            _liberar_clave(id_registro)
+            return resp
+
+        registro = db.session.get(ClaveIdempotencia, id_registro)
+        if registro is not None:
+            registro.status_code = resp.status_code
+            registro.response_json = resp.get_data(as_text=True)
+            db.session.commit()
+        return resp
+
+    return wrapper
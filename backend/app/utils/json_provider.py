@@ -0,0 +1,91 @@
+"""Proveedor JSON de la app: orjson si está instalado, stdlib si no.
+
+Ambos serializan igual los tipos que devuelven los servicios, así que no hace
+falta convertir a mano antes de responder:
+- datetime / date / time -> ISO 8601 (igual que `.isoformat()`)
+- Decimal -> float (igual que `float()`)
+
+JSON_PROVIDER = "stdlib" fuerza el proveedor de la librería estándar.
+"""
+
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:  # orjson es opcional
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def _default(o):
+    """Tipos que ni stdlib ni orjson serializan por sí solos."""
+
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """El de Flask, pero con fechas en ISO 8601 (no RFC 822) y orden de llaves de config."""
+
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.sort_keys = bool(app.config.get("JSON_SORT_KEYS", False))
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """Serializa con orjson; las respuestas se arman directo en bytes."""
+
+    def _opciones(self) -> int:
+        opts = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            opts |= orjson.OPT_INDENT_2
+        return opts
+
+    def _dumps_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self._opciones())
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs.keys() - {"default", "sort_keys", "ensure_ascii", "indent", "separators"}:
+            # Argumentos propios de json.dumps (cls, allow_nan, ...): stdlib.
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._dumps_bytes(obj)
+        if self._opciones() & orjson.OPT_INDENT_2:
+            body += b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def proveedor_para(app):
+    """Clase de proveedor a usar según config y dependencias instaladas."""
+
+    preferido = str(app.config.get("JSON_PROVIDER") or "auto").strip().lower()
+    if preferido != "stdlib" and orjson is not None:
+        return OrjsonProvider
+    return StdlibJSONProvider
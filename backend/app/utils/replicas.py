@@ -0,0 +1,141 @@
+"""Ruteo de lecturas a réplicas con read-your-writes por cliente.
+
+- Réplicas: DATABASE_REPLICA_URLS (separadas por coma) se convierten en binds
+  "replica_<n>" (config._resolve_replica_binds). Sin réplicas todo va a la
+  primaria y este módulo no hace nada.
+- Solo se rutean vistas GET marcadas con @solo_lectura: dentro de ellas los
+  SELECT sin FOR UPDATE van a una réplica elegida por request (SesionEnrutada
+  en extensions/db). Escrituras, SQL de texto, jobs y CLI usan la primaria.
+- Si el request escribe (flush), el resto del request lee de la primaria.
+- Read-your-writes: tras una escritura, el cliente lee de la primaria durante
+  DB_REPLICAS_STICKY_SECONDS. La ventana viaja con el cliente, no en memoria
+  del worker: la respuesta lleva un token firmado con el instante "primaria
+  hasta" en la cabecera X-Primaria-Hasta y en una cookie. Cualquier worker lo
+  valida en @solo_lectura, venga en la cabecera (el frontend la reenvía; la
+  cookie no viaja en llamadas cross-origin) o en la cookie.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+PREFIJO_BIND = "replica_"
+DB_REPLICAS_STICKY_SECONDS_DEFAULT = 5
+
+CABECERA_PRIMARIA = "X-Primaria-Hasta"
+COOKIE_PRIMARIA = "primaria_hasta"
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def claves_replicas(app=None) -> list[str]:
+    app = app or current_app
+    binds = app.config.get("SQLALCHEMY_BINDS") or {}
+    return sorted(k for k in binds if str(k).startswith(PREFIJO_BIND))
+
+
+def _firmador() -> URLSafeSerializer:
+    secreto = current_app.config.get("JWT_SECRET_KEY") or current_app.secret_key
+    return URLSafeSerializer(secreto, salt="db-replicas-primaria")
+
+
+def token_primaria(hasta: float) -> str:
+    """Token firmado con el instante (epoch) hasta el que el cliente lee de la primaria."""
+
+    return _firmador().dumps(round(hasta, 3))
+
+
+def primaria_hasta() -> float:
+    """Instante "primaria hasta" que trae el request (0 si no trae token válido)."""
+
+    token = request.headers.get(CABECERA_PRIMARIA) or request.cookies.get(COOKIE_PRIMARIA)
+    if not token:
+        return 0.0
+    try:
+        return float(_firmador().loads(token))
+    except (BadSignature, TypeError, ValueError):
+        return 0.0
+
+
+def escribio_recientemente() -> bool:
+    # Reloj de pared: la ventana se compara en otros workers y hosts.
+    return primaria_hasta() > time.time()
+
+
+def replica_actual() -> str | None:
+    """Bind de réplica asignado al request en curso (None = primaria)."""
+
+    if not has_request_context():
+        return None
+    return g.get("db_replica")
+
+
+@contextmanager
+def primaria():
+    """Fuerza la primaria dentro del bloque (p. ej. releer una fila antes de modificarla)."""
+
+    if not has_request_context():
+        yield
+        return
+    previa = g.pop("db_replica", None)
+    try:
+        yield
+    finally:
+        if previa is not None and not g.get("db_escribio"):
+            g.db_replica = previa
+
+
+def solo_lectura(view):
+    """Marca una vista GET para leer de réplica (salvo ventana read-your-writes del cliente)."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method in ("GET", "HEAD"):
+            claves = claves_replicas()
+            if claves and not escribio_recientemente():
+                g.db_replica = random.choice(claves)
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+@event.listens_for(Session, "after_flush")
+def _fijar_primaria(session, flush_context):
+    if has_request_context():
+        g.db_replica = None
+        g.db_escribio = True
+
+
+def init_replicas(app) -> None:
+    if not claves_replicas(app):
+        return
+
+    @app.after_request
+    def _read_your_writes(response):
+        ventana = _get_config_int("DB_REPLICAS_STICKY_SECONDS", DB_REPLICAS_STICKY_SECONDS_DEFAULT)
+        if not g.get("db_escribio") or not ventana:
+            return response
+        token = token_primaria(time.time() + ventana)
+        response.headers[CABECERA_PRIMARIA] = token
+        response.set_cookie(
+            COOKIE_PRIMARIA,
+            token,
+            max_age=ventana,
+            httponly=True,
+            secure=request.is_secure,
+            samesite="Lax",
+        )
+        return response
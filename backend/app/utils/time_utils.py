@@ -0,0 +1,14 @@
+"""Utilidades de fechas.
+
+En BD y en el resto del backend las fechas son naive en UTC (datetime.utcnow()).
+"""
+
+from datetime import datetime, timezone
+
+
+def a_utc_naive(dt: datetime) -> datetime:
+    """Convierte un datetime con zona a UTC naive; los naive se devuelven tal cual."""
+
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,106 @@
+"""Servido de /uploads/articulos/ con cabeceras de cache.
+
+- Archivos direccionados por contenido (ab/cd/<sha256>[.variante].<ext>): el
+  nombre cambia si cambian los bytes, así que van con
+  `Cache-Control: public, max-age=1 año, immutable` y ETag fuerte = hash.
+- Archivos legados (nombre uuid): max-age corto (UPLOADS_CACHE_SECONDS) y el
+  ETag por mtime/tamaño de werkzeug.
+- Range / If-None-Match / If-Range los resuelve send_file (conditional=True).
+- Si existe `<archivo>.br` o `<archivo>.gz` y el cliente lo acepta, se manda
+  esa versión precomprimida con Content-Encoding.
+- UPLOADS_SENDFILE_MODO = "x-accel" | "x-sendfile": la app solo responde
+  cabeceras y el proxy del frente (nginx / Apache) entrega los bytes, sin
+  ocupar un worker de Python durante la descarga.
+"""
+
+import mimetypes
+import os
+import re
+
+from flask import Response, abort, current_app, request, send_file
+from werkzeug.security import safe_join
+
+
+UPLOADS_CACHE_SECONDS_DEFAULT = 3600
+UPLOADS_ACCEL_PREFIX_DEFAULT = "/_uploads_internos/articulos/"
+CACHE_INMUTABLE_SECONDS = 365 * 24 * 3600
+
+_RE_DIRECCIONADO = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(\.[a-z]+)?\.(jpg|png|webp)$")
+
+# Orden de preferencia de las versiones precomprimidas.
+_PRECOMPRIMIDOS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _get_config_int(key: str, default: int, minimo: int = 0) -> int:
+    try:
+        v = int(current_app.config.get(key, default))
+        return max(minimo, v)
+    except Exception:
+        return default
+
+
+def etag_direccionado(filename: str) -> str | None:
+    """ETag fuerte (hash + variante) si el archivo es direccionado por contenido."""
+
+    m = _RE_DIRECCIONADO.match(filename)
+    if not m:
+        return None
+    return m.group(1) + (m.group(2) or "")
+
+
+def _precomprimido(ruta: str) -> tuple[str, str] | tuple[None, None]:
+    aceptadas = request.accept_encodings
+    for encoding, sufijo in _PRECOMPRIMIDOS:
+        if aceptadas[encoding] and os.path.isfile(ruta + sufijo):
+            return ruta + sufijo, encoding
+    return None, None
+
+
+def _respuesta_proxy(modo: str, filename: str, ruta: str, mimetype: str) -> Response:
+    resp = Response(status=200, mimetype=mimetype)
+    if modo == "x-accel":
+        prefijo = current_app.config.get("UPLOADS_ACCEL_PREFIX") or UPLOADS_ACCEL_PREFIX_DEFAULT
+        resp.headers["X-Accel-Redirect"] = prefijo.rstrip("/") + "/" + filename
+    else:
+        resp.headers["X-Sendfile"] = ruta
+    return resp
+
+
+def servir_upload(directorio: str, filename: str) -> Response:
+    ruta = safe_join(directorio, filename)
+    if ruta is None or not os.path.isfile(ruta):
+        abort(404)
+
+    etag = etag_direccionado(filename)
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    modo = str(current_app.config.get("UPLOADS_SENDFILE_MODO") or "").strip().lower()
+    if modo in ("x-accel", "x-sendfile"):
+        # El proxy resuelve Range y precomprimidos; aquí solo validadores y cache.
+        resp = _respuesta_proxy(modo, filename, ruta, mimetype)
+        if etag:
+            resp.set_etag(etag)
+        resp = resp.make_conditional(request)
+    else:
+        ruta_envio, encoding = _precomprimido(ruta)
+        if encoding:
+            resp = send_file(
+                ruta_envio,
+                mimetype=mimetype,
+                etag=f"{etag}-{encoding}" if etag else True,
+                conditional=True,
+            )
+            resp.headers["Content-Encoding"] = encoding
+        else:
+            resp = send_file(ruta, mimetype=mimetype, etag=etag or True, conditional=True)
+        resp.vary.add("Accept-Encoding")
+
+    resp.cache_control.public = True
+    if etag:
+        resp.cache_control.max_age = CACHE_INMUTABLE_SECONDS
+        resp.cache_control.immutable = True
+    else:
+        resp.cache_control.max_age = _get_config_int(
+            "UPLOADS_CACHE_SECONDS", UPLOADS_CACHE_SECONDS_DEFAULT, minimo=0
+        )
+    return resp
@@ -0,0 +1,149 @@
+"""Costo de serializar payloads típicos: stdlib vs orjson.
+
+Uso (desde backend/):
+    python -m benchmarks.json_payloads [--items 50] [--repeticiones 200]
+
+Arma respuestas con la forma del inbox de rentas (`_renta_to_dict`, ~50
+llaves con fechas y Decimal) y del listado de artículos, y mide
+`app.json.response(...)` con cada proveedor.
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+
+from app.utils.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+
+
+def _renta(i: int) -> dict:
+    t0 = datetime(2026, 1, 1, 10) + timedelta(days=i)
+    return {
+        "id": i,
+        "id_renta": i,
+        "id_articulo": 1000 + i,
+        "id_arrendatario": 20 + i % 7,
+        "id_propietario": 40 + i % 5,
+        "fecha_inicio": t0,
+        "fecha_fin": t0 + timedelta(days=2),
+        "modalidad": "dias",
+        "cantidad_unidades": 2,
+        "precio_total_renta": 250.0,
+        "monto_deposito": 500.0,
+        "subtotal_renta": 250.0,
+        "total_a_pagar": 750.0,
+        "estado_renta": "confirmada",
+        "entregado": False,
+        "devuelto": False,
+        "deposito_liberado": False,
+        "fecha_entrega": None,
+        "fecha_devolucion": None,
+        "fecha_liberacion_deposito": None,
+        "notas_entrega": None,
+        "notas_devolucion": None,
+        "modo_entrega": "arrendador",
+        "zona_publica": "Metro Insurgentes, salida norte",
+        "entrega_modo": "domicilio",
+        "punto_entrega": None,
+        "direccion_entrega_visible": True,
+        "direccion_entrega": "Av. Siempre Viva 742, Col. Centro",
+        "ventanas_entrega_propuestas": ["2026-01-01 09:00-11:00", "2026-01-01 17:00-19:00"],
+        "ventana_entrega_elegida": "2026-01-01 09:00-11:00",
+        "ventanas_devolucion_propuestas": [],
+        "ventana_devolucion_elegida": None,
+        "coordinacion_confirmada": True,
+        "codigo_entrega": "483920",
+        "codigo_devolucion": "109384",
+        "checklist_entrega": None,
+        "checklist_devolucion": None,
+        "chat_habilitado": True,
+        "reembolso_simulado": False,
+        "monto_reembolso": 0.0,
+        "incidente": None,
+        "fecha_creacion": t0 - timedelta(days=3, minutes=17),
+        "chat_unread_count": i % 4,
+        "articulo": {
+            "id": 1000 + i,
+            "id_articulo": 1000 + i,
+            "titulo": f"Taladro percutor {i}",
+            "precio_base": 125.0,
+            "precio_renta_dia": Decimal("125.00"),
+            "precio_renta_hora": Decimal("20.00"),
+            "precio_renta_semana": None,
+            "unidad_precio": "por_dia",
+            "monto_deposito": 500.0,
+            "deposito_garantia": 500.0,
+            "ubicacion_texto": "Coyoacán, CDMX",
+        },
+    }
+
+
+def _articulo(i: int) -> dict:
+    return {
+        "id": i,
+        "titulo": f"Bicicleta de montaña rodada 29 #{i}",
+        "precio_base": 180.0,
+        "unidad_precio": "por_dia",
+        "precio_renta_dia": 180.0,
+        "precio_renta_hora": None,
+        "precio_renta_semana": 900.0,
+        "tarifa_por_dia": 180.0,
+        "tarifa_por_hora": None,
+        "tarifa_por_semana": 900.0,
+        "deposito_garantia": 1500.0,
+        "propietario_nombre": "Ana López",
+        "propietario_correo": "ana@example.com",
+        "imagen_principal_url": f"https://api.example.com/uploads/articulos/ab/cd/{i:064x}.thumb.webp",
+        "estado_publicacion": "publicado",
+        "rating_promedio": Decimal("4.75"),
+        "total_resenas": 12,
+        "id_categoria": 3,
+        "fecha_publicacion": datetime(2025, 11, 3, 12, 0) + timedelta(hours=i),
+    }
+
+
+def _medir(app, provider, payload, repeticiones: int) -> tuple[float, int]:
+    app.json = provider
+    tiempos = []
+    with app.test_request_context():
+        tamano = len(app.json.response(payload).get_data())
+        for _ in range(repeticiones):
+            t0 = time.perf_counter()
+            app.json.response(payload)
+            tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos) * 1e6, tamano
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["JSON_SORT_KEYS"] = False
+    proveedores = [("stdlib", StdlibJSONProvider(app))]
+    if orjson is not None:
+        proveedores.append(("orjson", OrjsonProvider(app)))
+    else:
+        print("orjson no está instalado: solo se mide stdlib.")
+
+    payloads = {
+        "inbox rentas": {"success": True, "data": {"items": [_renta(i) for i in range(args.items)]}},
+        "listado articulos": {"success": True, "data": [_articulo(i) for i in range(args.items)]},
+    }
+
+    print(f"{'payload':<20} {'proveedor':<10} {'mediana (µs)':>14} {'bytes':>9}")
+    for nombre, payload in payloads.items():
+        base = None
+        for pnombre, provider in proveedores:
+            us, tamano = _medir(app, provider, payload, args.repeticiones)
+            base = base or us
+            print(f"{nombre:<20} {pnombre:<10} {us:>14.1f} {tamano:>9}  x{base / us:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Throughput de `python -m app.serve` por modelo de worker (sync / gthread / gevent).
+
+Uso (desde backend/):
+    python -m benchmarks.servidores [--modos sync,gthread,gevent] [--workers 2]
+        [--clientes 32] [--segundos 10] [--ruta /api/health]
+
+Levanta cada modo en un puerto local, lo calienta y lo carga con `--clientes`
+conexiones keep-alive concurrentes durante `--segundos`. Reporta requests/s,
+latencias p50/p99 y errores. Usa la BD del entorno (DATABASE_URL, ...): con
+rutas que consultan la BD (p. ej. /api/articulos) se ve el efecto del perfil
+de pool de cada modo. Los modos cuyo worker no está instalado se omiten.
+"""
+
+import argparse
+import http.client
+import importlib.util
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar_listo(puerto: int, ruta: str, limite: float = 30.0) -> bool:
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", puerto, timeout=2)
+            conn.request("GET", ruta)
+            conn.getresponse().read()
+            conn.close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def _cliente(puerto: int, ruta: str, hasta: float, latencias: list, errores: list) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", puerto, timeout=10)
+    propias = []
+    fallos = 0
+    while time.monotonic() < hasta:
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", ruta, headers={"Accept-Encoding": "gzip"})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 500:
+                fallos += 1
+                continue
+            propias.append(time.perf_counter() - t0)
+        except (OSError, http.client.HTTPException):
+            fallos += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", puerto, timeout=10)
+    conn.close()
+    latencias.extend(propias)
+    errores.append(fallos)
+
+
+def _cargar(puerto: int, ruta: str, clientes: int, segundos: float) -> dict:
+    latencias: list[float] = []
+    errores: list[int] = []
+    hasta = time.monotonic() + segundos
+    hilos = [
+        threading.Thread(target=_cliente, args=(puerto, ruta, hasta, latencias, errores))
+        for _ in range(clientes)
+    ]
+    t0 = time.monotonic()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    duracion = time.monotonic() - t0
+
+    latencias.sort()
+    return {
+        "rps": len(latencias) / duracion,
+        "p50_ms": statistics.median(latencias) * 1000 if latencias else 0.0,
+        "p99_ms": latencias[int(len(latencias) * 0.99) - 1] * 1000 if latencias else 0.0,
+        "errores": sum(errores),
+    }
+
+
+def _medir_modo(modo: str, args) -> dict | None:
+    puerto = _puerto_libre()
+    comando = [
+        sys.executable, "-m", "app.serve",
+        "--modo", modo,
+        "--workers", str(args.workers),
+        "--bind", f"127.0.0.1:{puerto}",
+    ]
+    env = {**os.environ, "SERVE_MAX_REQUESTS": "0"}  # sin reciclar durante la medición
+    proc = subprocess.Popen(
+        comando, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    try:
+        if not _esperar_listo(puerto, args.ruta):
+            print(f"{modo}: el servidor no respondió a tiempo.")
+            return None
+        _cargar(puerto, args.ruta, args.clientes, min(2.0, args.segundos))  # calentamiento
+        return _cargar(puerto, args.ruta, args.clientes, args.segundos)
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--modos", default="sync,gthread,gevent")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--clientes", type=int, default=32)
+    parser.add_argument("--segundos", type=float, default=10.0)
+    parser.add_argument("--ruta", default="/api/health")
+    args = parser.parse_args()
+
+    print(f"ruta={args.ruta} workers={args.workers} clientes={args.clientes} segundos={args.segundos:g}")
+    print(f"{'modo':<10} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'errores':>8}")
+    base = None
+    for modo in [m.strip() for m in args.modos.split(",") if m.strip()]:
+        if modo == "gevent" and importlib.util.find_spec("gevent") is None:
+            print(f"{modo:<10} (omitido: gevent no está instalado)")
+            continue
+        r = _medir_modo(modo, args)
+        if r is None:
+            continue
+        base = base or r["rps"]
+        print(
+            f"{modo:<10} {r['rps']:>10.0f} {r['p50_ms']:>10.2f} {r['p99_ms']:>10.2f} {r['errores']:>8}"
+            f"  x{r['rps'] / base:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
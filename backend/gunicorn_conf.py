@@ -0,0 +1,22 @@
+"""Hooks de gunicorn para `python -m app.serve`.
+
+No importa la app a nivel de módulo: en modo gevent el maestro carga este
+archivo antes del monkey patching de los workers.
+"""
+
+import sys
+
+
+def post_fork(server, worker):
+    # Con --preload la app y sus pools se crearon en el maestro (la precarga de
+    # datos de referencia ya abrió conexiones). Cada worker descarta las
+    # heredadas sin cerrarlas: el socket lo comparten los demás procesos.
+    wsgi = sys.modules.get("wsgi")
+    if wsgi is None:
+        return
+
+    from app.extensions import db
+
+    with wsgi.app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,53 @@
+"""add claves_idempotencia
+
+Revision ID: 20251218_0008
+Revises: 20251217_0007
+Create Date: 2025-12-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251218_0008"
+down_revision = "20251217_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if "claves_idempotencia" not in tables:
+        op.create_table(
+            "claves_idempotencia",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("id_usuario", sa.Integer(), nullable=False),
+            sa.Column("clave", sa.String(length=120), nullable=False),
+            sa.Column("endpoint", sa.String(length=120), nullable=False),
+            sa.Column("request_hash", sa.String(length=64), nullable=False),
+            sa.Column("status_code", sa.Integer(), nullable=True),
+            sa.Column("response_json", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["id_usuario"], ["usuarios.id_usuario"], ondelete="CASCADE"),
+            sa.UniqueConstraint("id_usuario", "clave", name="uq_claves_idempotencia_usuario_clave"),
+        )
+        op.create_index("ix_claves_idempotencia_expires_at", "claves_idempotencia", ["expires_at"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if "claves_idempotencia" in tables:
+        try:
+            op.drop_index("ix_claves_idempotencia_expires_at", table_name="claves_idempotencia")
+        except Exception:
+            pass
+        op.drop_table("claves_idempotencia")
@@ -0,0 +1,56 @@
+"""add indices compuestos para traslapes / disponibilidad
+
+Revision ID: 20251218_0009
+Revises: 20251218_0008
+Create Date: 2025-12-18
+
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision = "20251218_0009"
+down_revision = "20251218_0008"
+branch_labels = None
+depends_on = None
+
+
+_INDICES = (
+    ("rentas", "ix_rentas_articulo_estado_fechas", ["id_articulo", "estado_renta", "fecha_inicio", "fecha_fin"]),
+    (
+        "disponibilidad_articulo",
+        "ix_disponibilidad_articulo_bloqueo",
+        ["id_articulo", "disponible", "fecha_inicio", "fecha_fin"],
+    ),
+)
+
+
+def _has_index(insp, table: str, name: str) -> bool:
+    try:
+        return any(ix.get("name") == name for ix in insp.get_indexes(table))
+    except Exception:
+        return False
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    for table, name, cols in _INDICES:
+        if table in tables and not _has_index(insp, table, name):
+            op.create_index(name, table, cols, unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    for table, name, _cols in _INDICES:
+        if table in tables and _has_index(insp, table, name):
+            try:
+                op.drop_index(name, table_name=table)
+            except Exception:
+                pass
@@ -0,0 +1,58 @@
+"""tarifas por hora/dia/semana opcionales (precio_por_dia nullable)
+
+Revision ID: 20251219_0010
+Revises: 20251218_0009
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251219_0010"
+down_revision = "20251218_0009"
+branch_labels = None
+depends_on = None
+
+
+def _column(insp, table: str, col: str) -> dict | None:
+    try:
+        cols = insp.get_columns(table)
+    except Exception:
+        return None
+    return next((c for c in cols if c.get("name") == col), None)
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    col = _column(insp, "articulos", "precio_por_dia")
+    if col is not None and not col.get("nullable", True):
+        # Artículos solo por hora: sin tarifa diaria.
+        with op.batch_alter_table("articulos") as batch:
+            batch.alter_column(
+                "precio_por_dia",
+                existing_type=sa.Numeric(10, 2),
+                nullable=True,
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    col = _column(insp, "articulos", "precio_por_dia")
+    if col is not None and col.get("nullable", False):
+        op.execute(
+            "UPDATE articulos SET precio_por_dia = COALESCE(precio_por_hora * 24, precio_por_semana / 7, 0) "
+            "WHERE precio_por_dia IS NULL"
+        )
+        with op.batch_alter_table("articulos") as batch:
+            batch.alter_column(
+                "precio_por_dia",
+                existing_type=sa.Numeric(10, 2),
+                nullable=False,
+            )
@@ -0,0 +1,68 @@
+"""add bloqueos_tareas y ejecuciones_tareas (scheduler de mantenimiento)
+
+Revision ID: 20251219_0011
+Revises: 20251219_0010
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251219_0011"
+down_revision = "20251219_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if "bloqueos_tareas" not in tables:
+        op.create_table(
+            "bloqueos_tareas",
+            sa.Column("nombre", sa.String(length=120), primary_key=True),
+            sa.Column("owner", sa.String(length=160), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        )
+
+    if "ejecuciones_tareas" not in tables:
+        op.create_table(
+            "ejecuciones_tareas",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("nombre", sa.String(length=120), nullable=False),
+            sa.Column("owner", sa.String(length=160), nullable=True),
+            sa.Column("estado", sa.String(length=20), nullable=False, server_default="en_curso"),
+            sa.Column("resultado", sa.Text(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("inicio", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+            sa.Column("fin", sa.DateTime(), nullable=True),
+            sa.Column("duracion_ms", sa.Integer(), nullable=True),
+        )
+        op.create_index(
+            "ix_ejecuciones_tareas_nombre_inicio",
+            "ejecuciones_tareas",
+            ["nombre", "inicio"],
+            unique=False,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if "ejecuciones_tareas" in tables:
+        try:
+            op.drop_index("ix_ejecuciones_tareas_nombre_inicio", table_name="ejecuciones_tareas")
+        except Exception:
+            pass
+        op.drop_table("ejecuciones_tareas")
+
+    if "bloqueos_tareas" in tables:
+        op.drop_table("bloqueos_tareas")
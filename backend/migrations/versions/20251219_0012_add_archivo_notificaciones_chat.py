@@ -0,0 +1,79 @@
+"""add notificaciones_archivo y mensajes_renta_archivo (retención)
+
+Revision ID: 20251219_0012
+Revises: 20251219_0011
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251219_0012"
+down_revision = "20251219_0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if "notificaciones_archivo" not in tables:
+        op.create_table(
+            "notificaciones_archivo",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("id_usuario", sa.Integer(), nullable=False),
+            sa.Column("tipo", sa.String(length=60), nullable=False),
+            sa.Column("mensaje", sa.String(length=300), nullable=False),
+            sa.Column("leida", sa.Boolean(), nullable=False, server_default=sa.text("1")),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("meta_json", sa.Text(), nullable=True),
+            sa.Column("archivada_en", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        )
+        op.create_index(
+            "ix_notificaciones_archivo_usuario_id",
+            "notificaciones_archivo",
+            ["id_usuario", "id"],
+            unique=False,
+        )
+
+    if "mensajes_renta_archivo" not in tables:
+        op.create_table(
+            "mensajes_renta_archivo",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("id_renta", sa.Integer(), nullable=False),
+            sa.Column("id_emisor", sa.Integer(), nullable=False),
+            sa.Column("mensaje", sa.String(length=240), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("archivado_en", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        )
+        op.create_index(
+            "ix_mensajes_renta_archivo_renta_created",
+            "mensajes_renta_archivo",
+            ["id_renta", "created_at"],
+            unique=False,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if "mensajes_renta_archivo" in tables:
+        try:
+            op.drop_index("ix_mensajes_renta_archivo_renta_created", table_name="mensajes_renta_archivo")
+        except Exception:
+            pass
+        op.drop_table("mensajes_renta_archivo")
+
+    if "notificaciones_archivo" in tables:
+        try:
+            op.drop_index("ix_notificaciones_archivo_usuario_id", table_name="notificaciones_archivo")
+        except Exception:
+            pass
+        op.drop_table("notificaciones_archivo")
@@ -0,0 +1,64 @@
+"""add rentas.estado_publico (pestañas del inbox) + índices por rol
+
+Revision ID: 20251219_0013
+Revises: 20251219_0012
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251219_0013"
+down_revision = "20251219_0012"
+branch_labels = None
+depends_on = None
+
+
+_INDICES = (
+    ("ix_rentas_arrendatario_estado_publico", ["id_arrendatario", "estado_publico"]),
+    ("ix_rentas_propietario_estado_publico", ["id_propietario", "estado_publico"]),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    cols = {c["name"] for c in insp.get_columns("rentas")}
+    if "estado_publico" not in cols:
+        op.add_column("rentas", sa.Column("estado_publico", sa.String(length=20), nullable=True))
+
+    # Backfill con la misma regla que Renta.calcular_estado_publico().
+    op.execute(
+        "UPDATE rentas SET estado_publico = CASE "
+        "WHEN estado_renta = 'en_curso' AND devuelto = 1 THEN 'devuelta' "
+        "WHEN estado_renta = 'en_curso' THEN 'en_uso' "
+        "WHEN estado_renta = 'completada' THEN 'finalizada' "
+        "WHEN estado_renta = 'con_incidente' THEN 'incidente' "
+        "WHEN estado_renta = 'cancelada' AND notas_devolucion LIKE '%EXPIRACION_PAGO%' THEN 'expirada' "
+        "ELSE COALESCE(estado_renta, 'pendiente_pago') END "
+        "WHERE estado_publico IS NULL"
+    )
+
+    existentes = {i["name"] for i in insp.get_indexes("rentas")}
+    for nombre, columnas in _INDICES:
+        if nombre not in existentes:
+            op.create_index(nombre, "rentas", columnas, unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    existentes = {i["name"] for i in insp.get_indexes("rentas")}
+    for nombre, _ in _INDICES:
+        if nombre in existentes:
+            op.drop_index(nombre, table_name="rentas")
+
+    cols = {c["name"] for c in insp.get_columns("rentas")}
+    if "estado_publico" in cols:
+        with op.batch_alter_table("rentas") as batch:
+            batch.drop_column("estado_publico")
@@ -0,0 +1,41 @@
+"""add articulos_imagenes.url_miniatura / url_mediana (variantes WebP)
+
+Revision ID: 20251219_0014
+Revises: 20251219_0013
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251219_0014"
+down_revision = "20251219_0013"
+branch_labels = None
+depends_on = None
+
+
+_COLUMNAS = ("url_miniatura", "url_mediana")
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    cols = {c["name"] for c in insp.get_columns("articulos_imagenes")}
+    for nombre in _COLUMNAS:
+        if nombre not in cols:
+            op.add_column("articulos_imagenes", sa.Column(nombre, sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    cols = {c["name"] for c in insp.get_columns("articulos_imagenes")}
+    with op.batch_alter_table("articulos_imagenes") as batch:
+        for nombre in _COLUMNAS:
+            if nombre in cols:
+                batch.drop_column(nombre)
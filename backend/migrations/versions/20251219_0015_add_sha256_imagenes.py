@@ -0,0 +1,44 @@
+"""add articulos_imagenes.sha256 (almacenamiento por contenido + referencias)
+
+Revision ID: 20251219_0015
+Revises: 20251219_0014
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251219_0015"
+down_revision = "20251219_0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    cols = {c["name"] for c in insp.get_columns("articulos_imagenes")}
+    if "sha256" not in cols:
+        op.add_column("articulos_imagenes", sa.Column("sha256", sa.String(length=64), nullable=True))
+
+    existentes = {i["name"] for i in insp.get_indexes("articulos_imagenes")}
+    if "ix_articulos_imagenes_sha256" not in existentes:
+        op.create_index("ix_articulos_imagenes_sha256", "articulos_imagenes", ["sha256"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    existentes = {i["name"] for i in insp.get_indexes("articulos_imagenes")}
+    if "ix_articulos_imagenes_sha256" in existentes:
+        op.drop_index("ix_articulos_imagenes_sha256", table_name="articulos_imagenes")
+
+    cols = {c["name"] for c in insp.get_columns("articulos_imagenes")}
+    if "sha256" in cols:
+        with op.batch_alter_table("articulos_imagenes") as batch:
+            batch.drop_column("sha256")
@@ -0,0 +1,51 @@
+"""add subidas_imagenes (uploads reanudables por chunks)
+
+Revision ID: 20251219_0016
+Revises: 20251219_0015
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "20251219_0016"
+down_revision = "20251219_0015"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if "subidas_imagenes" not in tables:
+        op.create_table(
+            "subidas_imagenes",
+            sa.Column("id", sa.String(length=32), primary_key=True),
+            sa.Column("id_articulo", sa.Integer(), nullable=False),
+            sa.Column("id_usuario", sa.Integer(), nullable=False),
+            sa.Column("nombre_original", sa.String(length=255), nullable=True),
+            sa.Column("tamano_total", sa.BigInteger(), nullable=False),
+            sa.Column("sha256_esperado", sa.String(length=64), nullable=False),
+            sa.Column("recibido", sa.BigInteger(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["id_articulo"], ["articulos.id_articulo"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["id_usuario"], ["usuarios.id_usuario"]),
+        )
+        op.create_index("ix_subidas_imagenes_expires_at", "subidas_imagenes", ["expires_at"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if "subidas_imagenes" in tables:
+        op.drop_index("ix_subidas_imagenes_expires_at", table_name="subidas_imagenes")
+        op.drop_table("subidas_imagenes")
@@ -0,0 +1,64 @@
+"""sellos de versión con microsegundos (articulos.actualizado_en, rentas.fecha_actualizacion)
+
+Revision ID: 20251219_0017
+Revises: 20251219_0016
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects import mysql
+
+
+revision = "20251219_0017"
+down_revision = "20251219_0016"
+branch_labels = None
+depends_on = None
+
+# Los ETag se arman con estas columnas: con DATETIME (segundos) dos cambios en
+# el mismo segundo darían el mismo ETag.
+COLUMNAS = (
+    ("articulos", "actualizado_en"),
+    ("rentas", "fecha_actualizacion"),
+)
+
+
+def _column(insp, table: str, col: str) -> dict | None:
+    try:
+        cols = insp.get_columns(table)
+    except Exception:
+        return None
+    return next((c for c in cols if c.get("name") == col), None)
+
+
+def _alterar(tipo, tipo_previo, precision: str) -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        # SQLite guarda el datetime como texto con microsegundos.
+        return
+    insp = inspect(bind)
+    for table, col in COLUMNAS:
+        info = _column(insp, table, col)
+        if info is None:
+            continue
+        # MySQL exige que un default CURRENT_TIMESTAMP tenga la precisión de la columna.
+        default = str(info.get("default") or "")
+        server_default = sa.text(f"CURRENT_TIMESTAMP{precision}") if "CURRENT_TIMESTAMP" in default.upper() else None
+        op.alter_column(
+            table,
+            col,
+            existing_type=tipo_previo,
+            type_=tipo,
+            server_default=server_default,
+            existing_nullable=info.get("nullable", True),
+        )
+
+
+def upgrade():
+    _alterar(mysql.DATETIME(fsp=6), sa.DateTime(), "(6)")
+
+
+def downgrade():
+    _alterar(sa.DateTime(), mysql.DATETIME(fsp=6), "")
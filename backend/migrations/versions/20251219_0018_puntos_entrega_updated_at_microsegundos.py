@@ -0,0 +1,50 @@
+"""puntos_entrega.updated_at con microsegundos (sello de la cache de referencia)
+
+Revision ID: 20251219_0018
+Revises: 20251219_0017
+Create Date: 2025-12-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects import mysql
+
+
+revision = "20251219_0018"
+down_revision = "20251219_0017"
+branch_labels = None
+depends_on = None
+
+
+def _column(insp, table: str, col: str) -> dict | None:
+    try:
+        cols = insp.get_columns(table)
+    except Exception:
+        return None
+    return next((c for c in cols if c.get("name") == col), None)
+
+
+def _alterar(tipo, tipo_previo, server_default: str) -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        return
+    if _column(inspect(bind), "puntos_entrega", "updated_at") is not None:
+        # MySQL exige que el default tenga la misma precisión que la columna.
+        op.alter_column(
+            "puntos_entrega",
+            "updated_at",
+            existing_type=tipo_previo,
+            type_=tipo,
+            server_default=sa.text(server_default),
+            existing_nullable=False,
+        )
+
+
+def upgrade():
+    _alterar(mysql.DATETIME(fsp=6), sa.DateTime(), "CURRENT_TIMESTAMP(6)")
+
+
+def downgrade():
+    _alterar(sa.DateTime(), mysql.DATETIME(fsp=6), "CURRENT_TIMESTAMP")
@@ -16,7 +16,8 @@ def _running_on_railway() -> bool:
     )
 
 
-config = ProdConfig if _running_on_railway() else DevConfig
+# APP_ENV=production lo define `python -m app.serve` (gunicorn).
+config = ProdConfig if _running_on_railway() or os.getenv("APP_ENV") == "production" else DevConfig
 app = create_app(config)
 
 if __name__ == "__main__":
@@ -5,30 +5,48 @@ import {
   HttpRequest,
   HttpHandler,
   HttpEvent,
+  HttpResponse,
 } from '@angular/common/http';
-import { Observable } from 'rxjs';
+import { Observable, tap } from 'rxjs';
 import { AuthService } from '../services/auth.service';
 import { environment } from '../../../environments/environment';
 
+// Ventana read-your-writes firmada por el backend tras una escritura:
+// se reenvía para que las lecturas siguientes vayan a la primaria.
+const PRIMARIA_HEADER = 'X-Primaria-Hasta';
+
 @Injectable()
 export class AuthInterceptor implements HttpInterceptor {
+  private primariaHasta: string | null = null;
+
   constructor(private authService: AuthService) {}
 
   intercept(req: HttpRequest<any>, next: HttpHandler): Observable<HttpEvent<any>> {
-    const token = this.authService.getToken();
-
     // Solo tocar las peticiones que van a nuestro backend
     const isApiUrl = req.url.startsWith(environment.apiUrl);
+    if (!isApiUrl) {
+      return next.handle(req);
+    }
 
-    if (token && isApiUrl) {
-      const authReq = req.clone({
-        setHeaders: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
-      return next.handle(authReq);
+    const token = this.authService.getToken();
+    const headers: Record<string, string> = {};
+    if (token) {
+      headers['Authorization'] = `Bearer ${token}`;
+    }
+    if (this.primariaHasta) {
+      headers[PRIMARIA_HEADER] = this.primariaHasta;
     }
 
-    return next.handle(req);
+    const apiReq = Object.keys(headers).length ? req.clone({ setHeaders: headers }) : req;
+    return next.handle(apiReq).pipe(
+      tap((event) => {
+        if (event instanceof HttpResponse) {
+          const primaria = event.headers.get(PRIMARIA_HEADER);
+          if (primaria) {
+            this.primariaHasta = primaria;
+          }
+        }
+      })
+    );
   }
 }